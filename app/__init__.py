@@ -2,12 +2,42 @@
 
 from flask import Flask
 
+from . import cache, metrics, pdf_cache, pdf_jobs, pdf_pool, profiling, sessions, views
+
+# Clé de développement, publique: remplacée en production par FLASK_SECRET_KEY
+DEV_SECRET_KEY = 'dev-key-change-in-production'
+
+
+def create_app(config=None):
+    # Importé ici: app.export est aussi un module exécutable (python -m app.export)
+    from . import export
 
-def create_app():
     app = Flask(__name__, template_folder='../templates', static_folder='../static')
-    app.secret_key = 'dev-key-change-in-production'
+    app.secret_key = DEV_SECRET_KEY
+    app.config.from_mapping(cache.DEFAULT_CONFIG)
+    app.config.from_mapping(pdf_pool.DEFAULT_CONFIG)
+    app.config.from_mapping(pdf_jobs.DEFAULT_CONFIG)
+    app.config.from_mapping(pdf_cache.DEFAULT_CONFIG)
+    app.config.from_mapping(export.DEFAULT_CONFIG)
+    app.config.from_mapping(sessions.DEFAULT_CONFIG)
+    app.config.from_mapping(views.DEFAULT_CONFIG)
+    app.config.from_mapping(metrics.DEFAULT_CONFIG)
+    app.config.from_mapping(profiling.DEFAULT_CONFIG)
+    # Surcharges de déploiement: variables FLASK_* (ex. FLASK_PDF_RENDER_WORKERS=4)
+    app.config.from_prefixed_env()
+    if config:
+        app.config.update(config)
+
+    metrics.init_app(app)
+    profiling.init_app(app)
+    sessions.init_app(app)
+    cache.init_app(app)
+    pdf_pool.init_app(app)
+    pdf_cache.init_app(app)
+    pdf_jobs.init_app(app)
 
-    from . import routes
+    from . import api, routes
     app.register_blueprint(routes.bp)
+    app.register_blueprint(api.bp)
 
     return app
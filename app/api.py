@@ -0,0 +1,242 @@
+"""
+API JSON de scoring pour les intégrations (portails d'accueil, passerelles DPI).
+
+POST /api/v1/score reçoit un objet {"responses": {"asrs_1": 3, ...}} et
+renvoie les résultats ASRS, DIVA, fonctions exécutives et l'évaluation
+globale. Aucune session n'est lue ni écrite et aucun gabarit n'est rendu:
+l'appel est sans état, comme le scoring par lot.
+
+POST /api/v1/score/stream score des lots en NDJSON: un enregistrement
+{"id": ..., "responses": {...}} par ligne en entrée, un résultat par ligne
+en sortie, au fil de la lecture (voir score_stream).
+
+PATCH /api/v1/session/answers est la seule route liée à la session web:
+les formulaires y enregistrent chaque réponse dès sa saisie, et les
+sous-scores sont tenus à jour au fil de l'eau (scoring incrémental).
+"""
+
+import io
+import json
+from typing import Dict, Iterator, List, Tuple
+
+from flask import Blueprint, Response, current_app, request, session
+
+from .cache import assess
+from .scoring import EF_CLUSTER_NAMES, SCORING_PLAN, GlobalAssessment, running_scores, update_tally_state
+from .views import session_tally
+
+try:
+    import orjson
+except ImportError:  # sérialiseur optionnel: repli sur la bibliothèque standard
+    orjson = None
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Flux NDJSON: taille maximale d'une ligne d'entrée et lignes de sortie par bloc envoyé
+MAX_RECORD_BYTES = 64 * 1024
+STREAM_BATCH = 64
+
+
+def dumps(payload: object) -> bytes:
+    """JSON UTF-8 compact (orjson si disponible)."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def validate_responses(payload: object) -> Tuple[Dict[str, int], List[Dict[str, str]]]:
+    """
+    Réponses validées contre les définitions des questionnaires, et erreurs.
+
+    Chaque identifiant doit exister et sa valeur être un entier compris
+    entre 0 et la cotation maximale de la question. Les questions sans
+    réponse sont laissées de côté par le scoring, comme dans les formulaires.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('responses'), dict):
+        return {}, [{'field': 'responses', 'error': "objet attendu"}]
+    responses = {}
+    errors = []
+    for qid, value in payload['responses'].items():
+        spec = SCORING_PLAN.get(qid)
+        if spec is None:
+            errors.append({'field': qid, 'error': "question inconnue"})
+        elif type(value) is not int:
+            errors.append({'field': qid, 'error': "entier attendu"})
+        elif not 0 <= value <= spec.max_value:
+            errors.append({'field': qid, 'error': f"valeur hors de l'intervalle 0-{spec.max_value}"})
+        else:
+            responses[qid] = value
+    return responses, errors
+
+
+def assessment_to_dict(assessment: GlobalAssessment) -> dict:
+    """Représentation JSON d'une évaluation globale."""
+    asrs, diva, ef = assessment.asrs, assessment.diva, assessment.exec_functions
+    return {
+        'asrs': {
+            'part_a_score': asrs.part_a_score,
+            'part_a_shaded_count': asrs.part_a_shaded_count,
+            'part_b_score': asrs.part_b_score,
+            'total_score': asrs.total_score,
+            'inattention_score': asrs.inattention_score,
+            'hyperactivity_score': asrs.hyperactivity_score,
+            'screening_positive': asrs.screening_positive,
+            'interpretation': asrs.interpretation,
+            'recommendation': asrs.recommendation,
+        },
+        'diva': {
+            'inattention_count': diva.inattention_count,
+            'hyperactivity_count': diva.hyperactivity_count,
+            'childhood_positive': diva.childhood_positive,
+            'impairment_domains': diva.impairment_domains,
+            'meets_inattention_criteria': diva.meets_inattention_criteria,
+            'meets_hyperactivity_criteria': diva.meets_hyperactivity_criteria,
+            'presentation_type': diva.presentation_type,
+            'interpretation': diva.interpretation,
+        },
+        'exec_functions': {
+            'clusters': [
+                {'id': cluster, 'label': label, 'score': score, 'max_score': max_score}
+                for cluster, (label, (score, max_score)) in zip(EF_CLUSTER_NAMES, ef.cluster_scores.items())
+            ],
+            'total_score': ef.total_score,
+            'max_score': ef.max_score,
+            'most_impaired_clusters': ef.most_impaired_clusters,
+            'severity': ef.severity,
+            'interpretation': ef.interpretation,
+        },
+        'global': {
+            'summary': assessment.summary,
+            'clinical_recommendation': assessment.clinical_recommendation,
+            'confidence_level': assessment.confidence_level,
+        },
+    }
+
+
+def _json(payload: object, status: int = 200) -> Response:
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+@bp.route('/score', methods=['POST'])
+def score():
+    """Score un jeu de réponses; 400 avec la liste des erreurs si la saisie est invalide."""
+    payload = request.get_json(silent=True)
+    responses, errors = validate_responses(payload)
+    if errors:
+        return _json({'errors': errors}, 400)
+    body = assessment_to_dict(current_app.extensions['assessment_cache'].get_or_compute(responses))
+    body['answered'] = len(responses)
+    body['questions'] = len(SCORING_PLAN)
+    return _json(body)
+
+
+def _read_lines(stream, limit: int) -> Iterator[Tuple[int, bytes, bool]]:
+    """(numéro, ligne, complète) lues une à une; une ligne trop longue est tronquée puis sautée."""
+    number = 0
+    while True:
+        line = stream.readline(limit + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > limit and not line.endswith(b'\n'):
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(limit + 1)
+            yield number, b'', False
+        elif line.strip():
+            yield number, line, True
+
+
+def _score_line(number: int, line: bytes, complete: bool) -> dict:
+    """Résultat d'une ligne NDJSON: évaluation, ou erreurs propres à l'enregistrement."""
+    if not complete:
+        return {'line': number, 'errors': [{'field': None, 'error': f"ligne de plus de {MAX_RECORD_BYTES} octets"}]}
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return {'line': number, 'errors': [{'field': None, 'error': "JSON invalide"}]}
+    result = {'line': number}
+    if isinstance(record, dict) and 'id' in record:
+        result['id'] = record['id']
+    responses, errors = validate_responses(record)
+    if errors:
+        result['errors'] = errors
+    else:
+        result['result'] = assessment_to_dict(assess(responses))
+    return result
+
+
+def score_stream(stream) -> Iterator[bytes]:
+    """
+    Score un flux NDJSON et produit les lignes de résultat par blocs.
+
+    L'entrée est lue au rythme où la sortie est consommée: la mémoire reste
+    bornée (une ligne d'entrée, un bloc de sortie) et un client lent freine
+    la lecture. Un enregistrement invalide produit une ligne "errors" sans
+    interrompre le lot; une ligne "summary" termine la réponse.
+    """
+    records = scored = 0
+    batch = []
+    for number, line, complete in _read_lines(stream, MAX_RECORD_BYTES):
+        result = _score_line(number, line, complete)
+        records += 1
+        scored += 'result' in result
+        batch.append(dumps(result))
+        if len(batch) >= STREAM_BATCH:
+            yield b'\n'.join(batch) + b'\n'
+            batch.clear()
+    batch.append(dumps({'summary': {'records': records, 'scored': scored, 'failed': records - scored}}))
+    yield b'\n'.join(batch) + b'\n'
+
+
+@bp.route('/score/stream', methods=['POST'])
+def score_stream_view():
+    """Scoring en flux d'un lot NDJSON (application/x-ndjson)."""
+    # Flux d'entrée brut, jamais chargé en entier; le tampon évite la lecture
+    # octet par octet de readline sur le flux de Werkzeug
+    stream = io.BufferedReader(request.stream, buffer_size=MAX_RECORD_BYTES)
+    return Response(score_stream(stream), mimetype='application/x-ndjson')
+
+
+@bp.route('/session/answers', methods=['PATCH'])
+def session_answers():
+    """
+    Enregistre des réponses dans la session web: {"answers": {"asrs_1": 3, ...}}.
+
+    Une valeur null retire la réponse. La saisie est validée en entier
+    avant d'être appliquée (400 avec la liste des erreurs, rien n'est
+    enregistré); la réponse donne les sous-scores courants.
+    """
+    if not session.get('consent'):
+        return _json({'errors': [{'field': None, 'error': "évaluation non commencée"}]}, 403)
+    payload = request.get_json(silent=True)
+    answers = payload.get('answers') if isinstance(payload, dict) else None
+    if not isinstance(answers, dict):
+        return _json({'errors': [{'field': 'answers', 'error': "objet attendu"}]}, 400)
+    cleared = [qid for qid, value in answers.items() if value is None and qid in SCORING_PLAN]
+    values, errors = validate_responses(
+        {'responses': {qid: value for qid, value in answers.items() if qid not in cleared}}
+    )
+    if errors:
+        return _json({'errors': errors}, 400)
+
+    responses = dict(session.get('responses', {}))
+    state = list(session_tally(session))
+    changed = False
+    for qid, value in [*values.items(), *((qid, None) for qid in cleared)]:
+        old = responses.get(qid)
+        if old == value:
+            continue
+        update_tally_state(state, qid, old, value)
+        if value is None:
+            del responses[qid]
+        else:
+            responses[qid] = value
+        changed = True
+    if changed:
+        session['responses'] = responses
+        session['tally'] = state
+    return _json({
+        'answered': len(responses),
+        'questions': len(SCORING_PLAN),
+        'scores': running_scores(state),
+    })
@@ -0,0 +1,330 @@
+"""
+Scoring en ligne de commande de fichiers de réponses (JSONL ou CSV).
+
+Usage:
+    python -m app.batch reponses.jsonl -o scores.csv [--summary] [--workers 4]
+
+Chaque enregistrement contient les réponses indexées par identifiant de
+question (asrs_1, diva_ia_1, ef_act_1...). Les autres champs (identifiant
+patient, date...) sont recopiés tels quels en tête de l'enregistrement scoré.
+En sortie CSV, ces colonnes sont fixées d'avance: --fields, ou à défaut
+l'en-tête d'une entrée CSV; un enregistrement JSONL portant un champ non
+déclaré est signalé plutôt que tronqué.
+Un enregistrement dont une réponse n'est pas un entier admis par sa
+question (0 à la cotation maximale) n'est pas scoré: il est signalé, avec
+son numéro, sur la sortie d'erreur.
+
+Le fichier est traité en flux par blocs: la mémoire reste constante quelle
+que soit sa taille. Avec --workers, les blocs sont scorés dans un pool de
+processus avec un nombre borné de blocs en vol.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import assess, assessment_cache
+from .scoring import EF_CLUSTER_NAMES, SCORING_PLAN, GlobalAssessment
+
+FORMATS = ('jsonl', 'csv')
+
+SCORE_FIELDS = [
+    'asrs_part_a_score', 'asrs_part_a_shaded_count', 'asrs_part_b_score',
+    'asrs_total_score', 'asrs_inattention_score', 'asrs_hyperactivity_score',
+    'asrs_screening_positive',
+    'diva_inattention_count', 'diva_hyperactivity_count', 'diva_childhood_positive',
+    'diva_impairment_domains', 'diva_meets_inattention_criteria',
+    'diva_meets_hyperactivity_criteria', 'diva_presentation_type',
+] + [
+    f'ef_{cluster}_{part}' for cluster in EF_CLUSTER_NAMES for part in ('score', 'max')
+] + [
+    'ef_total_score', 'ef_max_score', 'ef_severity', 'ef_most_impaired_clusters',
+]
+
+SUMMARY_FIELDS = ['confidence_level', 'summary', 'clinical_recommendation']
+
+
+def flatten_assessment(assessment: GlobalAssessment, summary: bool = False) -> Dict[str, object]:
+    """Aplatit une évaluation en champs scalaires (listes conservées telles quelles)."""
+    asrs, diva, ef = assessment.asrs, assessment.diva, assessment.exec_functions
+    row = {
+        'asrs_part_a_score': asrs.part_a_score,
+        'asrs_part_a_shaded_count': asrs.part_a_shaded_count,
+        'asrs_part_b_score': asrs.part_b_score,
+        'asrs_total_score': asrs.total_score,
+        'asrs_inattention_score': asrs.inattention_score,
+        'asrs_hyperactivity_score': asrs.hyperactivity_score,
+        'asrs_screening_positive': asrs.screening_positive,
+        'diva_inattention_count': diva.inattention_count,
+        'diva_hyperactivity_count': diva.hyperactivity_count,
+        'diva_childhood_positive': diva.childhood_positive,
+        'diva_impairment_domains': diva.impairment_domains,
+        'diva_meets_inattention_criteria': diva.meets_inattention_criteria,
+        'diva_meets_hyperactivity_criteria': diva.meets_hyperactivity_criteria,
+        'diva_presentation_type': diva.presentation_type,
+    }
+    for cluster, (score, max_score) in zip(EF_CLUSTER_NAMES, ef.cluster_scores.values()):
+        row[f'ef_{cluster}_score'] = score
+        row[f'ef_{cluster}_max'] = max_score
+    row['ef_total_score'] = ef.total_score
+    row['ef_max_score'] = ef.max_score
+    row['ef_severity'] = ef.severity
+    row['ef_most_impaired_clusters'] = ef.most_impaired_clusters
+    if summary:
+        row['confidence_level'] = assessment.confidence_level
+        row['summary'] = assessment.summary
+        row['clinical_recommendation'] = assessment.clinical_recommendation
+    return row
+
+
+def _answer(value: object, max_value: int) -> int:
+    """Cotation d'une réponse; ValueError si ce n'est pas un entier de 0 à max_value."""
+    if type(value) is not int:
+        # Cellule CSV (texte): chiffres seulement, ni décimale ni signe
+        text = value.strip() if isinstance(value, str) else None
+        if not (text and text.isascii() and text.isdigit()):
+            raise ValueError(f"entier attendu ({value!r})")
+        value = int(text)
+    if not 0 <= value <= max_value:
+        raise ValueError(f"valeur hors de l'intervalle 0-{max_value} ({value})")
+    return value
+
+
+def split_record(record: Dict[str, object]) -> Tuple[Dict[str, object], Dict[str, int]]:
+    """
+    Sépare les champs recopiés des réponses; une cellule vide vaut absence de réponse.
+
+    Chaque réponse est validée comme dans l'API (entier entre 0 et la
+    cotation maximale de la question): un enregistrement comportant une
+    réponse invalide lève ValueError, avec toutes les réponses en cause.
+    """
+    extra = {}
+    responses = {}
+    errors = []
+    for key, value in record.items():
+        spec = SCORING_PLAN.get(key)
+        if spec is None:
+            extra[key] = value
+        elif value is not None and value != '':
+            try:
+                responses[key] = _answer(value, spec.max_value)
+            except ValueError as exc:
+                errors.append(f"{key}: {exc}")
+    if errors:
+        raise ValueError("réponses invalides: " + '; '.join(errors))
+    return extra, responses
+
+
+def score_record(record: Dict[str, object], summary: bool = False,
+                 use_cache: bool = False) -> Dict[str, object]:
+    """Score un enregistrement et renvoie ses champs recopiés suivis des scores."""
+    extra, responses = split_record(record)
+    if use_cache:
+        assessment = assessment_cache.get_or_compute(responses)
+    else:
+        assessment = assess(responses)
+    extra.update(flatten_assessment(assessment, summary))
+    return extra
+
+
+# =============================================================================
+# Lecture / écriture en flux
+# =============================================================================
+
+def detect_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def read_items(stream, fmt: str) -> Iterator[object]:
+    """Lignes JSON brutes (décodées dans les workers) ou lignes CSV en dictionnaires."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield line
+
+
+def _decode(item, fmt: str) -> Dict[str, object]:
+    if fmt == 'csv':
+        return item
+    record = json.loads(item)
+    if not isinstance(record, dict):
+        raise ValueError("l'enregistrement JSON doit être un objet")
+    return record
+
+
+def _csv_cell(value):
+    if isinstance(value, list):
+        return '; '.join(value)
+    return value
+
+
+def _score_chunk(start: int, items: List[object], input_format: str,
+                 output_format: str, fields: Optional[List[str]], summary: bool,
+                 use_cache: bool):
+    """Décode, score et sérialise un bloc; les erreurs sont rapportées par numéro d'enregistrement."""
+    out = []
+    errors = []
+    columns = frozenset(fields) if output_format == 'csv' else None
+    for offset, item in enumerate(items):
+        try:
+            row = score_record(_decode(item, input_format), summary, use_cache)
+            if columns is not None:
+                unknown = [str(key) for key in row if key not in columns]
+                if unknown:
+                    raise ValueError(f"champs non déclarés (--fields): {', '.join(unknown)}")
+        except (ValueError, TypeError) as exc:
+            errors.append((start + offset + 1, str(exc)))
+            continue
+        if output_format == 'csv':
+            out.append([_csv_cell(row.get(field, '')) for field in fields])
+        else:
+            out.append(json.dumps(row, ensure_ascii=False))
+    return out, errors
+
+
+def _chunks(items: Iterable[object], size: int) -> Iterator[Tuple[int, List[object]]]:
+    iterator = iter(items)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _run_parallel(chunks, workers: int, ordered: bool, args: tuple):
+    """Soumet les blocs au pool avec au plus 2 blocs en vol par worker."""
+    window = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, chunk in chunks:
+            pending.append(pool.submit(_score_chunk, start, chunk, *args))
+            while len(pending) >= window:
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield future.result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run(source, sink, input_format: str, output_format: str, summary: bool = False,
+        workers: int = 0, ordered: bool = True, chunk_size: int = 1000,
+        use_cache: bool = False, errors=sys.stderr, passthrough: Optional[List[str]] = None):
+    """
+    Score le flux source vers sink; renvoie (enregistrements scorés, erreurs).
+
+    passthrough: champs recopiés en tête des colonnes CSV (défaut: ceux de
+    l'en-tête d'une entrée CSV, aucun pour une entrée JSONL).
+    """
+    if input_format == 'csv':
+        reader = csv.DictReader(source)
+        header = reader.fieldnames or []
+        items = iter(reader)
+    else:
+        header = []
+        items = read_items(source, input_format)
+
+    fields = None
+    writer = None
+    if output_format == 'csv':
+        if passthrough is None:
+            passthrough = header
+        fields = [name for name in passthrough if name not in SCORING_PLAN]
+        fields += SCORE_FIELDS + (SUMMARY_FIELDS if summary else [])
+        writer = csv.writer(sink)
+        writer.writerow(fields)
+
+    args = (input_format, output_format, fields, summary, use_cache)
+    chunks = _chunks(items, chunk_size)
+    if workers > 0:
+        results = _run_parallel(chunks, workers, ordered, args)
+    else:
+        results = (_score_chunk(start, chunk, *args) for start, chunk in chunks)
+
+    scored = 0
+    failed = 0
+    for out, chunk_errors in results:
+        if writer is not None:
+            writer.writerows(out)
+        else:
+            for line in out:
+                sink.write(line)
+                sink.write('\n')
+        scored += len(out)
+        failed += len(chunk_errors)
+        for number, message in chunk_errors:
+            print(f"Enregistrement {number} ignoré: {message}", file=errors)
+    return scored, failed
+
+
+def _open(path: str, mode: str):
+    if path == '-':
+        # Ne pas fermer les flux standard en sortie de bloc
+        return nullcontext(sys.stdin if 'r' in mode else sys.stdout)
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m app.batch',
+        description="Score des fichiers de réponses JSONL/CSV en flux.",
+    )
+    parser.add_argument('input', help="fichier d'entrée (- pour l'entrée standard)")
+    parser.add_argument('-o', '--output', default='-', help="fichier de sortie (défaut: sortie standard)")
+    parser.add_argument('--input-format', choices=FORMATS, help="défaut: déduit de l'extension")
+    parser.add_argument('--output-format', choices=FORMATS, help="défaut: déduit de l'extension")
+    parser.add_argument('--summary', action='store_true',
+                        help="inclure la synthèse globale (niveau de confiance, résumé, recommandation)")
+    parser.add_argument('--workers', type=int, default=0, help="processus de scoring (0: aucun pool)")
+    parser.add_argument('--unordered', action='store_true',
+                        help="écrire les blocs dans l'ordre de fin de traitement")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="enregistrements par bloc")
+    parser.add_argument('--cache', action='store_true',
+                        help="mémoriser les évaluations des jeux de réponses identiques (un cache par processus)")
+    parser.add_argument('--fields', type=lambda value: [name.strip() for name in value.split(',') if name.strip()],
+                        help="champs recopiés en sortie CSV, séparés par des virgules "
+                             "(défaut: en-tête d'une entrée CSV, aucun pour du JSONL)")
+    args = parser.parse_args(argv)
+
+    input_format = detect_format(args.input, args.input_format)
+    output_format = detect_format(args.output, args.output_format)
+
+    start = time.perf_counter()
+    with _open(args.input, 'r') as source, _open(args.output, 'w') as sink:
+        scored, failed = run(
+            source, sink, input_format, output_format,
+            summary=args.summary, workers=args.workers,
+            ordered=not args.unordered, chunk_size=args.chunk_size,
+            use_cache=args.cache, passthrough=args.fields,
+        )
+    elapsed = time.perf_counter() - start
+    rate = scored / elapsed if elapsed > 0 else 0.0
+    print(
+        f"{scored} enregistrements scorés en {elapsed:.2f} s ({rate:,.0f} lignes/s), "
+        f"{failed} ignorés",
+        file=sys.stderr,
+    )
+    if args.cache and not args.workers:
+        stats = assessment_cache.stats()
+        print(f"Cache: {stats['hits']} succès, {stats['misses']} échecs", file=sys.stderr)
+    return 1 if failed and not scored else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Scoring vectorisé (NumPy) pour de grands volumes de réponses.
+
+Chaque ligne de la matrice d'entrée est un répondant, chaque colonne une
+question dans l'ordre de COLUMNS (ASRS, puis DIVA inattention, hyperactivité,
+enfance, retentissement, puis fonctions exécutives). Une valeur négative
+(MISSING) indique une question sans réponse.
+
+Les résultats sont identiques à ceux de score_asrs, score_diva,
+score_executive_functions et generate_global_assessment.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - dépendance optionnelle
+    raise ImportError(
+        "Le scoring par lot nécessite NumPy (extra « batch »: poetry install --extras batch)"
+    ) from exc
+
+from .scoring import SCORING_PLAN, EF_CLUSTER_NAMES
+
+# Ordre des colonnes de la matrice de réponses
+COLUMNS = tuple(SCORING_PLAN)
+COLUMN_INDEX = {qid: i for i, qid in enumerate(COLUMNS)}
+MISSING = -1
+
+# Libellés associés aux codes renvoyés par score_batch
+SEVERITY_LABELS = ("Faible", "Modéré", "Élevé")
+PRESENTATION_LABELS = (
+    "Sous les seuils cliniques",
+    "Inattention prédominante",
+    "Hyperactivité/Impulsivité prédominante",
+    "Inattention + Hyperactivité/Impulsivité",
+)
+EF_CLUSTER_LABELS = tuple(EF_CLUSTER_NAMES.values())
+
+
+def _select(indices) -> object:
+    """Tranche si les colonnes sont contiguës (vue sans copie), sinon tableau d'indices."""
+    indices = list(indices)
+    if indices == list(range(indices[0], indices[-1] + 1)):
+        return slice(indices[0], indices[-1] + 1)
+    return np.array(indices, dtype=np.intp)
+
+
+def _columns(predicate) -> list:
+    return [i for i, qid in enumerate(COLUMNS) if predicate(SCORING_PLAN[qid])]
+
+
+_ASRS_PART_A_IDX = _columns(lambda s: s.instrument == "asrs" and s.shaded_threshold is not None)
+_ASRS_PART_A = _select(_ASRS_PART_A_IDX)
+_ASRS_PART_B = _select(_columns(lambda s: s.instrument == "asrs" and s.shaded_threshold is None))
+_ASRS_INATTENTION = _select(_columns(lambda s: s.instrument == "asrs" and s.subscale == "inattention"))
+_ASRS_HYPERACTIVITY = _select(_columns(lambda s: s.instrument == "asrs" and s.subscale != "inattention"))
+_ASRS_THRESHOLDS = np.array(
+    [SCORING_PLAN[COLUMNS[i]].shaded_threshold for i in _ASRS_PART_A_IDX], dtype=np.int8
+)
+_DIVA_IA = _select(_columns(lambda s: s.instrument == "diva" and s.part == "ia"))
+_DIVA_HI = _select(_columns(lambda s: s.instrument == "diva" and s.part == "hi"))
+_DIVA_CHILD = _select(_columns(lambda s: s.instrument == "diva" and s.part == "child"))
+_DIVA_IMP = _select(_columns(lambda s: s.instrument == "diva" and s.part == "imp"))
+
+# Colonnes EF regroupées par cluster, pour une réduction par segments
+_EF_IDX = sorted(
+    _columns(lambda s: s.instrument == "ef"), key=lambda i: SCORING_PLAN[COLUMNS[i]].index
+)
+_EF = _select(_EF_IDX)
+_EF_BOUNDARIES = np.searchsorted(
+    [SCORING_PLAN[COLUMNS[i]].index for i in _EF_IDX], np.arange(len(EF_CLUSTER_NAMES))
+)
+_EF_MAX_VALUE = SCORING_PLAN[COLUMNS[_EF_IDX[0]]].max_value
+
+
+@dataclass
+class BatchScores:
+    """Résultats colonnes: un tableau par mesure, une entrée par répondant."""
+    asrs_part_a_score: np.ndarray
+    asrs_part_a_shaded_count: np.ndarray
+    asrs_part_b_score: np.ndarray
+    asrs_total_score: np.ndarray
+    asrs_inattention_score: np.ndarray
+    asrs_hyperactivity_score: np.ndarray
+    asrs_screening_positive: np.ndarray
+    diva_inattention_count: np.ndarray
+    diva_hyperactivity_count: np.ndarray
+    diva_childhood_count: np.ndarray
+    diva_childhood_positive: np.ndarray
+    diva_impairment_domains: np.ndarray  # (N, 5) booléens, ordre de DIVA_IMPAIRMENT_DOMAINS
+    diva_impairment_count: np.ndarray
+    diva_meets_inattention: np.ndarray
+    diva_meets_hyperactivity: np.ndarray
+    diva_presentation: np.ndarray  # code dans PRESENTATION_LABELS
+    ef_cluster_scores: np.ndarray  # (N, 6), ordre de EF_CLUSTER_LABELS
+    ef_cluster_max: np.ndarray  # (N, 6)
+    ef_total_score: np.ndarray
+    ef_max_score: np.ndarray
+    ef_impaired_clusters: np.ndarray  # (N, 6) booléens
+    ef_severity: np.ndarray  # code dans SEVERITY_LABELS
+    positive_indicators: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.asrs_total_score)
+
+
+def responses_to_matrix(records: Iterable[Dict[str, int]]) -> np.ndarray:
+    """Construit la matrice (N × len(COLUMNS)) à partir de dictionnaires de réponses."""
+    rows = [
+        [record.get(qid, MISSING) for qid in COLUMNS]
+        for record in records
+    ]
+    return np.array(rows, dtype=np.int8).reshape(len(rows), len(COLUMNS))
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # Même opération flottante que le scoring scalaire (0 si dénominateur nul)
+    out = np.zeros(numerator.shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def score_batch(matrix) -> BatchScores:
+    """Score un lot de répondants en opérations vectorisées."""
+    m = np.asarray(matrix)
+    if m.ndim != 2 or m.shape[1] != len(COLUMNS):
+        raise ValueError(
+            f"Matrice attendue de forme (N, {len(COLUMNS)}), reçu {m.shape}"
+        )
+    answered = m >= 0
+    values = np.maximum(m, 0)
+
+    # ASRS
+    part_a = values[:, _ASRS_PART_A].sum(axis=1, dtype=np.int32)
+    part_b = values[:, _ASRS_PART_B].sum(axis=1, dtype=np.int32)
+    shaded = (m[:, _ASRS_PART_A] >= _ASRS_THRESHOLDS).sum(axis=1, dtype=np.int32)
+    screening_positive = shaded >= 4
+
+    # DIVA
+    yes = m == 1
+    ia = yes[:, _DIVA_IA].sum(axis=1, dtype=np.int32)
+    hi = yes[:, _DIVA_HI].sum(axis=1, dtype=np.int32)
+    child = yes[:, _DIVA_CHILD].sum(axis=1, dtype=np.int32)
+    domains = yes[:, _DIVA_IMP]
+    meets_ia = ia >= 5
+    meets_hi = hi >= 5
+    presentation = meets_ia.astype(np.int8) + 2 * meets_hi.astype(np.int8)
+
+    # Fonctions exécutives
+    if len(m):
+        ef_scores = np.add.reduceat(values[:, _EF], _EF_BOUNDARIES, axis=1, dtype=np.int32)
+        ef_counts = np.add.reduceat(answered[:, _EF], _EF_BOUNDARIES, axis=1, dtype=np.int32)
+    else:
+        ef_scores = np.zeros((0, len(EF_CLUSTER_LABELS)), dtype=np.int32)
+        ef_counts = ef_scores.copy()
+    ef_max = ef_counts * _EF_MAX_VALUE
+    ef_total = ef_scores.sum(axis=1, dtype=np.int32)
+    ef_max_total = ef_max.sum(axis=1, dtype=np.int32)
+    impaired = (ef_max > 0) & (_ratio(ef_scores, ef_max) >= 0.5)
+    percentage = _ratio(ef_total, ef_max_total) * 100
+    severity = (percentage >= 40).astype(np.int8) + (percentage >= 66).astype(np.int8)
+
+    positive = (
+        screening_positive.astype(np.int8)
+        + (meets_ia | meets_hi).astype(np.int8)
+        + (severity >= 1).astype(np.int8)
+    )
+
+    return BatchScores(
+        asrs_part_a_score=part_a,
+        asrs_part_a_shaded_count=shaded,
+        asrs_part_b_score=part_b,
+        asrs_total_score=part_a + part_b,
+        asrs_inattention_score=values[:, _ASRS_INATTENTION].sum(axis=1, dtype=np.int32),
+        asrs_hyperactivity_score=values[:, _ASRS_HYPERACTIVITY].sum(axis=1, dtype=np.int32),
+        asrs_screening_positive=screening_positive,
+        diva_inattention_count=ia,
+        diva_hyperactivity_count=hi,
+        diva_childhood_count=child,
+        diva_childhood_positive=child >= 2,
+        diva_impairment_domains=domains,
+        diva_impairment_count=domains.sum(axis=1, dtype=np.int32),
+        diva_meets_inattention=meets_ia,
+        diva_meets_hyperactivity=meets_hi,
+        diva_presentation=presentation,
+        ef_cluster_scores=ef_scores,
+        ef_cluster_max=ef_max,
+        ef_total_score=ef_total,
+        ef_max_score=ef_max_total,
+        ef_impaired_clusters=impaired,
+        ef_severity=severity,
+        positive_indicators=positive,
+    )
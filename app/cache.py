@@ -0,0 +1,132 @@
+"""
+Cache mémoire des évaluations globales, partagé par les routes et le scoring par lot.
+
+Les évaluations sont indexées par une empreinte canonique du jeu de réponses:
+deux dictionnaires contenant les mêmes réponses, dans n'importe quel ordre,
+partagent la même entrée. L'application crée son cache dans init_app
+(ASSESSMENT_CACHE_SIZE, ASSESSMENT_CACHE_TTL); le scoring par lot en ligne
+de commande utilise l'instance par défaut du module.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from .scoring import SCORING_PLAN, GlobalAssessment, generate_global_assessment, score_all
+
+DEFAULT_CONFIG = {
+    'ASSESSMENT_CACHE_SIZE': 1024,   # évaluations conservées par processus (0: cache désactivé)
+    'ASSESSMENT_CACHE_TTL': 3600,    # secondes avant expiration d'une évaluation (0: jamais)
+}
+
+
+def canonical_responses(responses: Dict[str, int]) -> Dict[str, int]:
+    """Réponses connues, réordonnées selon l'ordre des questionnaires."""
+    return {qid: responses[qid] for qid in SCORING_PLAN if qid in responses}
+
+
+def response_digest(responses: Dict[str, int]) -> str:
+    """Empreinte indépendante de l'ordre des clés; les identifiants inconnus sont ignorés."""
+    encoded = ",".join(
+        "" if (value := responses.get(qid)) is None else str(value)
+        for qid in SCORING_PLAN
+    )
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+def assess(responses: Dict[str, int]) -> GlobalAssessment:
+    """Évaluation globale complète, sans cache."""
+    return generate_global_assessment(*score_all(canonical_responses(responses)))
+
+
+class AssessmentCache:
+    """
+    Cache LRU borné avec expiration des entrées.
+
+    Les évaluations renvoyées sont partagées entre appelants et ne doivent
+    pas être modifiées.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # digest -> (expiration, évaluation)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, digest: str) -> Optional[GlobalAssessment]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, assessment = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[digest]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return assessment
+
+    def put(self, digest: str, assessment: GlobalAssessment) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[digest] = (expires_at, assessment)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, responses: Dict[str, int]) -> GlobalAssessment:
+        """Renvoie l'évaluation en cache ou la calcule (hors verrou) puis la mémorise."""
+        digest = response_digest(responses)
+        assessment = self.get(digest)
+        if assessment is None:
+            assessment = assess(responses)
+            self.put(digest, assessment)
+        return assessment
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Instance par défaut du scoring par lot en ligne de commande (une par processus)
+assessment_cache = AssessmentCache(DEFAULT_CONFIG['ASSESSMENT_CACHE_SIZE'], DEFAULT_CONFIG['ASSESSMENT_CACHE_TTL'])
+
+
+def init_app(app) -> AssessmentCache:
+    """Crée le cache d'évaluations de l'application (partagé par les routes et l'API)."""
+    for key, value in DEFAULT_CONFIG.items():
+        app.config.setdefault(key, value)
+    cache = AssessmentCache(
+        maxsize=int(app.config['ASSESSMENT_CACHE_SIZE']),
+        ttl=float(app.config['ASSESSMENT_CACHE_TTL']) or None,
+    )
+    app.extensions['assessment_cache'] = cache
+    return cache
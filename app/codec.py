@@ -0,0 +1,177 @@
+"""
+Codec compact des jeux de réponses.
+
+Un jeu de réponses complet tient en quelques dizaines d'octets: chaque
+question occupe un champ de largeur fixe, juste assez large pour ses
+valeurs et l'absence de réponse (ASRS 0-4: 3 bits, DIVA 0-1: 2 bits,
+fonctions exécutives 0-3: 3 bits). Le code d'un champ vaut valeur + 1,
+0 signifiant « sans réponse ».
+
+Format (version 1): un octet de version, puis les champs dans l'ordre de
+SCORING_PLAN, bit de poids fort en tête, complétés par des zéros jusqu'à
+l'octet suivant: 24 octets, 32 caractères en base64 URL.
+
+La disposition est dérivée des questionnaires; son empreinte est vérifiée
+à l'import: modifier les questions impose une nouvelle version du codec, et
+une donnée encodée dans une autre version est refusée (ValueError).
+
+Les fonctions de lot (pack_matrix, unpack_matrix) travaillent sur la
+matrice de batch_scoring (colonnes COLUMNS, MISSING = -1) et nécessitent
+NumPy.
+"""
+
+import base64
+import hashlib
+from typing import Dict, List, Tuple
+
+from .scoring import SCORING_PLAN
+
+VERSION = 1
+
+# (identifiant, largeur en bits, valeur maximale) de chaque champ
+FIELDS: Tuple[Tuple[str, int, int], ...] = tuple(
+    (qid, (spec.max_value + 1).bit_length(), spec.max_value) for qid, spec in SCORING_PLAN.items()
+)
+BITS = sum(width for _, width, _ in FIELDS)
+SIZE = 1 + (BITS + 7) // 8
+_PADDING = (SIZE - 1) * 8 - BITS
+
+# Empreinte de la disposition de chaque version publiée
+_LAYOUTS = {1: 'd1e9aa6b12332e2a'}
+
+
+def layout_fingerprint(fields=FIELDS) -> str:
+    material = ';'.join(f'{qid}:{width}' for qid, width, _ in fields)
+    return hashlib.blake2b(material.encode(), digest_size=8).hexdigest()
+
+
+if layout_fingerprint() != _LAYOUTS[VERSION]:
+    raise RuntimeError(
+        "Les questionnaires ont changé: incrémenter codec.VERSION et enregistrer "
+        f"la nouvelle disposition ({layout_fingerprint()}) dans _LAYOUTS"
+    )
+
+# Décodage: (identifiant, décalage, masque, code maximal) du champ dans l'entier
+_SHIFTS: List[Tuple[str, int, int, int]] = []
+_offset = BITS + _PADDING
+for _qid, _width, _max_value in FIELDS:
+    _offset -= _width
+    _SHIFTS.append((_qid, _offset, (1 << _width) - 1, _max_value + 1))
+del _offset, _qid, _width, _max_value
+
+
+def pack(responses: Dict[str, int]) -> bytes:
+    """
+    Encode un jeu de réponses; les identifiants inconnus sont ignorés.
+
+    ValueError si une valeur n'est pas un entier de la plage de sa question.
+    """
+    acc = 0
+    get = responses.get
+    for qid, width, max_value in FIELDS:
+        value = get(qid)
+        if value is None:
+            acc <<= width
+            continue
+        if type(value) is not int or not 0 <= value <= max_value:
+            raise ValueError(f"{qid}: valeur {value!r} hors de la plage 0-{max_value}")
+        acc = (acc << width) | (value + 1)
+    return bytes((VERSION,)) + (acc << _PADDING).to_bytes(SIZE - 1, 'big')
+
+
+def unpack(data: bytes) -> Dict[str, int]:
+    """
+    Décode un jeu de réponses (questions sans réponse absentes du dictionnaire).
+
+    ValueError si un champ dépasse la cotation maximale de sa question ou si
+    le remplissage n'est pas nul: donnée altérée, refusée en bloc.
+    """
+    if len(data) != SIZE or data[0] != VERSION:
+        raise ValueError("Jeu de réponses encodé invalide ou de version inconnue")
+    acc = int.from_bytes(data[1:], 'big')
+    if acc & ((1 << _PADDING) - 1):
+        raise ValueError("Jeu de réponses encodé invalide (remplissage non nul)")
+    responses = {}
+    for qid, shift, mask, max_code in _SHIFTS:
+        code = (acc >> shift) & mask
+        if code > max_code:
+            raise ValueError(f"Jeu de réponses encodé invalide ({qid}: code {code} hors plage)")
+        if code:
+            responses[qid] = code - 1
+    return responses
+
+
+def pack_text(responses: Dict[str, int]) -> str:
+    """Forme texte (base64 URL sans remplissage), pour cookies, URL et champs texte."""
+    return base64.urlsafe_b64encode(pack(responses)).rstrip(b'=').decode('ascii')
+
+
+def unpack_text(text: str) -> Dict[str, int]:
+    try:
+        data = base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Jeu de réponses encodé invalide") from exc
+    return unpack(data)
+
+
+# =============================================================================
+# Lots (NumPy)
+# =============================================================================
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:  # pragma: no cover - dépendance optionnelle
+        raise ImportError("L'encodage par lot nécessite NumPy (extra « batch »: poetry install --extras batch)") from exc
+    return np
+
+
+def _bit_positions(np):
+    """Pour chaque bit du flux: (colonne, poids du bit dans le code du champ)."""
+    columns = np.repeat(np.arange(len(FIELDS)), [width for _, width, _ in FIELDS])
+    weights = np.concatenate([1 << np.arange(width - 1, -1, -1) for _, width, _ in FIELDS])
+    return columns, weights.astype(np.uint8)
+
+
+def pack_matrix(matrix):
+    """
+    Encode une matrice de réponses (N × len(FIELDS), MISSING = -1, voir
+    batch_scoring) en tableau N × SIZE d'octets.
+    """
+    np = _numpy()
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[1] != len(FIELDS):
+        raise ValueError(f"Matrice N × {len(FIELDS)} attendue")
+    max_values = np.array([max_value for _, _, max_value in FIELDS])
+    if ((matrix < -1) | (matrix > max_values)).any():
+        raise ValueError("Valeur hors de la plage de sa question")
+    codes = (matrix + 1).astype(np.uint8)
+    columns, weights = _bit_positions(np)
+    bits = (codes[:, columns] & weights) != 0
+    packed = np.packbits(bits, axis=1)
+    out = np.empty((len(matrix), SIZE), dtype=np.uint8)
+    out[:, 0] = VERSION
+    out[:, 1:] = packed
+    return out
+
+
+def unpack_matrix(packed):
+    """
+    Décode un tableau N × SIZE d'octets en matrice de réponses int8 (MISSING = -1).
+
+    ValueError si un champ dépasse la cotation maximale de sa question.
+    """
+    np = _numpy()
+    packed = np.asarray(packed, dtype=np.uint8)
+    if packed.ndim != 2 or packed.shape[1] != SIZE or (packed[:, 0] != VERSION).any():
+        raise ValueError("Jeux de réponses encodés invalides ou de version inconnue")
+    bits = np.unpackbits(packed[:, 1:], axis=1, count=BITS)
+    # Recomposition des codes par produit matriciel: bits × poids de chaque bit dans son champ
+    columns, weights = _bit_positions(np)
+    recompose = np.zeros((BITS, len(FIELDS)), dtype=np.float32)
+    recompose[np.arange(BITS), columns] = weights
+    codes = (bits.astype(np.float32) @ recompose).astype(np.int8)
+    max_values = np.array([max_value for _, _, max_value in FIELDS], dtype=np.int8)
+    if (codes > max_values + 1).any():
+        raise ValueError("Jeux de réponses encodés invalides (code hors plage)")
+    return codes - 1
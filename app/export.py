@@ -0,0 +1,264 @@
+"""
+Export en masse des rapports PDF dans une archive ZIP.
+
+Usage:
+    python -m app.export reponses.jsonl -o rapports.zip [--workers 4] [--backend direct]
+
+Chaque enregistrement (JSONL ou CSV, même format que app.batch) donne un
+rapport. Le champ identifiant (--id-field, défaut "id") nomme le fichier
+dans l'archive, et le champ "completed_at" (ISO 8601) date le rapport ;
+sans lui, le rapport porte la date de début de l'export.
+
+Les rapports sont rendus en parallèle par le pool de rendu et écrits dans
+l'archive dans l'ordre où ils se terminent. Au plus `window` rendus sont en
+vol: le processus ne garde qu'un nombre borné de PDF en mémoire, quel que
+soit le nombre de rapports exportés. L'archive est produite en flux: sur un
+fichier comme dans une réponse HTTP (route /admin/export).
+"""
+
+import argparse
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import FORMATS, _decode, _open, detect_format, read_items, split_record
+from .cache import assess
+from .pdf_pool import PdfRenderPool, RenderQueueFull
+from .pdf_renderers import RENDERERS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_CONFIG = {
+    'EXPORT_TOKEN': None,   # jeton d'accès à /admin/export (None: route désactivée)
+    'EXPORT_WINDOW': None,  # rendus en vol par export (défaut: capacité du pool)
+    'EXPORT_MAX_BYTES': 64 * 1024 * 1024,  # taille maximale du lot envoyé à /admin/export
+}
+
+ERRORS_NAME = 'erreurs.txt'
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+@dataclass
+class ExportStats:
+    """Bilan d'un export; errors: (numéro d'enregistrement, message)."""
+    exported: int = 0
+    pdf_bytes: int = 0
+    elapsed: float = 0.0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def rate(self) -> float:
+        """Rapports exportés par seconde."""
+        return self.exported / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def peak_rss_kb(children: bool = False) -> Dict[str, int]:
+    """
+    Pic de mémoire résidente (Ko) du processus et, avec children, du plus
+    gros processus enfant attendu (wait). Les processus de rendu encore en
+    vie n'y sont pas comptés: children n'a de sens qu'après l'arrêt du pool.
+    """
+    if resource is None:
+        return {}
+    scale = 1024 if sys.platform == 'darwin' else 1  # octets sous macOS, Ko ailleurs
+    rss = {'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale}
+    if children:
+        rss['children'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+    return rss
+
+
+class _ChunkBuffer:
+    """Flux d'écriture non positionnable: zipfile y écrit, l'export en retire les octets."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _entry_name(record_extra: dict, id_field: str, number: int, used: set) -> str:
+    """Nom de fichier sûr et unique dans l'archive."""
+    value = record_extra.get(id_field)
+    base = _UNSAFE.sub('_', '' if value is None else str(value)).strip('._')
+    base = base[:100] or f'rapport-{number:05d}'
+    name = f'{base}.pdf'
+    suffix = 1
+    while name in used:
+        suffix += 1
+        name = f'{base}-{suffix}.pdf'
+    used.add(name)
+    return name
+
+
+def _drain(pending: dict, errors: list, return_when) -> Iterator[Tuple[str, bytes]]:
+    done, _ = wait(pending, return_when=return_when)
+    for future in done:
+        name, number = pending.pop(future)
+        try:
+            pdf, _ = future.result()
+        except Exception as exc:
+            errors.append((number, f"rendu échoué ({type(exc).__name__})"))
+            continue
+        yield name, pdf
+
+
+def render_reports(records: Iterable[Tuple[int, object]], pool: PdfRenderPool, window: int,
+                   errors: list, id_field: str = 'id',
+                   default_date: Optional[datetime] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Rend les rapports des enregistrements numérotés, (nom, pdf) dans l'ordre de fin.
+
+    Les enregistrements invalides (ou remplacés par l'erreur de décodage,
+    voir read_records) et les rendus en échec sont ajoutés à errors sous la
+    forme (numéro, message).
+    """
+    default_date = default_date or datetime.now().replace(microsecond=0)
+    pending: Dict[object, Tuple[str, int]] = {}
+    used = set()
+    for number, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            extra, responses = split_record(record)
+            completed_at = extra.get('completed_at')
+            generated_at = datetime.fromisoformat(completed_at) if completed_at else default_date
+            assessment = assess(responses)
+        except (ValueError, TypeError) as exc:
+            errors.append((number, str(exc)))
+            continue
+        name = _entry_name(extra, id_field, number, used)
+        while True:
+            if len(pending) >= window:
+                yield from _drain(pending, errors, FIRST_COMPLETED)
+            try:
+                future = pool.submit(assessment, responses, generated_at)
+                break
+            except RenderQueueFull:
+                # Pool partagé avec d'autres rendus: attendre une place
+                if pending:
+                    yield from _drain(pending, errors, FIRST_COMPLETED)
+                else:
+                    time.sleep(0.05)
+        pending[future] = (name, number)
+    while pending:
+        yield from _drain(pending, errors, FIRST_COMPLETED)
+
+
+def iter_zip(records: Iterable[Tuple[int, object]], pool: PdfRenderPool, window: int,
+             stats: ExportStats, id_field: str = 'id',
+             default_date: Optional[datetime] = None) -> Iterator[bytes]:
+    """Archive ZIP produite en flux, un bloc d'octets par rapport terminé."""
+    buffer = _ChunkBuffer()
+    errors = stats.errors
+    started = time.perf_counter()
+    # Rapports WeasyPrint déjà compressés, rendu direct non compressé: compression rapide
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for name, pdf in render_reports(records, pool, window, errors, id_field, default_date):
+            archive.writestr(name, pdf)
+            stats.exported += 1
+            stats.pdf_bytes += len(pdf)
+            yield buffer.take()
+        if errors:
+            lines = [f"Enregistrement {number}: {message}" for number, message in sorted(errors)]
+            archive.writestr(ERRORS_NAME, '\n'.join(lines) + '\n')
+    stats.elapsed = time.perf_counter() - started
+    yield buffer.take()
+
+
+def read_records(stream, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Enregistrements numérotés à partir de 1; une ligne JSON invalide est remplacée par son erreur."""
+    for number, item in enumerate(read_items(stream, fmt), 1):
+        try:
+            yield number, _decode(item, fmt)
+        except ValueError as exc:
+            yield number, exc
+
+
+def export(stream, fmt: str, sink, pool: PdfRenderPool, window: int,
+           id_field: str = 'id', default_date: Optional[datetime] = None) -> ExportStats:
+    """Écrit l'archive des rapports du flux d'enregistrements dans sink."""
+    stats = ExportStats()
+    for chunk in iter_zip(read_records(stream, fmt), pool, window, stats, id_field, default_date):
+        sink.write(chunk)
+    return stats
+
+
+def default_window(pool: PdfRenderPool) -> int:
+    """Rendus en vol: de quoi occuper tous les workers, sans dépasser la file du pool."""
+    return max(1, pool.workers) + max(0, min(pool.max_queue, pool.workers))
+
+
+def summary(stats: ExportStats, pool_stopped: bool = False) -> str:
+    """
+    Bilan d'un export sur une ligne: débit et pic de mémoire résidente.
+
+    Le pic des processus de rendu n'est indiqué que si le pool a été arrêté
+    (pool_stopped): ses processus ont alors été attendus et mesurés.
+    """
+    text = (f"{stats.exported} rapports exportés en {stats.elapsed:.2f} s "
+            f"({stats.rate:.1f} rapports/s, {stats.pdf_bytes / 1e6:.1f} Mo de PDF), {stats.failed} ignorés")
+    rss = peak_rss_kb(children=pool_stopped)
+    if rss:
+        text += f"; pic RSS {rss['self'] / 1024:.0f} Mo (export)"
+        if 'children' in rss:
+            text += f", {rss['children'] / 1024:.0f} Mo (processus de rendu)"
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m app.export',
+        description="Exporte les rapports PDF d'un fichier de réponses JSONL/CSV dans une archive ZIP.",
+    )
+    parser.add_argument('input', help="fichier d'entrée (- pour l'entrée standard)")
+    parser.add_argument('-o', '--output', required=True, help="archive ZIP produite")
+    parser.add_argument('--input-format', choices=FORMATS, help="défaut: déduit de l'extension")
+    parser.add_argument('--id-field', default='id', help="champ nommant chaque rapport (défaut: id)")
+    parser.add_argument('--workers', type=int, default=2, help="processus de rendu (0: aucun pool)")
+    parser.add_argument('--window', type=int, help="rendus en vol au plus (défaut: 2 par worker)")
+    parser.add_argument('--backend', choices=sorted(RENDERERS), default='weasyprint')
+    parser.add_argument('--embed-fonts', action='store_true')
+    parser.add_argument('--timeout', type=float, default=30.0, help="délai maximal par rendu (s)")
+    args = parser.parse_args(argv)
+
+    window = args.window or 2 * max(1, args.workers)
+    pool = PdfRenderPool(workers=args.workers, max_queue=window, timeout=args.timeout,
+                         embed_fonts=args.embed_fonts, backend=args.backend)
+    input_format = detect_format(args.input, args.input_format)
+    try:
+        with _open(args.input, 'r') as source, open(args.output, 'wb') as sink:
+            stats = export(source, input_format, sink, pool, window, args.id_field)
+    finally:
+        pool.shutdown()
+
+    for number, message in sorted(stats.errors):
+        print(f"Enregistrement {number} ignoré: {message}", file=sys.stderr)
+    print(summary(stats, pool_stopped=True), file=sys.stderr)
+    return 1 if stats.failed and not stats.exported else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,467 @@
+"""
+Métriques de l'application au format texte Prometheus (/metrics).
+
+Aucun service externe: les mesures sont tenues en mémoire du processus
+(histogrammes à seaux fixes, compteurs) et mises en forme à la lecture de
+/metrics. Sont mesurés:
+- la durée des requêtes par endpoint et méthode, et leur nombre par statut;
+- le rendu des gabarits Jinja (signaux de Flask);
+- les fonctions de scoring (score_*, generate_global_assessment), via le
+  décorateur timed;
+- le rendu des rapports PDF, par étape (html, layout, write): mesuré dans le
+  processus de rendu et renvoyé avec le PDF.
+
+Plusieurs processus (serveur préforké, python run.py serve): chaque
+processus écrit périodiquement un instantané de ses mesures dans
+METRICS_DIR, et /metrics agrège les instantanés de tous les processus
+(ceux des autres workers ont au plus METRICS_FLUSH_INTERVAL secondes de
+retard). Les instantanés des workers arrêtés sont cumulés dans un fichier
+commun: les compteurs ne décroissent pas au recyclage des workers.
+
+/metrics est réservée aux détenteurs de METRICS_TOKEN (ou du jeton
+d'administration EXPORT_TOKEN), en en-tête Authorization: Bearer; sans
+aucun jeton configuré, la route répond 404 (les mesures restent tenues).
+
+Ce module n'importe pas Flask à son chargement: le scoring, utilisé aussi
+en ligne de commande, en dépend.
+"""
+
+import atexit
+import functools
+import hmac
+import json
+import math
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+DEFAULT_CONFIG = {
+    'METRICS_ENABLED': True,         # /metrics et mesure des requêtes, gabarits et scoring
+    'METRICS_DIR': None,             # instantanés partagés entre processus (voir init_app)
+    'METRICS_FLUSH_INTERVAL': 1.0,   # secondes entre deux instantanés d'un processus
+    'METRICS_TOKEN': None,           # jeton d'accès à /metrics (EXPORT_TOKEN accepté aussi)
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seaux des histogrammes (secondes)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SCORING_BUCKETS = (1e-06, 2.5e-06, 5e-06, 1e-05, 2.5e-05, 5e-05, 0.0001, 0.00025, 0.001, 0.01)
+PDF_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+Snapshot = Dict[str, Dict[Labels, list]]
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.reset()
+
+    def reset(self) -> None:
+        """Oublie les mesures (verrou recréé: sûr après un fork)."""
+        self._lock = threading.Lock()
+        self._series: Dict[Labels, list] = {}
+
+    def _new_values(self) -> list:
+        raise NotImplementedError
+
+    def _values(self, labels: Labels) -> list:
+        values = self._series.get(labels)
+        if values is None:
+            with self._lock:
+                values = self._series.setdefault(labels, self._new_values())
+        return values
+
+    def snapshot(self) -> Dict[Labels, list]:
+        with self._lock:
+            return {labels: list(values) for labels, values in self._series.items()}
+
+    def samples(self, labels: Labels, values: list) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        """Lignes exposées d'une série: (nom, noms des labels, valeurs des labels, valeur)."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Compteur croissant par combinaison de labels."""
+
+    kind = 'counter'
+
+    def _new_values(self) -> list:
+        return [0]
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        values = self._values(labels)
+        with self._lock:
+            values[0] += amount
+
+    def samples(self, labels, values):
+        yield self.name, self.labelnames, labels, values[0]
+
+
+class Histogram(_Metric):
+    """Histogramme à seaux fixes: effectif par seau (le dernier: +Inf), puis somme."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = REQUEST_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_values(self) -> list:
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = self._values(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values[index] += 1
+            values[-1] += value
+
+    def samples(self, labels, values):
+        bucket_labels = self.labelnames + ('le',)
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), values):
+            cumulative += count
+            yield f'{self.name}_bucket', bucket_labels, labels + (_number(bound),), cumulative
+        yield f'{self.name}_sum', self.labelnames, labels, values[-1]
+        yield f'{self.name}_count', self.labelnames, labels, cumulative
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Registry:
+    """Ensemble des métriques d'un processus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> Snapshot:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self, snapshot: Snapshot) -> str:
+        """Texte d'exposition Prometheus des mesures (celles du processus ou agrégées)."""
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, values in sorted(snapshot.get(name, {}).items()):
+                for sample, names, label_values, value in metric.samples(labels, values):
+                    if names:
+                        pairs = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, label_values))
+                        sample = f'{sample}{{{pairs}}}'
+                    lines.append(f'{sample} {_number(value) if isinstance(value, float) else value}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'tdah_http_request_duration_seconds', "Durée des requêtes HTTP (session comprise).",
+    ('endpoint', 'method'), REQUEST_BUCKETS))
+REQUESTS = REGISTRY.register(Counter(
+    'tdah_http_requests_total', "Requêtes HTTP traitées, par statut.", ('endpoint', 'method', 'status')))
+TEMPLATE_SECONDS = REGISTRY.register(Histogram(
+    'tdah_template_render_seconds', "Durée du rendu des gabarits Jinja.", ('template',), REQUEST_BUCKETS))
+SCORING_SECONDS = REGISTRY.register(Histogram(
+    'tdah_scoring_seconds', "Durée des fonctions de scoring.", ('function',), SCORING_BUCKETS))
+PDF_RENDER_SECONDS = REGISTRY.register(Histogram(
+    'tdah_pdf_render_seconds', "Durée du rendu d'un rapport PDF dans le processus de rendu.",
+    ('backend',), PDF_BUCKETS))
+PDF_RENDER_PHASE_SECONDS = REGISTRY.register(Histogram(
+    'tdah_pdf_render_phase_seconds', "Durée de chaque étape du rendu PDF (html, layout, write).",
+    ('backend', 'phase'), PDF_BUCKETS))
+PDF_RENDER_LATENCY_SECONDS = REGISTRY.register(Histogram(
+    'tdah_pdf_render_latency_seconds', "Délai d'obtention d'un rapport PDF, attente dans la file comprise.",
+    ('backend',), PDF_BUCKETS))
+
+if hasattr(os, 'register_at_fork'):
+    # Un processus ne publie que ses propres mesures
+    os.register_at_fork(after_in_child=REGISTRY.reset)
+
+
+# Mesure des fonctions décorées par timed (activée par init_app)
+_timing = False
+
+
+def timed(histogram: Histogram) -> Callable:
+    """
+    Décorateur: durée de chaque appel observée dans l'histogramme, avec le
+    nom de la fonction pour label. Sans application instrumentée (ligne de
+    commande, processus de rendu), l'appel est transmis sans mesure.
+    """
+    def decorate(func):
+        name = func.__name__
+        observe = histogram.observe
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _timing:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorate
+
+
+# -- Agrégation entre processus ---------------------------------------------------
+
+_RETIRED = 'retired.json'
+
+
+def merge_snapshot(target: Snapshot, other: Snapshot) -> Snapshot:
+    """Ajoute les mesures de other à target (séries de forme différente ignorées)."""
+    for name, series in other.items():
+        merged = target.setdefault(name, {})
+        for labels, values in series.items():
+            current = merged.get(labels)
+            if current is None:
+                merged[labels] = list(values)
+            elif len(current) == len(values):
+                merged[labels] = [a + b for a, b in zip(current, values)]
+    return target
+
+
+def _encode(snapshot: Snapshot) -> dict:
+    return {name: [[list(labels), values] for labels, values in series.items()]
+            for name, series in snapshot.items()}
+
+
+def _decode(data: dict) -> Snapshot:
+    return {name: {tuple(labels): values for labels, values in series} for name, series in data.items()}
+
+
+def _read(path: str) -> Optional[Snapshot]:
+    try:
+        with open(path) as f:
+            return _decode(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path: str, snapshot: Snapshot) -> None:
+    tmp = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(_encode(snapshot), f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SnapshotDirectory:
+    """Instantanés des processus dans un répertoire partagé: <pid>-<jeton>.json."""
+
+    def __init__(self, path: str, registry: Registry, interval: float = 1.0):
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        # Aussi pour un répertoire existant: accès réservé au compte du service
+        os.chmod(path, 0o700)
+        self.path = path
+        self.registry = registry
+        self.interval = interval
+        self._start()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self) -> None:
+        # Nouveau processus: fichier propre (un pid peut être réutilisé)
+        self._file = os.path.join(self.path, f'{os.getpid()}-{secrets.token_hex(4)}.json')
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Écrit l'instantané des mesures du processus."""
+        _write(self._file, self.registry.snapshot())
+
+    def maybe_flush(self) -> None:
+        """Écrit l'instantané si le dernier date d'au moins interval secondes."""
+        now = time.monotonic()
+        if now - self._last_flush >= self.interval and self._flush_lock.acquire(blocking=False):
+            try:
+                self._last_flush = now
+                self.flush()
+            finally:
+                self._flush_lock.release()
+
+    def collect(self) -> Snapshot:
+        """
+        Mesures de tous les processus: celles du processus courant, les
+        instantanés des autres, et le cumul des processus arrêtés (leurs
+        instantanés y sont fusionnés puis supprimés).
+        """
+        import fcntl
+
+        snapshot = self.registry.snapshot()
+        with open(os.path.join(self.path, '.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired_path = os.path.join(self.path, _RETIRED)
+            retired = _read(retired_path) or {}
+            finished = []
+            for entry in os.scandir(self.path):
+                name = entry.name
+                if not name.endswith('.json') or name == _RETIRED or entry.path == self._file:
+                    continue
+                data = _read(entry.path)
+                if data is None:
+                    continue
+                pid = name.split('-', 1)[0]
+                if pid.isdigit() and _alive(int(pid)):
+                    merge_snapshot(snapshot, data)
+                else:
+                    merge_snapshot(retired, data)
+                    finished.append(entry.path)
+            if finished:
+                _write(retired_path, retired)
+                for path in finished:
+                    os.remove(path)
+        return merge_snapshot(snapshot, retired)
+
+
+class MetricsExporter:
+    """Mesures exposées par l'application: celles du processus, ou agrégées par répertoire."""
+
+    def __init__(self, registry: Registry, directory: Optional[SnapshotDirectory] = None):
+        self.registry = registry
+        self.directory = directory
+
+    def render(self) -> str:
+        if self.directory is None:
+            return self.registry.render(self.registry.snapshot())
+        return self.registry.render(self.directory.collect())
+
+    def maybe_flush(self) -> None:
+        if self.directory is not None:
+            self.directory.maybe_flush()
+
+    def flush(self) -> None:
+        """Dernier instantané (fin d'un worker)."""
+        if self.directory is not None:
+            self.directory.flush()
+
+
+# Répertoires créés par ce processus, supprimés à sa sortie
+_owned_dirs: Dict[int, str] = {}  # pid du maître -> répertoire temporaire par défaut
+
+
+def _remove_owned_dir(path: str, owner: int) -> None:
+    if os.getpid() == owner:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# -- Intégration Flask --------------------------------------------------------------
+
+_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+
+def init_app(app) -> Optional[MetricsExporter]:
+    """
+    Installe la mesure des requêtes et des gabarits et la route /metrics
+    (rien si METRICS_ENABLED est faux).
+
+    Sans METRICS_DIR, chaque processus expose ses propres mesures. Dans le
+    maître du serveur préforké (SERVER_PRELOAD), un répertoire temporaire
+    privé (mkdtemp) est créé par défaut, conservé au rechargement (SIGHUP)
+    et supprimé à l'arrêt.
+    """
+    global _timing
+    from flask import Response, abort, before_render_template, g, request, template_rendered
+
+    for key, value in DEFAULT_CONFIG.items():
+        app.config.setdefault(key, value)
+    if not app.config['METRICS_ENABLED']:
+        return None
+
+    path = app.config['METRICS_DIR']
+    if path is None and app.config.get('SERVER_PRELOAD'):
+        path = _owned_dirs.get(os.getpid())
+        if path is None:
+            # Nom imprévisible, créé en 0700: rien ne peut y avoir été déposé avant le maître
+            path = _owned_dirs[os.getpid()] = tempfile.mkdtemp(prefix='tdah-metrics-')
+            atexit.register(_remove_owned_dir, path, os.getpid())
+    directory = None
+    if path:
+        directory = SnapshotDirectory(path, REGISTRY, float(app.config['METRICS_FLUSH_INTERVAL']))
+    exporter = MetricsExporter(REGISTRY, directory)
+    app.extensions['metrics'] = exporter
+    _timing = True
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _record_request(exc):
+        # Après l'enregistrement de la session: mesurée avec la requête
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return
+        endpoint = request.endpoint or '<unmatched>'
+        method = request.method if request.method in _METHODS else 'OTHER'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint, method)
+        REQUESTS.inc(endpoint, method, str(g.pop('_metrics_status', 500)))
+        exporter.maybe_flush()
+
+    def _template_started(sender, template, context, **extra):
+        g.setdefault('_metrics_templates', []).append(time.perf_counter())
+
+    def _template_rendered(sender, template, context, **extra):
+        starts = g.get('_metrics_templates')
+        if starts:
+            TEMPLATE_SECONDS.observe(time.perf_counter() - starts.pop(), template.name or '<string>')
+
+    # Récepteurs locaux: référence forte (blinker ne garde sinon qu'une référence faible)
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_rendered, app, weak=False)
+
+    def metrics_view():
+        tokens = [str(token) for token in (app.config['METRICS_TOKEN'], app.config.get('EXPORT_TOKEN')) if token]
+        if not tokens:
+            abort(404)
+        supplied = request.headers.get('Authorization', '').encode()
+        if not any(hmac.compare_digest(supplied, f'Bearer {token}'.encode()) for token in tokens):
+            return Response("Jeton invalide.\n", 401, {'WWW-Authenticate': 'Bearer'})
+        return Response(exporter.render(), content_type=CONTENT_TYPE)
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    return exporter
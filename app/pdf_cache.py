@@ -0,0 +1,220 @@
+"""
+Cache disque des rapports PDF, adressé par le contenu.
+
+Le rendu étant déterministe, un rapport est entièrement déterminé par les
+réponses, la date de génération et la version du gabarit. La clé de cache
+est une empreinte de ces trois éléments; elle sert aussi d'ETag. La version
+du gabarit est une empreinte des sources qui influencent le document
+(moteurs de rendu, textes des questionnaires, scoring): toute modification
+invalide les anciennes entrées, qui finissent évincées.
+
+Les rapports sont des données de santé: par défaut, le cache est un
+répertoire privé (mode 0700) sous le dossier d'instance de l'application,
+et une entrée expire PDF_CACHE_TTL secondes après son rendu, quel que soit
+son usage. Les fichiers sont partagés entre processus; la date de
+modification est celle du rendu (expiration), la date d'accès, rafraîchie à
+chaque lecture, donne l'ordre LRU de l'éviction par taille.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .cache import response_digest
+
+DEFAULT_CONFIG = {
+    'PDF_CACHE_DIR': None,                    # défaut: <instance>/pdf-cache (privé)
+    'PDF_CACHE_MAX_BYTES': 256 * 1024 * 1024,  # 0: cache désactivé
+    'PDF_CACHE_TTL': 24 * 3600,               # secondes de conservation d'un rapport
+}
+
+# Intervalle minimal entre deux purges des rapports expirés (secondes)
+SWEEP_INTERVAL = 60.0
+
+# Sources dont dépend le contenu du rapport (chemins relatifs à la racine du projet)
+TEMPLATE_SOURCES = (
+    'app/pdf_generator.py', 'app/pdf_direct.py', 'app/report_content.py',
+    'app/questionnaires.py', 'app/scoring.py', 'templates/pdf/report.html', 'templates/pdf/annex.html', 'templates/pdf/report.css',
+)
+
+
+def template_version(sources=TEMPLATE_SOURCES, options: str = '') -> str:
+    """Empreinte des sources du rapport et des options de rendu."""
+    digest = hashlib.blake2b(options.encode(), digest_size=8)
+    base = Path(__file__).resolve().parent.parent
+    for name in sources:
+        digest.update(name.encode())
+        digest.update((base / name).read_bytes())
+    return digest.hexdigest()
+
+
+TEMPLATE_VERSION = template_version()
+
+
+def report_key(responses: dict, generated_at: datetime, version: str = TEMPLATE_VERSION) -> str:
+    """Clé de cache (et ETag) d'un rapport."""
+    material = f"{version}|{response_digest(responses)}|{generated_at.isoformat()}"
+    return hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+
+
+class PdfCache:
+    """Rapports PDF sur disque, bornés en âge (ttl) et en taille totale (éviction LRU)."""
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024,
+                 version: str = TEMPLATE_VERSION, ttl: float = 24 * 3600,
+                 clock=time.time):
+        self.version = version
+        self.directory = Path(directory)
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # Aussi pour un répertoire existant: accès réservé au compte du service
+        self.directory.chmod(0o700)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._size = 0
+        self.sweep()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.pdf'
+
+    def _entries(self):
+        """(chemin, taille, date de dernier accès, date du rendu) de chaque rapport en cache."""
+        for path in self.directory.glob('*/*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield path, stat.st_size, stat.st_atime, stat.st_mtime
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if stat.st_mtime + self.ttl <= self._clock():
+                path.unlink()
+                with self._lock:
+                    self.expirations += 1
+                    self._size -= stat.st_size
+                raise FileNotFoundError(path)
+            pdf = path.read_bytes()
+            # Accès rafraîchi pour l'ordre LRU; la date du rendu est conservée
+            os.utime(path, (self._clock(), stat.st_mtime))
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        if self._clock() - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+        return pdf
+
+    def put(self, key: str, pdf: bytes) -> None:
+        if len(pdf) > self.max_bytes:
+            return
+        path = self._path(key)
+        path.parent.mkdir(mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf)
+        existed = path.exists()
+        os.replace(tmp, path)
+        with self._lock:
+            if not existed:
+                self._size += len(pdf)
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+        elif self._clock() - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Supprime les rapports expirés et recalcule la taille du cache; renvoie leur nombre."""
+        now = self._clock()
+        self._last_sweep = now
+        total = 0
+        expired = 0
+        for path, size, _, rendered_at in self._entries():
+            if rendered_at + self.ttl <= now:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                expired += 1
+            else:
+                total += size
+        with self._lock:
+            self._size = total
+            self.expirations += expired
+        return expired
+
+    def _evict(self) -> None:
+        """Supprime les rapports les moins récemment lus jusqu'à 90 % de la taille maximale."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _, _ in entries)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for path, size, _, _ in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        with self._lock:
+            # La taille réelle est recalculée: d'autres processus partagent le répertoire
+            self._size = total
+            self.evictions += evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'ttl': self.ttl,
+                'template_version': self.version,
+            }
+
+
+def init_app(app) -> Optional[PdfCache]:
+    """
+    Crée le cache de rapports de l'application (None si désactivé), par
+    défaut dans <instance>/pdf-cache, répertoire privé de l'application.
+
+    La version du gabarit, qui inclut les options de rendu (moteur, polices),
+    est publiée dans app.extensions['pdf_template_version'] pour le calcul des clés.
+    """
+    for key, value in DEFAULT_CONFIG.items():
+        app.config.setdefault(key, value)
+    backend = app.config.get('PDF_BACKEND', 'weasyprint')
+    options = '' if backend == 'weasyprint' else backend
+    if backend == 'weasyprint' and app.config.get('PDF_EMBED_FONTS'):
+        options = 'fonts'
+    pool = app.extensions.get('pdf_render_pool')
+    if pool is not None and pool.output.key():
+        options += f';{pool.output.key()}'
+    version = template_version(options=options) if options else TEMPLATE_VERSION
+    max_bytes = int(app.config['PDF_CACHE_MAX_BYTES'])
+    cache = None
+    if max_bytes > 0:
+        directory = app.config['PDF_CACHE_DIR'] or os.path.join(app.instance_path, 'pdf-cache')
+        cache = PdfCache(directory, max_bytes, version, ttl=float(app.config['PDF_CACHE_TTL']))
+    app.extensions['pdf_template_version'] = version
+    app.extensions['pdf_cache'] = cache
+    return cache
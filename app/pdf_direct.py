@@ -0,0 +1,543 @@
+"""
+Rendu direct du rapport PDF, sans moteur de mise en page HTML/CSS.
+
+Le rapport n'est fait que de titres, d'encadrés et de tableaux: il est tracé
+directement avec les primitives PDF et les polices standard Helvetica
+(non intégrées, codage WinAnsi). Les sections et les textes sont ceux du
+gabarit WeasyPrint (templates/pdf/report.html), dont la mise en page reprend
+les couleurs et les proportions sans viser l'identité au pixel près.
+
+Module en Python pur: aucune dépendance système, quelques millisecondes
+par rapport.
+"""
+
+import time
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .report_content import ANNEX_CLUSTER_NAMES, ASRS_OPTIONS, DIVA_OPTIONS, EXEC_OPTIONS
+from .scoring import GlobalAssessment
+
+# Métriques Adobe des polices standard (1/1000 em), codes 32 à 255 en cp1252
+_HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584, 350,
+    556, 350, 222, 556, 333, 1000, 556, 556, 333, 1000, 667, 333, 1000, 350, 611, 350,
+    350, 222, 222, 333, 333, 350, 556, 1000, 333, 1000, 500, 333, 944, 350, 500, 667,
+    278, 333, 556, 556, 556, 556, 260, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 556, 537, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    667, 667, 667, 667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 500, 556, 556, 556, 556, 278, 278, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 584, 611, 556, 556, 556, 556, 500, 556, 500,
+)
+_HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584, 350,
+    556, 350, 278, 556, 500, 1000, 556, 556, 333, 1000, 667, 333, 1000, 350, 611, 350,
+    350, 278, 278, 500, 500, 350, 556, 1000, 333, 1000, 556, 333, 944, 350, 500, 667,
+    278, 333, 556, 556, 556, 556, 280, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 611, 556, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    722, 722, 722, 722, 722, 722, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 556, 556, 556, 556, 556, 278, 278, 278, 278,
+    611, 611, 611, 611, 611, 611, 611, 584, 611, 611, 611, 611, 611, 556, 611, 556,
+)
+
+# Ressource PDF -> (police standard, chasses indexées par octet cp1252)
+REGULAR, BOLD, ITALIC, BOLD_ITALIC = 'F1', 'F2', 'F3', 'F4'
+FONTS = {
+    REGULAR: ('Helvetica', (0,) * 32 + _HELVETICA_WIDTHS),
+    BOLD: ('Helvetica-Bold', (0,) * 32 + _HELVETICA_BOLD_WIDTHS),
+    ITALIC: ('Helvetica-Oblique', (0,) * 32 + _HELVETICA_WIDTHS),
+    BOLD_ITALIC: ('Helvetica-BoldOblique', (0,) * 32 + _HELVETICA_BOLD_WIDTHS),
+}
+
+# Caractères absents de WinAnsi
+_SUBSTITUTIONS = str.maketrans({'≥': '>=', '≤': '<=', '\u202f': ' '})
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89   # A4, en points
+MARGIN = 56.69                             # 2 cm
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+TEXT_COLOR = '#333333'
+MUTED_COLOR = '#666666'
+RESULT_STYLES = {  # classe du gabarit -> (fond, barre gauche)
+    'result-positive': ('#ffebee', '#e74c3c'),
+    'result-negative': ('#e8f5e9', '#27ae60'),
+    'result-moderate': ('#fff8e1', '#f39c12'),
+}
+SEVERITY_CLASSES = {'Élevé': 'result-positive', 'Modéré': 'result-moderate', 'Faible': 'result-negative'}
+ANSWER_STYLES = {  # cellule de réponse DIVA: (police, couleur)
+    'response-yes': (BOLD, '#e74c3c'),
+    'response-no': (REGULAR, '#27ae60'),
+}
+
+Run = Tuple[str, str]          # (texte, police)
+Line = List[Run]
+
+
+def _encode(text: str) -> bytes:
+    return text.translate(_SUBSTITUTIONS).encode('cp1252', 'replace')
+
+
+@lru_cache(maxsize=4096)
+def _advance(text: str, font: str) -> int:
+    """Chasse d'un texte en millièmes d'em; les mots du rapport se répètent d'un rendu à l'autre."""
+    widths = FONTS[font][1]
+    return sum(widths[b] for b in _encode(text))
+
+
+def _text_width(text: str, font: str, size: float) -> float:
+    return _advance(text, font) * size / 1000
+
+
+def _pdf_string(text: str) -> str:
+    """Chaîne PDF littérale; les octets cp1252 sont transportés tels quels (latin-1)."""
+    data = _encode(text).replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+    return '(' + data.decode('latin-1') + ')'
+
+
+@lru_cache(maxsize=64)
+def _rgb(color: str) -> str:
+    return ' '.join(f'{int(color[i:i + 2], 16) / 255:.3f}' for i in (1, 3, 5))
+
+
+def _wrap(runs: Sequence[Run], size: float, width: float) -> List[Line]:
+    """Découpe des segments (texte, police) en lignes; coupe aux espaces, '\\n' force un retour."""
+    lines: List[Line] = [[]]
+    line_width = 0.0
+    pending_space = False
+    for text, font in runs:
+        for p, paragraph in enumerate(text.split('\n')):
+            if p:
+                lines.append([])
+                line_width, pending_space = 0.0, False
+            for i, word in enumerate(paragraph.split(' ')):
+                if i:
+                    pending_space = True
+                if not word:
+                    continue
+                word_width = _text_width(word, font, size)
+                space = _text_width(' ', font, size) if lines[-1] and pending_space else 0.0
+                if space and line_width + space + word_width > width:
+                    lines.append([])
+                    line_width, space = 0.0, 0.0
+                segment = ' ' + word if space else word
+                line = lines[-1]
+                if line and line[-1][1] == font:
+                    line[-1] = (line[-1][0] + segment, font)
+                else:
+                    line.append((segment, font))
+                line_width += space + word_width
+                pending_space = False
+    return lines
+
+
+def _line_width(line: Line, size: float) -> float:
+    return sum(_text_width(text, font, size) for text, font in line)
+
+
+class _Layout:
+    """Pages en cours de tracé: curseur vertical, sauts de page, primitives."""
+
+    def __init__(self):
+        self.pages: List[List[str]] = []
+        self._new_page()
+
+    def _new_page(self) -> None:
+        self.ops: List[str] = []
+        self.pages.append(self.ops)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    @property
+    def at_top(self) -> bool:
+        return self.y >= PAGE_HEIGHT - MARGIN
+
+    def page_break(self) -> None:
+        if not self.at_top:
+            self._new_page()
+
+    def ensure(self, height: float) -> None:
+        """Passe à la page suivante si `height` points ne tiennent plus."""
+        if self.y - height < MARGIN and not self.at_top:
+            self._new_page()
+
+    def space(self, height: float) -> None:
+        if not self.at_top:
+            self.y -= height
+
+    # Primitives
+
+    def rect(self, x: float, y: float, w: float, h: float, fill: Optional[str] = None,
+             stroke: Optional[str] = None, line_width: float = 0.75) -> None:
+        """Rectangle dont (x, y) est le coin supérieur gauche."""
+        ops = self.ops
+        if fill:
+            ops.append(f'{_rgb(fill)} rg {x:.2f} {y - h:.2f} {w:.2f} {h:.2f} re f')
+        if stroke:
+            ops.append(f'{_rgb(stroke)} RG {line_width:.2f} w {x:.2f} {y - h:.2f} {w:.2f} {h:.2f} re S')
+
+    def hline(self, x: float, y: float, w: float, color: str, line_width: float) -> None:
+        self.ops.append(f'{_rgb(color)} RG {line_width:.2f} w {x:.2f} {y:.2f} m {x + w:.2f} {y:.2f} l S')
+
+    def text_lines(self, lines: Sequence[Line], x: float, y: float, size: float, leading: float,
+                   color: str, width: float = 0.0, align: str = 'left') -> None:
+        """Lignes dont `y` est le haut de la première."""
+        ops = self.ops
+        ops.append(f'{_rgb(color)} rg')
+        baseline = y - size * 0.78 - (leading - size) / 2
+        for line in lines:
+            if line:
+                offset = 0.0
+                if align == 'center':
+                    offset = (width - _line_width(line, size)) / 2
+                parts = [f'BT {x + offset:.2f} {baseline:.2f} Td']
+                for text, font in line:
+                    parts.append(f'/{font} {size:g} Tf {_pdf_string(text)} Tj')
+                parts.append('ET')
+                ops.append(' '.join(parts))
+            baseline -= leading
+
+    # Blocs
+
+    def paragraph(self, runs: Sequence[Run], size: float = 11, color: str = TEXT_COLOR,
+                  align: str = 'left', space_after: float = 8, leading_ratio: float = 1.4) -> None:
+        leading = size * leading_ratio
+        lines = _wrap(runs, size, CONTENT_WIDTH)
+        # Les paragraphes longs peuvent se poursuivre sur la page suivante
+        while lines:
+            self.ensure(leading)
+            fit = max(1, int((self.y - MARGIN) // leading))
+            chunk, lines = lines[:fit], lines[fit:]
+            self.text_lines(chunk, MARGIN, self.y, size, leading, color, CONTENT_WIDTH, align)
+            self.y -= len(chunk) * leading
+        self.y -= space_after
+
+    def heading(self, text: str, level: int, align: str = 'left', rule: bool = True) -> None:
+        size, color, margin_top, rule_color, rule_width = {
+            1: (18, '#2c3e50', 12, '#3498db', 2.25),
+            2: (14, '#2980b9', 15, '#bdc3c7', 0.75),
+            3: (12, '#34495e', 11, None, 0),
+        }[level]
+        leading = size * 1.25
+        lines = _wrap([(text, BOLD)], size, CONTENT_WIDTH)
+        padding = 7.5 if level == 1 else 3.75
+        # Un titre ne reste pas seul en bas de page
+        self.ensure(len(lines) * leading + padding + 60)
+        self.space(margin_top)
+        self.text_lines(lines, MARGIN, self.y, size, leading, color, CONTENT_WIDTH, align)
+        self.y -= len(lines) * leading + padding
+        if rule and rule_color:
+            self.hline(MARGIN, self.y, CONTENT_WIDTH, rule_color, rule_width)
+        self.y -= 8
+
+    def box(self, paragraphs: Sequence[Tuple[Sequence[Run], float, str]], fill: str,
+            border: Optional[str] = None, border_width: float = 0.75, bar: Optional[str] = None,
+            padding: Tuple[float, float] = (11.25, 11.25), margin: float = 11) -> None:
+        """Encadré: paragraphes (segments, taille, couleur) sur fond coloré."""
+        pad_y, pad_x = padding
+        inner = CONTENT_WIDTH - 2 * pad_x - (3 if bar else 0)
+        wrapped = [(_wrap(runs, size, inner), size, color) for runs, size, color in paragraphs]
+        gap = 6
+        height = 2 * pad_y + sum(len(lines) * size * 1.4 for lines, size, _ in wrapped) \
+            + gap * (len(wrapped) - 1)
+        self.ensure(height + margin)
+        self.space(margin / 2)
+        top = self.y
+        self.rect(MARGIN, top, CONTENT_WIDTH, height, fill=fill, stroke=border, line_width=border_width)
+        if bar:
+            self.rect(MARGIN, top, 3, height, fill=bar)
+        y = top - pad_y
+        x = MARGIN + pad_x + (3 if bar else 0)
+        for lines, size, color in wrapped:
+            self.text_lines(lines, x, y, size, size * 1.4, color, inner)
+            y -= len(lines) * size * 1.4 + gap
+        self.y = top - height - margin / 2
+
+    def table(self, columns: Sequence[float], header: Sequence[str],
+              rows: Sequence[Sequence[object]], size: float = 10) -> None:
+        """
+        Tableau à largeurs de colonnes relatives; une cellule est un texte
+        ou un tuple (texte, police, couleur). L'en-tête est répété après un
+        saut de page.
+        """
+        widths = [CONTENT_WIDTH * c for c in columns]
+        pad = 6
+        leading = size * 1.4
+
+        def layout_row(cells, header_row=False):
+            wrapped = []
+            for cell, width in zip(cells, widths):
+                if isinstance(cell, tuple):
+                    text, font, color = cell
+                else:
+                    text, font, color = str(cell), REGULAR, TEXT_COLOR
+                if header_row:
+                    font, color = BOLD, '#ffffff'
+                wrapped.append((_wrap([(text, font)], size, width - 2 * pad), color))
+            height = max(len(lines) for lines, _ in wrapped) * leading + 2 * pad
+            return wrapped, height
+
+        def draw_row(wrapped, height, fill):
+            x = MARGIN
+            top = self.y
+            for (lines, color), width in zip(wrapped, widths):
+                self.rect(x, top, width, height, fill=fill, stroke='#dddddd')
+                self.text_lines(lines, x + pad, top - pad, size, leading, color, width - 2 * pad)
+                x += width
+            self.y -= height
+
+        head = layout_row(header, header_row=True)
+        body = [layout_row(row) for row in rows]
+        first_height = body[0][1] if body else 0
+        self.ensure(head[1] + first_height + 11)
+        self.space(5.5)
+        draw_row(*head, '#3498db')
+        for index, (wrapped, height) in enumerate(body):
+            if self.y - height < MARGIN:
+                self._new_page()
+                draw_row(*head, '#3498db')
+            # tr:nth-child(even) du gabarit: l'en-tête est la première ligne
+            draw_row(wrapped, height, '#f9f9f9' if index % 2 == 0 else '#ffffff')
+        self.y -= 11
+
+
+def _serialize(pages: List[bytes], generated_at: datetime, compress: bool = True) -> bytes:
+    """
+    Assemble le document: catalogue, pages, polices standard, métadonnées.
+
+    Les ressources (polices) forment un objet unique référencé par toutes les
+    pages; avec compress, les flux de contenu sont compressés (FlateDecode).
+    """
+    font_ids = {name: 3 + i for i, name in enumerate(FONTS)}
+    resources_id = 3 + len(FONTS)
+    info_id = resources_id + 1
+    first_page_id = info_id + 1
+    page_ids = [first_page_id + 2 * i for i in range(len(pages))]
+
+    objects: Dict[int, bytes] = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        2: ('<< /Type /Pages /Kids [' + ' '.join(f'{i} 0 R' for i in page_ids)
+            + f'] /Count {len(pages)} >>').encode(),
+    }
+    for name, object_id in font_ids.items():
+        objects[object_id] = (
+            f'<< /Type /Font /Subtype /Type1 /BaseFont /{FONTS[name][0]} '
+            '/Encoding /WinAnsiEncoding >>'
+        ).encode()
+    stamp = generated_at.strftime('D:%Y%m%d%H%M%S')
+    title = _pdf_string("Rapport d'Auto-Évaluation TDAH Adulte")
+    objects[info_id] = (
+        f"<< /Title {title} /Producer (TDAH - rendu direct) "
+        f"/CreationDate ({stamp}) /ModDate ({stamp}) >>"
+    ).encode('latin-1')
+    objects[resources_id] = (
+        '<< /Font << ' + ' '.join(f'/{n} {i} 0 R' for n, i in font_ids.items()) + ' >> >>'
+    ).encode()
+    for page_id, stream in zip(page_ids, pages):
+        objects[page_id] = (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+            f'/Resources {resources_id} 0 R /Contents {page_id + 1} 0 R >>'
+        ).encode()
+        if compress:
+            stream = zlib.compress(stream, 6)
+            header = b'<< /Length %d /Filter /FlateDecode >>' % len(stream)
+        else:
+            header = b'<< /Length %d >>' % len(stream)
+        objects[page_id + 1] = header + b'\nstream\n' + stream + b'\nendstream'
+
+    out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for object_id in range(1, len(objects) + 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % object_id + objects[object_id] + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, info_id, xref)
+    return bytes(out)
+
+
+def _result_box(layout: _Layout, css_class: str, runs: Sequence[Run]) -> None:
+    fill, bar = RESULT_STYLES[css_class]
+    layout.box([(runs, 11, TEXT_COLOR)], fill=fill, bar=bar, padding=(7.5, 11.25))
+
+
+def _answer_rows(questions, responses: dict, options: dict, highlight: bool) -> List[List[object]]:
+    rows = []
+    for q in questions:
+        val = responses.get(q.id, 0)
+        label = options.get(val, "Non répondu")
+        if highlight:
+            font, color = ANSWER_STYLES["response-yes" if val == 1 else "response-no"]
+            rows.append([q.text, (label, font, color)])
+        else:
+            rows.append([q.text, label])
+    return rows
+
+
+def _draw_report(layout: _Layout, assessment: GlobalAssessment, responses: dict,
+                 questions: dict, generated_at: datetime) -> None:
+    asrs, diva, exec_func = assessment.asrs, assessment.diva, assessment.exec_functions
+
+    layout.heading("Rapport d'Auto-Évaluation TDAH Adulte", 1, align='center')
+    layout.paragraph([(f"Document généré le {generated_at.strftime('%d/%m/%Y à %H:%M')}", REGULAR)],
+                     align='center', space_after=14)
+
+    layout.box([
+        ([("AVERTISSEMENT IMPORTANT", BOLD)], 10, TEXT_COLOR),
+        ([("Ce document est un outil d'AUTO-ÉVALUATION et NE CONSTITUE PAS un diagnostic médical. "
+           "Seul un professionnel de santé qualifié (psychiatre, neurologue) peut établir un diagnostic "
+           "de TDAH après une évaluation clinique complète. Ce rapport est destiné à faciliter la "
+           "discussion avec votre professionnel de santé.", REGULAR)], 10, TEXT_COLOR),
+    ], fill='#fff3cd', border='#ffc107', margin=15)
+
+    layout.box([
+        ([("Synthèse des Résultats", BOLD)], 14, '#2980b9'),
+        ([(assessment.summary, REGULAR)], 11, TEXT_COLOR),
+        ([("Recommandation:", BOLD), (" " + assessment.clinical_recommendation, REGULAR)], 11, TEXT_COLOR),
+    ], fill='#e8f4f8', border='#3498db', border_width=1.5, padding=(15, 15), margin=15)
+
+    layout.heading("1. ASRS v1.1 - Échelle d'auto-évaluation OMS", 2)
+    _result_box(layout, 'result-positive' if asrs.screening_positive else 'result-negative', [
+        ("Résultat du dépistage:", BOLD),
+        (f" {'POSITIF' if asrs.screening_positive else 'NÉGATIF'} "
+         f"({asrs.part_a_shaded_count}/6 critères de la Partie A atteints, seuil ≥4)", REGULAR),
+    ])
+    layout.table((0.6, 0.2, 0.2), ("Mesure", "Score", "Maximum"), [
+        ["Partie A (Screener)", asrs.part_a_score, 24],
+        ["Partie B (Complémentaire)", asrs.part_b_score, 48],
+        [("Score Total", BOLD, TEXT_COLOR), (str(asrs.total_score), BOLD, TEXT_COLOR), ("72", BOLD, TEXT_COLOR)],
+        ["Sous-score Inattention", asrs.inattention_score, 36],
+        ["Sous-score Hyperactivité/Impulsivité", asrs.hyperactivity_score, 36],
+    ])
+    layout.paragraph([(asrs.interpretation, ITALIC)])
+
+    layout.heading("2. Évaluation selon les critères DSM-5", 2)
+    meets = diva.meets_inattention_criteria or diva.meets_hyperactivity_criteria
+    _result_box(layout, 'result-positive' if meets else 'result-negative', [
+        ("Présentation suggérée:", BOLD), (" " + diva.presentation_type, REGULAR),
+    ])
+    layout.table((0.4, 0.3, 0.3), ("Critère", "Résultat", "Seuil DSM-5"), [
+        ["A1 - Inattention", f"{diva.inattention_count}/9 symptômes", "≥5 requis"],
+        ["A2 - Hyperactivité/Impulsivité", f"{diva.hyperactivity_count}/9 symptômes", "≥5 requis"],
+        ["B - Début avant 12 ans", 'Oui' if diva.childhood_positive else 'Non confirmé', "Requis"],
+        ["C/D - Retentissement", f"{len(diva.impairment_domains)} domaine(s)", "≥2 domaines"],
+    ])
+    if diva.impairment_domains:
+        layout.paragraph([("Domaines impactés:", BOLD), (" " + ", ".join(diva.impairment_domains), REGULAR)])
+
+    layout.heading("3. Évaluation des Fonctions Exécutives", 2)
+    _result_box(layout, SEVERITY_CLASSES[exec_func.severity], [
+        ("Niveau de difficulté global:", BOLD),
+        (f" {exec_func.severity} (Score: {exec_func.total_score}/{exec_func.max_score})", REGULAR),
+    ])
+    layout.table((0.4, 0.2, 0.2, 0.2), ("Cluster", "Score", "Maximum", "%"), [
+        [name, score, max_score, f"{round((score / max_score * 100) if max_score > 0 else 0)}%"]
+        for name, (score, max_score) in exec_func.cluster_scores.items()
+    ])
+    if exec_func.most_impaired_clusters:
+        layout.paragraph([("Domaines les plus impactés:", BOLD),
+                          (" " + ", ".join(exec_func.most_impaired_clusters), REGULAR)])
+    layout.paragraph([(exec_func.interpretation, ITALIC)])
+
+    layout.box([
+        ([("Note pour le clinicien:", BOLD_ITALIC)], 11, TEXT_COLOR),
+        ([("Cette auto-évaluation utilise trois outils complémentaires: l'ASRS v1.1 (OMS/Harvard), "
+           "une évaluation structurée basée sur les critères DSM-5, et une évaluation des fonctions "
+           "exécutives. Les résultats doivent être interprétés dans le contexte d'une évaluation "
+           "clinique complète incluant l'histoire développementale, les comorbidités possibles, "
+           "et l'exclusion de diagnostics différentiels.", ITALIC)], 11, TEXT_COLOR),
+    ], fill='#f8f9fa', border='#dee2e6', margin=15)
+
+    # Annexes
+    layout.page_break()
+    layout.heading("Annexes - Réponses Détaillées", 1)
+    layout.heading("A. ASRS v1.1 - Réponses complètes", 2)
+    asrs_questions = questions['asrs']
+    layout.heading("Partie A (Screener)", 3)
+    layout.table((0.7, 0.3), ("Question", "Réponse"), _answer_rows(
+        [q for q in asrs_questions if q.subcategory == 'part_a'], responses, ASRS_OPTIONS, False))
+    layout.heading("Partie B (Questions supplémentaires)", 3)
+    layout.table((0.7, 0.3), ("Question", "Réponse"), _answer_rows(
+        [q for q in asrs_questions if q.subcategory == 'part_b'], responses, ASRS_OPTIONS, False))
+
+    layout.heading("B. Critères DSM-5 - Réponses complètes", 2)
+    for title, key, first_column, second_column in (
+        ("Critères d'Inattention (A1)", 'diva_inattention', "Critère", "Réponse"),
+        ("Critères d'Hyperactivité-Impulsivité (A2)", 'diva_hyperactivity', "Critère", "Réponse"),
+        ("Symptômes dans l'enfance", 'diva_childhood', "Question", "Réponse"),
+        ("Retentissement fonctionnel", 'diva_impairment', "Domaine", "Impact"),
+    ):
+        layout.heading(title, 3)
+        layout.table((0.8, 0.2), (first_column, second_column),
+                     _answer_rows(questions[key], responses, DIVA_OPTIONS, True))
+
+    layout.heading("C. Fonctions Exécutives - Réponses complètes", 2)
+    layout.table((0.25, 0.5, 0.25), ("Cluster", "Item", "Réponse"), [
+        [ANNEX_CLUSTER_NAMES.get(q.category, q.category), q.text,
+         EXEC_OPTIONS.get(responses.get(q.id, 0), "Non répondu")]
+        for q in questions['exec_functions']
+    ])
+
+    # Références
+    layout.ensure(120)
+    layout.space(22)
+    layout.hline(MARGIN, layout.y, CONTENT_WIDTH, '#dddddd', 0.75)
+    layout.y -= 11
+    layout.heading("Références scientifiques", 3, rule=False)
+    references = (
+        [("1. Kessler, R.C., et al. (2005). The World Health Organization Adult ADHD Self-Report "
+          "Scale (ASRS). ", REGULAR), ("Psychological Medicine", ITALIC), (", 35(2), 245-256.", REGULAR)],
+        [("2. American Psychiatric Association. (2013). ", REGULAR),
+         ("Diagnostic and Statistical Manual of Mental Disorders", ITALIC), (" (5th ed.).", REGULAR)],
+        [("3. Kooij, J.J.S., et al. (2010). DIVA 2.0: Diagnostic Interview for ADHD in Adults. "
+          "DIVA Foundation.", REGULAR)],
+        [("4. Brown, T.E. (2013). A New Understanding of ADHD in Children and Adults: Executive "
+          "Function Impairments. Routledge.", REGULAR)],
+    )
+    for runs in references:
+        layout.paragraph(runs, size=9, color=MUTED_COLOR, space_after=3)
+    layout.paragraph([("Document généré automatiquement - Ne constitue pas un diagnostic médical", ITALIC)],
+                     size=9, color=MUTED_COLOR)
+
+
+def render_report(assessment: GlobalAssessment, responses: dict, questions: dict,
+                  generated_at: Optional[datetime] = None,
+                  timings: Optional[Dict[str, float]] = None, compress: bool = True) -> bytes:
+    """
+    Rapport PDF tracé directement; mêmes arguments et même déterminisme que
+    pdf_generator.generate_pdf_report. Étapes mesurées: layout, write.
+    """
+    if generated_at is None:
+        generated_at = datetime.now()
+    start = time.perf_counter()
+    layout = _Layout()
+    _draw_report(layout, assessment, responses, questions, generated_at)
+
+    # Pied de page « Page n / N », une fois le nombre de pages connu
+    total = len(layout.pages)
+    for number, ops in enumerate(layout.pages, 1):
+        label = f"Page {number} / {total}"
+        width = _text_width(label, REGULAR, 9)
+        ops.append(f'{_rgb(MUTED_COLOR)} rg BT {(PAGE_WIDTH - width) / 2:.2f} {MARGIN / 2:.2f} Td '
+                   f'/{REGULAR} 9 Tf {_pdf_string(label)} Tj ET')
+    layout_done = time.perf_counter()
+
+    pdf = _serialize(['\n'.join(ops).encode('latin-1') for ops in layout.pages], generated_at, compress)
+    if timings is not None:
+        timings['layout'] = layout_done - start
+        timings['write'] = time.perf_counter() - layout_done
+    return pdf
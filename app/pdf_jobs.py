@@ -0,0 +1,503 @@
+"""
+Rendus PDF asynchrones: soumission, suivi et téléchargement différé.
+
+Un job est soumis au pool de rendu et son identifiant est renvoyé
+immédiatement. Le PDF terminé est conservé dans un stockage borné en taille
+jusqu'à expiration de sa durée de vie:
+- "memory": état des jobs et PDF dans la mémoire du processus, qui seul
+  peut répondre sur ses jobs (serveur de développement, un seul worker);
+- "disk": état des jobs (<id>.json) et PDF (<id>.pdf) dans un répertoire
+  privé, partagé par tous les processus qui l'utilisent: un job soumis à un
+  worker du serveur préforké peut être suivi et téléchargé depuis un autre.
+  Le système de fichiers sert d'index; aucun état n'est gardé en mémoire.
+"""
+
+import json
+import logging
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'PDF_JOB_TTL': 600,                  # secondes de conservation d'un PDF terminé
+    'PDF_JOB_STORE': None,               # "memory" ou "disk" (défaut: disk sous le serveur préforké)
+    'PDF_JOB_DIR': None,                 # stockage disque, défaut: <instance>/pdf-jobs (privé)
+    'PDF_JOB_MAX_BYTES': 64 * 1024 * 1024,
+    'PDF_JOB_MAX_JOBS': 1000,            # jobs suivis au plus (les plus anciens oubliés à la purge)
+}
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+EXPIRED = 'expired'
+
+# Intervalle minimal entre deux purges des jobs expirés (secondes)
+SWEEP_INTERVAL = 10.0
+
+# Identifiants acceptés par le stockage disque (secrets.token_urlsafe): pas de chemin
+_JOB_ID = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+
+@dataclass
+class PdfJob:
+    """État d'un rendu asynchrone."""
+    id: str
+    status: str
+    created_at: float
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    size: int = 0
+    error: Optional[str] = None
+    owner: int = 0  # pid du processus qui suit le rendu
+
+
+def _private_dir(directory: str) -> Path:
+    path = Path(directory)
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # Aussi pour un répertoire existant: accès réservé au compte du service
+    path.chmod(0o700)
+    return path
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MemoryJobTable:
+    """État des jobs dans la mémoire du processus."""
+
+    shared = False
+
+    def __init__(self):
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, job: PdfJob) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def trim(self, max_jobs: int) -> list:
+        """Oublie les jobs les plus anciens au-delà de max_jobs; renvoie leurs identifiants."""
+        dropped = []
+        with self._lock:
+            while len(self._jobs) > max_jobs:
+                old_id, _ = self._jobs.popitem(last=False)
+                dropped.append(old_id)
+        return dropped
+
+    def get(self, job_id: str) -> Optional[PdfJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def save(self, job: PdfJob) -> None:
+        with self._lock:
+            if job.id in self._jobs:
+                self._jobs[job.id] = job
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def jobs(self, created_before: Optional[float] = None) -> List[PdfJob]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if created_before is None:
+            return jobs
+        return [job for job in jobs if job.created_at <= created_before]
+
+
+class DiskJobTable:
+    """
+    État des jobs dans un répertoire partagé, un fichier JSON par job. La
+    date de modification d'un fichier est la date de création du job: les
+    plus anciens se trouvent par un parcours du répertoire, sans lecture.
+    """
+
+    shared = True
+
+    def __init__(self, directory: str):
+        self.directory = _private_dir(directory)
+
+    def _path(self, job_id: str) -> Optional[Path]:
+        if not _JOB_ID.fullmatch(job_id):
+            return None
+        return self.directory / f'{job_id}.json'
+
+    def add(self, job: PdfJob) -> None:
+        self.save(job)
+
+    def _entries(self) -> list:
+        """(date de création, identifiant) des jobs enregistrés."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.name[:-len('.json')]))
+                except FileNotFoundError:
+                    continue
+        return entries
+
+    def trim(self, max_jobs: int) -> list:
+        entries = self._entries()
+        if len(entries) <= max_jobs:
+            return []
+        entries.sort()
+        dropped = [job_id for _, job_id in entries[:len(entries) - max_jobs]]
+        for job_id in dropped:
+            self.delete(job_id)
+        return dropped
+
+    def _load(self, path: Path) -> Optional[PdfJob]:
+        try:
+            return PdfJob(**json.loads(path.read_bytes()))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    def get(self, job_id: str) -> Optional[PdfJob]:
+        path = self._path(job_id)
+        return self._load(path) if path is not None else None
+
+    def save(self, job: PdfJob) -> None:
+        path = self._path(job.id)
+        _write_atomic(path, json.dumps(asdict(job)).encode())
+        os.utime(path, (job.created_at, job.created_at))
+
+    def delete(self, job_id: str) -> None:
+        path = self._path(job_id)
+        if path is not None:
+            _unlink(path)
+
+    def jobs(self, created_before: Optional[float] = None) -> List[PdfJob]:
+        """Jobs enregistrés (seuls les fichiers créés avant created_before sont lus)."""
+        jobs = []
+        for created_at, job_id in self._entries():
+            if created_before is None or created_at <= created_before:
+                job = self.get(job_id)
+                if job is not None:
+                    jobs.append(job)
+        return jobs
+
+
+class MemoryResultStore:
+    """PDF conservés en mémoire, les plus anciens évincés au-delà de max_bytes."""
+
+    shared = False
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, job_id: str, pdf: bytes) -> list:
+        """Stocke un PDF et renvoie les identifiants évincés."""
+        evicted = []
+        with self._lock:
+            self._data[job_id] = pdf
+            self._size += len(pdf)
+            while self._size > self.max_bytes and len(self._data) > 1:
+                old_id, old = self._data.popitem(last=False)
+                self._size -= len(old)
+                evicted.append(old_id)
+        return evicted
+
+    def get(self, job_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self._data.get(job_id)
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            pdf = self._data.pop(job_id, None)
+            if pdf is not None:
+                self._size -= len(pdf)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+class DiskResultStore:
+    """
+    PDF écrits dans un répertoire partagé, les plus anciens évincés au-delà
+    de max_bytes; l'index est le contenu du répertoire (tous processus).
+    """
+
+    shared = True
+
+    def __init__(self, max_bytes: int, directory: str):
+        self.max_bytes = max_bytes
+        self.directory = _private_dir(directory)
+
+    def _path(self, job_id: str) -> Optional[Path]:
+        if not _JOB_ID.fullmatch(job_id):
+            return None
+        return self.directory / f'{job_id}.pdf'
+
+    def _entries(self) -> list:
+        """(mtime, taille, identifiant) des PDF stockés."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pdf'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.name[:-len('.pdf')]))
+        return entries
+
+    def put(self, job_id: str, pdf: bytes) -> list:
+        """Stocke un PDF et renvoie les identifiants évincés."""
+        _write_atomic(self._path(job_id), pdf)
+        entries = self._entries()
+        size = sum(entry[1] for entry in entries)
+        evicted = []
+        for _, old_size, old_id in sorted(entries):
+            if size <= self.max_bytes or len(entries) - len(evicted) <= 1:
+                break
+            if old_id == job_id:
+                continue
+            _unlink(self._path(old_id))
+            size -= old_size
+            evicted.append(old_id)
+        return evicted
+
+    def get(self, job_id: str) -> Optional[bytes]:
+        path = self._path(job_id)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, job_id: str) -> None:
+        path = self._path(job_id)
+        if path is not None:
+            _unlink(path)
+
+    @property
+    def size(self) -> int:
+        return sum(entry[1] for entry in self._entries())
+
+
+class PdfJobManager:
+    """
+    Suit les rendus soumis au pool et expose leurs résultats jusqu'à expiration.
+
+    Le rendu d'un job est suivi par le processus qui l'a soumis; avec une
+    table et un stockage partagés (disk), tout processus peut en lire l'état
+    et le PDF. Un job resté en attente après la fin de son processus est
+    signalé en échec (WorkerLost).
+    """
+
+    def __init__(self, pool, store, ttl: float = 600, max_jobs: int = 1000,
+                 clock: Callable[[], float] = time.time, cache=None, table=None):
+        self.pool = pool
+        self.store = store
+        self.table = table if table is not None else MemoryJobTable()
+        self.cache = cache
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._clock = clock
+        self._last_sweep = clock()
+
+    @property
+    def shared(self) -> bool:
+        """Vrai si les jobs sont visibles de tous les processus (serveur préforké)."""
+        return self.table.shared and self.store.shared
+
+    def submit(self, assessment, responses: dict, generated_at: Optional[datetime] = None,
+               cache_key: Optional[str] = None) -> PdfJob:
+        """
+        Soumet un rendu; peut lever RenderQueueFull comme le pool.
+
+        Avec une clé de cache, un rapport déjà rendu est repris sans passer
+        par le pool, et un nouveau rendu est mémorisé à la fin du job.
+        """
+        now = self._clock()
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+        job = PdfJob(id=secrets.token_urlsafe(16), status=PENDING, created_at=now, owner=os.getpid())
+        self.table.add(job)
+        if self.cache is None:
+            cache_key = None
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            future = Future()
+            future.set_result((cached, 0.0))
+            cache_key = None
+        else:
+            try:
+                future = self.pool.submit(assessment, responses, generated_at)
+            except Exception:
+                self.table.delete(job.id)
+                raise
+        future.add_done_callback(lambda f: self._finish(job, f, cache_key))
+        return job
+
+    def _finish(self, job: PdfJob, future, cache_key: Optional[str] = None) -> None:
+        now = self._clock()
+        try:
+            pdf, _ = future.result()
+        except Exception as exc:
+            self._fail(job, type(exc).__name__, now)
+            return
+        try:
+            if cache_key is not None:
+                self.cache.put(cache_key, pdf)
+            # PDF stocké avant l'état: un job lu « done » a toujours son fichier
+            evicted = self.store.put(job.id, pdf)
+            job.size = len(pdf)
+            job.finished_at = now
+            job.expires_at = now + self.ttl
+            job.status = DONE
+            self.table.save(job)
+            for old_id in evicted:
+                old = self.table.get(old_id)
+                if old is not None and old.status == DONE:
+                    old.status = EXPIRED
+                    self.table.save(old)
+        except Exception as exc:
+            # Disque plein, droits...: le job ne doit pas rester « pending » pour les clients qui l'interrogent
+            logger.exception("Enregistrement du job PDF %s échoué", job.id)
+            try:
+                self.store.delete(job.id)
+            except OSError:
+                pass
+            self._fail(job, f"{type(exc).__name__}: enregistrement du rapport impossible", now)
+
+    def _fail(self, job: PdfJob, error: str, now: float) -> None:
+        job.status = FAILED
+        job.error = error
+        job.size = 0
+        job.finished_at = now
+        job.expires_at = now + self.ttl
+        try:
+            self.table.save(job)
+        except Exception:
+            logger.exception("État du job PDF %s non enregistré", job.id)
+
+    def get(self, job_id: str) -> Optional[PdfJob]:
+        job = self.table.get(job_id)
+        if job is None:
+            return None
+        if job.status == PENDING and job.owner != os.getpid() and not _alive(job.owner):
+            # Processus arrêté avant la fin du rendu (worker tué, serveur redémarré)
+            now = self._clock()
+            job.status = FAILED
+            job.error = 'WorkerLost'
+            job.finished_at = now
+            job.expires_at = now + self.ttl
+            self.table.save(job)
+        elif job.expires_at is not None and job.expires_at <= self._clock() and job.status != EXPIRED:
+            self._expire(job)
+        return job
+
+    def result(self, job_id: str) -> Optional[bytes]:
+        job = self.get(job_id)
+        if job is None or job.status != DONE:
+            return None
+        return self.store.get(job_id)
+
+    def _expire(self, job: PdfJob) -> None:
+        if job.status == DONE:
+            self.store.delete(job.id)
+        job.status = EXPIRED
+        self.table.save(job)
+
+    def sweep(self) -> None:
+        """
+        Oublie les jobs les plus anciens au-delà de max_jobs, libère les PDF
+        expirés et oublie les jobs expirés depuis plus d'une durée de vie.
+        """
+        now = self._clock()
+        self._last_sweep = now
+        for old_id in self.table.trim(self.max_jobs):
+            self.store.delete(old_id)
+        # Un job expire au plus tôt une durée de vie après sa création
+        for job in self.table.jobs(created_before=now - self.ttl):
+            if job.expires_at is None or job.expires_at > now:
+                continue
+            if job.status != EXPIRED:
+                self._expire(job)
+            elif job.expires_at + self.ttl <= now:
+                self.table.delete(job.id)
+
+    def stats(self) -> Dict[str, int]:
+        statuses = [job.status for job in self.table.jobs()]
+        return {
+            'jobs': len(statuses),
+            'pending': statuses.count(PENDING),
+            'done': statuses.count(DONE),
+            'failed': statuses.count(FAILED),
+            'stored_bytes': self.store.size,
+        }
+
+
+def init_app(app) -> PdfJobManager:
+    """
+    Crée le gestionnaire de jobs sur le pool de rendu de l'application.
+
+    Sans PDF_JOB_STORE, le stockage disque (partagé entre workers) est
+    choisi sous le serveur préforké (SERVER_PRELOAD), la mémoire sinon.
+    """
+    for key, value in DEFAULT_CONFIG.items():
+        app.config.setdefault(key, value)
+    max_bytes = int(app.config['PDF_JOB_MAX_BYTES'])
+    backend = app.config['PDF_JOB_STORE'] or ('disk' if app.config.get('SERVER_PRELOAD') else 'memory')
+    if backend == 'disk':
+        directory = app.config['PDF_JOB_DIR'] or os.path.join(app.instance_path, 'pdf-jobs')
+        store = DiskResultStore(max_bytes, directory)
+        table = DiskJobTable(directory)
+    elif backend == 'memory':
+        store = MemoryResultStore(max_bytes)
+        table = MemoryJobTable()
+    else:
+        raise ValueError(f"PDF_JOB_STORE inconnu: {backend!r} (memory ou disk)")
+    manager = PdfJobManager(
+        app.extensions['pdf_render_pool'], store,
+        ttl=float(app.config['PDF_JOB_TTL']),
+        max_jobs=int(app.config['PDF_JOB_MAX_JOBS']),
+        cache=app.extensions.get('pdf_cache'),
+        table=table,
+    )
+    app.extensions['pdf_jobs'] = manager
+    return manager
@@ -0,0 +1,309 @@
+"""
+Pool de processus de rendu PDF.
+
+Le rendu est purement CPU (long avec WeasyPrint): il est confié à des processus
+dédiés, démarrés une fois (moteur de rendu importé et préparé), pour
+ne pas bloquer les workers qui servent les questionnaires. La file d'attente
+est bornée (RenderQueueFull au-delà), chaque rendu a un délai maximal
+(RenderTimeout) et les processus sont recyclés après un nombre de rendus
+donné pour plafonner la croissance mémoire.
+
+Le moteur n'est importé que dans les processus de rendu, ou au premier rendu
+inline: importer l'application ne charge ni WeasyPrint ni pango.
+"""
+
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Optional
+
+from . import metrics
+from .pdf_renderers import OutputOptions, Renderer, create_renderer
+from .report_content import REPORT_QUESTIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'PDF_RENDER_WORKERS': 2,      # 0: rendu dans le thread de la requête
+    'PDF_RENDER_QUEUE': 8,        # rendus en attente au-delà des workers occupés
+    'PDF_RENDER_TIMEOUT': 30.0,   # secondes par rendu
+    'PDF_RENDER_MAX_TASKS': 100,  # rendus avant recyclage d'un processus (Python ≥ 3.11)
+    'PDF_EMBED_FONTS': False,     # polices Atkinson Hyperlegible intégrées au rapport (weasyprint)
+    'PDF_BACKEND': 'weasyprint',  # moteur de rendu: "weasyprint" ou "direct" (voir pdf_renderers)
+    'PDF_COMPRESS': True,         # flux de contenu compressés
+    'PDF_SUBSET_FONTS': True,     # polices intégrées réduites aux glyphes utilisés
+    'PDF_VARIANT': None,          # ex. "pdf/a-3b" pour un PDF/A (weasyprint)
+    'PDF_WARM_UP': False,         # préparer le rendu dans un thread dès le démarrage
+}
+
+
+class RenderQueueFull(RuntimeError):
+    """La file d'attente de rendu est pleine."""
+
+
+class RenderTimeout(RuntimeError):
+    """Le rendu a dépassé le délai imparti."""
+
+
+_HAS_ALARM = hasattr(signal, 'setitimer')
+
+
+def _on_alarm(signum, frame):
+    raise RenderTimeout("Délai de rendu dépassé")
+
+
+# Moteur du processus de rendu, créé par _init_worker
+_renderer: Optional[Renderer] = None
+
+
+def _init_worker(backend: str = 'weasyprint', embed_fonts: bool = False,
+                 output: OutputOptions = OutputOptions()) -> None:
+    """Initialise un processus de rendu: moteur importé et préparé (styles, polices)."""
+    global _renderer
+    if _HAS_ALARM:
+        signal.signal(signal.SIGALRM, _on_alarm)
+    _renderer = create_renderer(backend, embed_fonts, output)
+    _renderer.warm_up()
+
+
+def _ping() -> int:
+    """Tâche vide: force le démarrage (et l'initialisation) d'un processus du pool."""
+    return 0
+
+
+def _render(renderer: Renderer, assessment, responses: dict, generated_at: Optional[datetime] = None):
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    pdf = renderer.render(assessment, responses, REPORT_QUESTIONS, generated_at, timings)
+    timings['total'] = time.perf_counter() - start
+    return pdf, timings
+
+
+def _render_job(assessment, responses: dict, timeout: float, generated_at: Optional[datetime] = None):
+    """
+    Exécuté dans un processus du pool; renvoie (pdf, durées du rendu): total
+    et étapes du moteur (html, layout, write), en secondes.
+    """
+    if not _HAS_ALARM:
+        return _render(_renderer, assessment, responses, generated_at)
+    # Délai appliqué dans le worker: un rendu bloqué libère sa place dans le pool
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _render(_renderer, assessment, responses, generated_at)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class PdfRenderPool:
+    """Pool de rendu borné, avec métriques de file et de latence."""
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, timeout: float = 30.0,
+                 max_tasks_per_child: Optional[int] = 100, embed_fonts: bool = False,
+                 backend: str = 'weasyprint', output: OutputOptions = OutputOptions()):
+        self.workers = workers
+        self.embed_fonts = embed_fonts
+        # Validé dès la création; en rendu inline, c'est le moteur utilisé
+        self.renderer = create_renderer(backend, embed_fonts, output)
+        self.backend = backend
+        self.output = output
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max_queue)
+        self._in_flight = 0
+        self._latencies = deque(maxlen=256)
+        self._sizes = deque(maxlen=256)
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                options = {}
+                if self.max_tasks_per_child and sys.version_info >= (3, 11):
+                    options['max_tasks_per_child'] = self.max_tasks_per_child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.backend, self.embed_fonts, self.output),
+                    **options,
+                )
+            return self._executor
+
+    def submit(self, assessment, responses: dict, generated_at: Optional[datetime] = None) -> Future:
+        """Soumet un rendu sans attendre; RenderQueueFull si la file est pleine."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise RenderQueueFull("File de rendu PDF pleine")
+        with self._lock:
+            self._in_flight += 1
+        submitted = time.perf_counter()
+
+        executor = None
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(_render(self.renderer, assessment, responses, generated_at))
+            except Exception as exc:
+                future.set_exception(exc)
+        else:
+            try:
+                executor = self._get_executor()
+                future = executor.submit(_render_job, assessment, responses, self.timeout, generated_at)
+            except Exception as exc:
+                if isinstance(exc, BrokenProcessPool):
+                    self._discard_executor(executor)
+                self._release(None, submitted, executor)
+                raise
+        future.add_done_callback(lambda f: self._release(f, submitted, executor))
+        return future
+
+    def warm_up(self) -> None:
+        """
+        Prépare le rendu sans attendre le premier rapport: moteur importé et
+        préparé dans ce processus (rendu inline), ou processus du pool démarrés.
+        """
+        start = time.perf_counter()
+        if self.workers <= 0:
+            self.renderer.warm_up()
+        else:
+            executor = self._get_executor()
+            for future in [executor.submit(_ping) for _ in range(self.workers)]:
+                future.result()
+        logger.info("Rendu PDF prêt en %.2f s (%s)", time.perf_counter() - start, self.backend)
+
+    def start_warm_up(self) -> threading.Thread:
+        """Lance warm_up dans un thread d'arrière-plan; un échec est journalisé, pas propagé."""
+        def run():
+            try:
+                self.warm_up()
+            except Exception:
+                logger.exception("Préparation du rendu PDF échouée")
+
+        thread = threading.Thread(target=run, name='pdf-warm-up', daemon=True)
+        thread.start()
+        return thread
+
+    def render(self, assessment, responses: dict, generated_at: Optional[datetime] = None) -> bytes:
+        """Rend le rapport et attend le résultat (au plus le délai configuré)."""
+        future = self.submit(assessment, responses, generated_at)
+        try:
+            pdf, _ = future.result(timeout=self.timeout + 5)
+        except FutureTimeoutError:
+            raise RenderTimeout("Délai de rendu dépassé") from None
+        return pdf
+
+    def _release(self, future: Optional[Future], submitted: float, executor=None) -> None:
+        latency = time.perf_counter() - submitted
+        size = None
+        with self._lock:
+            self._in_flight -= 1
+            if future is None:
+                self.failed += 1
+            elif future.cancelled() or future.exception() is not None:
+                error = None if future.cancelled() else future.exception()
+                if isinstance(error, RenderTimeout):
+                    self.timeouts += 1
+                self.failed += 1
+            else:
+                self.completed += 1
+                self._latencies.append(latency)
+                pdf, timings = future.result()
+                size = len(pdf)
+                self._sizes.append(size)
+        self._slots.release()
+        if size is not None:
+            metrics.PDF_RENDER_LATENCY_SECONDS.observe(latency, self.backend)
+            for phase, seconds in timings.items():
+                if phase == 'total':
+                    metrics.PDF_RENDER_SECONDS.observe(seconds, self.backend)
+                else:
+                    metrics.PDF_RENDER_PHASE_SECONDS.observe(seconds, self.backend, phase)
+        if future is not None and not future.cancelled() \
+                and isinstance(future.exception(), BrokenProcessPool):
+            # Un processus est mort en cours de rendu: le pool sera recréé
+            logger.error("Pool de rendu PDF interrompu, redémarrage au prochain rendu")
+            self._discard_executor(executor)
+        if size is not None:
+            logger.info("Rapport PDF rendu en %.3f s: %d octets", latency, size)
+
+    def _discard_executor(self, executor) -> None:
+        """Abandonne un exécuteur cassé, sauf s'il a déjà été remplacé."""
+        with self._lock:
+            if executor is None or self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            sizes = sorted(self._sizes)
+            in_flight = self._in_flight
+            stats = {
+                'backend': self.backend,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'in_flight': in_flight,
+                'queued': max(0, in_flight - self.workers),
+                'completed': self.completed,
+                'failed': self.failed,
+                'timeouts': self.timeouts,
+                'rejected': self.rejected,
+            }
+        if latencies:
+            stats['latency_p50'] = latencies[len(latencies) // 2]
+            stats['latency_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            stats['latency_max'] = latencies[-1]
+        if sizes:
+            stats['size_p50'] = sizes[len(sizes) // 2]
+            stats['size_max'] = sizes[-1]
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def init_app(app) -> PdfRenderPool:
+    """
+    Crée le pool de l'application. Les processus de rendu (et WeasyPrint)
+    sont chargés au premier rendu, ou en arrière-plan avec PDF_WARM_UP.
+    Dans le maître du serveur préforké (SERVER_PRELOAD), la préparation est
+    laissée à chaque worker, après le fork.
+    """
+    for key, value in DEFAULT_CONFIG.items():
+        app.config.setdefault(key, value)
+    pool = PdfRenderPool(
+        workers=int(app.config['PDF_RENDER_WORKERS']),
+        max_queue=int(app.config['PDF_RENDER_QUEUE']),
+        timeout=float(app.config['PDF_RENDER_TIMEOUT']),
+        max_tasks_per_child=int(app.config['PDF_RENDER_MAX_TASKS']) or None,
+        embed_fonts=bool(app.config['PDF_EMBED_FONTS']),
+        backend=app.config['PDF_BACKEND'],
+        output=OutputOptions(
+            compress=bool(app.config['PDF_COMPRESS']),
+            subset_fonts=bool(app.config['PDF_SUBSET_FONTS']),
+            pdf_variant=app.config['PDF_VARIANT'] or None,
+        ),
+    )
+    app.extensions['pdf_render_pool'] = pool
+    if app.config['PDF_WARM_UP'] and not app.config.get('SERVER_PRELOAD'):
+        pool.start_warm_up()
+    return pool
@@ -0,0 +1,126 @@
+"""
+Moteurs de rendu du rapport PDF.
+
+Deux implémentations d'une même interface, choisies par déploiement
+(PDF_BACKEND):
+- "weasyprint": gabarit HTML/CSS mis en page par WeasyPrint
+  (pdf_generator.generate_pdf_report), fidèle à la charte et aux polices
+  intégrées, mais lent et gourmand en mémoire;
+- "direct": tracé direct des mêmes sections avec les primitives PDF
+  (pdf_direct), en Python pur, un ordre de grandeur plus rapide.
+
+Les modules de rendu ne sont importés qu'à l'utilisation: un déploiement en
+rendu direct n'a pas besoin de WeasyPrint ni de pango.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from .scoring import GlobalAssessment
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """Optimisation du PDF produit (taille, conformité)."""
+    compress: bool = True               # flux de contenu compressés (Flate)
+    subset_fonts: bool = True           # polices intégrées réduites aux glyphes utilisés
+    pdf_variant: Optional[str] = None   # ex. "pdf/a-3b" (WeasyPrint uniquement)
+
+    def key(self) -> str:
+        """Écarts aux options par défaut, pour la version du cache ('' si aucun)."""
+        parts = []
+        if not self.compress:
+            parts.append('uncompressed')
+        if not self.subset_fonts:
+            parts.append('full-fonts')
+        if self.pdf_variant:
+            parts.append(self.pdf_variant)
+        return ','.join(parts)
+
+
+class Renderer:
+    """Interface d'un moteur de rendu: rapport déterministe pour une date de génération donnée."""
+
+    name = ''
+
+    def warm_up(self) -> None:
+        """Prépare l'état partagé du moteur (appelé une fois par processus de rendu)."""
+
+    def render(self, assessment: GlobalAssessment, responses: dict, questions: dict,
+               generated_at: Optional[datetime] = None,
+               timings: Optional[Dict[str, float]] = None) -> bytes:
+        raise NotImplementedError
+
+
+class WeasyPrintRenderer(Renderer):
+    """Gabarit HTML/CSS mis en page par WeasyPrint."""
+
+    name = 'weasyprint'
+
+    def __init__(self, embed_fonts: bool = False, output: OutputOptions = OutputOptions()):
+        self.embed_fonts = embed_fonts
+        self.output = output
+        self._configured = False
+
+    def _configure(self) -> None:
+        if not self._configured:
+            from .pdf_generator import configure
+            configure(self.embed_fonts, compress=self.output.compress,
+                      subset_fonts=self.output.subset_fonts, pdf_variant=self.output.pdf_variant)
+            self._configured = True
+
+    def warm_up(self) -> None:
+        from .pdf_generator import warm_up
+        self._configure()
+        warm_up()
+
+    def render(self, assessment, responses, questions, generated_at=None, timings=None) -> bytes:
+        from .pdf_generator import generate_pdf_report
+        self._configure()
+        return generate_pdf_report(assessment, responses, questions, generated_at, timings)
+
+
+class DirectRenderer(Renderer):
+    """Tracé direct en Python pur (polices standard, non intégrées)."""
+
+    name = 'direct'
+
+    def __init__(self, embed_fonts: bool = False, output: OutputOptions = OutputOptions()):
+        if output.pdf_variant:
+            # PDF/A impose des polices intégrées
+            raise ValueError(f"Variante {output.pdf_variant!r} non disponible avec le rendu direct")
+        # Les polices standard PDF ne sont jamais intégrées: rien à réduire
+        self.embed_fonts = False
+        self.output = output
+
+    def warm_up(self) -> None:
+        # Un rendu complet remplit le cache des chasses de mots
+        from .cache import assess
+        from .pdf_direct import render_report
+        from .report_content import REPORT_QUESTIONS
+        from .scoring import SCORING_PLAN
+        responses = dict.fromkeys(SCORING_PLAN, 0)
+        render_report(assess(responses), responses, REPORT_QUESTIONS, datetime(2000, 1, 1))
+
+    def render(self, assessment, responses, questions, generated_at=None, timings=None) -> bytes:
+        from .pdf_direct import render_report
+        return render_report(assessment, responses, questions, generated_at, timings,
+                             compress=self.output.compress)
+
+
+RENDERERS = {
+    WeasyPrintRenderer.name: WeasyPrintRenderer,
+    DirectRenderer.name: DirectRenderer,
+}
+
+
+def create_renderer(name: str, embed_fonts: bool = False,
+                    output: OutputOptions = OutputOptions()) -> Renderer:
+    """Instancie le moteur nommé; ValueError si le nom ou les options ne conviennent pas."""
+    try:
+        factory = RENDERERS[name]
+    except KeyError:
+        raise ValueError(f"Moteur de rendu PDF inconnu: {name!r} "
+                         f"(attendu: {', '.join(sorted(RENDERERS))})") from None
+    return factory(embed_fonts=embed_fonts, output=output)
@@ -0,0 +1,204 @@
+"""
+Profilage à la demande de requêtes isolées (optionnel).
+
+Avec PROFILE_ENABLED, une requête est profilée si elle porte l'en-tête
+X-Profile égal à PROFILE_SECRET, ou par tirage aléatoire (proportion
+PROFILE_SAMPLE_RATE des requêtes). Pour chaque requête profilée, deux
+fichiers sont écrits dans PROFILE_DIR (défaut: <instance>/profiles,
+répertoire privé: les profils contiennent des données de production), sous
+un même nom (renvoyé dans l'en-tête X-Profile-Id de la réponse):
+- <nom>.pstats: statistiques cProfile (python -m pstats <fichier>, snakeviz);
+- <nom>.collapsed: piles échantillonnées toutes les PROFILE_SAMPLE_INTERVAL
+  secondes, au format « collapsed » (flamegraph.pl, speedscope).
+
+Seuls les PROFILE_KEEP profils les plus récents sont conservés. Une seule
+requête est profilée à la fois par processus; les autres sont servies
+normalement. Désactivé (défaut), rien n'est installé: aucun coût.
+
+Le profil couvre la requête jusqu'au retour de la réponse (session
+comprise), pas l'envoi d'une réponse en flux. Un rendu PDF confié au pool
+de processus n'y apparaît que comme une attente: profiler avec
+PDF_RENDER_WORKERS=0 pour voir le rendu lui-même.
+"""
+
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'PROFILE_ENABLED': False,         # profilage à la demande (en-tête secret ou tirage)
+    'PROFILE_SECRET': None,           # valeur attendue de l'en-tête X-Profile
+    'PROFILE_SAMPLE_RATE': 0.0,       # proportion des requêtes profilées par tirage (0 à 1)
+    'PROFILE_DIR': None,              # défaut: <instance>/profiles (privé)
+    'PROFILE_KEEP': 50,               # profils conservés (les plus anciens sont supprimés)
+    'PROFILE_SAMPLE_INTERVAL': 0.001,  # secondes entre deux piles échantillonnées
+}
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+
+class StackSampler:
+    """Échantillonne la pile d'un thread, sous un cadre racine, dans un thread dédié."""
+
+    def __init__(self, thread_id: int, root, interval: float):
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks = Counter()
+        self._labels: Dict[object, str] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+            ).replace(';', ',')
+        return label
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+
+def _slug(path: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_')[:60] or 'index'
+
+
+class ProfilingMiddleware:
+    """Middleware WSGI: profile les requêtes désignées et écrit leurs profils."""
+
+    def __init__(self, wsgi_app, directory: str, secret: Optional[str] = None,
+                 sample_rate: float = 0.0, keep: int = 50, interval: float = 0.001):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Aussi pour un répertoire existant: accès réservé au compte du service
+        os.chmod(directory, 0o700)
+        self.wsgi_app = wsgi_app
+        self.directory = directory
+        self.secret = secret.encode() if secret else None
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.interval = interval
+        self._environ_key = 'HTTP_' + PROFILE_HEADER.upper().replace('-', '_')
+        self._lock = threading.Lock()
+
+    def _wanted(self, environ) -> bool:
+        if self.secret is not None:
+            supplied = environ.get(self._environ_key)
+            if supplied is not None and hmac.compare_digest(supplied.encode(), self.secret):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, environ, start_response):
+        if not self._wanted(environ) or not self._lock.acquire(blocking=False):
+            return self.wsgi_app(environ, start_response)
+        try:
+            return self._profile(environ, start_response)
+        finally:
+            self._lock.release()
+
+    def _profile(self, environ, start_response):
+        now = time.time()
+        name = (f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now % 1 * 1000):03d}"
+                f"-{os.getpid()}-{environ.get('REQUEST_METHOD', 'GET')}-{_slug(environ.get('PATH_INFO', ''))}")
+
+        def start_profiled_response(status, headers, exc_info=None):
+            headers.append((PROFILE_ID_HEADER, name))
+            return start_response(status, headers, exc_info)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Autre profileur actif dans le processus (débogueur, outil externe)
+            logger.warning("Profilage impossible: un autre profileur est actif")
+            return self.wsgi_app(environ, start_response)
+        sampler = StackSampler(threading.get_ident(), sys._getframe(), self.interval)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            return self.wsgi_app(environ, start_profiled_response)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+            self._write(name, profiler, sampler.stacks, elapsed)
+
+    def _write(self, name: str, profiler: cProfile.Profile, stacks: Counter, elapsed: float) -> None:
+        base = os.path.join(self.directory, name)
+        try:
+            profiler.dump_stats(base + '.pstats')
+            with open(base + '.collapsed', 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f'{stack} {count}\n')
+            self._rotate()
+        except OSError:
+            logger.exception("Écriture du profil %s échouée", name)
+            return
+        logger.info("Requête profilée en %.3f s: %s.pstats", elapsed, base)
+
+    def _rotate(self) -> None:
+        """Supprime les profils au-delà des keep plus récents (tous processus confondus)."""
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pstats'):
+                try:
+                    profiles.append((entry.stat().st_mtime, entry.path[:-len('.pstats')]))
+                except FileNotFoundError:
+                    continue
+        profiles.sort(reverse=True)
+        for _, base in profiles[self.keep:]:
+            for suffix in ('.pstats', '.collapsed'):
+                try:
+                    os.remove(base + suffix)
+                except FileNotFoundError:
+                    pass
+
+
+def init_app(app) -> Optional[ProfilingMiddleware]:
+    """Installe le profilage à la demande si PROFILE_ENABLED (sinon rien)."""
+    for key, value in DEFAULT_CONFIG.items():
+        app.config.setdefault(key, value)
+    if not app.config['PROFILE_ENABLED']:
+        return None
+    secret = app.config['PROFILE_SECRET'] or None
+    sample_rate = float(app.config['PROFILE_SAMPLE_RATE'])
+    if secret is None and sample_rate <= 0:
+        logger.warning("PROFILE_ENABLED sans PROFILE_SECRET ni PROFILE_SAMPLE_RATE: aucune requête profilée")
+        return None
+    middleware = ProfilingMiddleware(
+        app.wsgi_app,
+        directory=app.config['PROFILE_DIR'] or os.path.join(app.instance_path, 'profiles'),
+        secret=str(secret) if secret is not None else None,
+        sample_rate=sample_rate,
+        keep=int(app.config['PROFILE_KEEP']),
+        interval=float(app.config['PROFILE_SAMPLE_INTERVAL']),
+    )
+    app.wsgi_app = middleware
+    app.extensions['profiling'] = middleware
+    return middleware
@@ -0,0 +1,36 @@
+"""
+Contenu du rapport PDF commun aux moteurs de rendu (WeasyPrint, tracé direct).
+
+Ce module n'importe aucun moteur: il peut être chargé par les processus
+web comme par les processus de rendu.
+"""
+
+from .questionnaires import (
+    ASRS_QUESTIONS,
+    DIVA_INATTENTION_CRITERIA, DIVA_HYPERACTIVITY_CRITERIA,
+    DIVA_CHILDHOOD_QUESTIONS, DIVA_IMPAIRMENT_DOMAINS,
+    EXEC_FUNCTION_QUESTIONS,
+)
+
+# Questions reprises dans les annexes du rapport
+REPORT_QUESTIONS = {
+    'asrs': ASRS_QUESTIONS,
+    'diva_inattention': DIVA_INATTENTION_CRITERIA,
+    'diva_hyperactivity': DIVA_HYPERACTIVITY_CRITERIA,
+    'diva_childhood': DIVA_CHILDHOOD_QUESTIONS,
+    'diva_impairment': DIVA_IMPAIRMENT_DOMAINS,
+    'exec_functions': EXEC_FUNCTION_QUESTIONS,
+}
+
+# Options de réponse pour affichage dans les annexes
+ASRS_OPTIONS = {0: "Jamais", 1: "Rarement", 2: "Parfois", 3: "Souvent", 4: "Très souvent"}
+DIVA_OPTIONS = {0: "Non", 1: "Oui"}
+EXEC_OPTIONS = {0: "Pas un problème", 1: "Rarement", 2: "Parfois", 3: "Souvent"}
+ANNEX_CLUSTER_NAMES = {
+    'activation': 'Activation',
+    'focus': 'Focus',
+    'effort': 'Effort',
+    'emotion': 'Émotion',
+    'memoire': 'Mémoire',
+    'action': 'Action',
+}
@@ -1,14 +1,22 @@
 """Routes Flask pour l'application d'évaluation TDAH."""
 
-from flask import Blueprint, render_template, request, session, redirect, url_for, make_response
-from .questionnaires import (
-    ASRS_QUESTIONS, ASRS_RESPONSE_OPTIONS,
-    DIVA_INATTENTION_CRITERIA, DIVA_HYPERACTIVITY_CRITERIA,
-    DIVA_CHILDHOOD_QUESTIONS, DIVA_IMPAIRMENT_DOMAINS, DIVA_RESPONSE_OPTIONS,
-    EXEC_FUNCTION_QUESTIONS, EXEC_FUNCTION_RESPONSE_OPTIONS,
+import hmac
+import io
+import time
+from datetime import datetime
+
+from flask import (
+    Blueprint, Response, abort, current_app, jsonify, render_template, request, session, redirect, url_for,
+    make_response, stream_with_context,
+)
+from .export import ExportStats, default_window, iter_zip, read_records, summary
+from .pdf_cache import report_key
+from .pdf_jobs import DONE, EXPIRED, FAILED
+from .pdf_pool import RenderQueueFull, RenderTimeout
+from .scoring import assessment_from_tally_state
+from .views import (
+    ASRS_PAGE, DIVA_PAGE, EXEC_PAGE, render_questions, save_responses, session_tally, validate_answers,
 )
-from .scoring import score_asrs, score_diva, score_executive_functions, generate_global_assessment
-from .pdf_generator import generate_pdf_report
 
 bp = Blueprint('main', __name__)
 
@@ -24,7 +32,10 @@ def start():
     """Démarre l'évaluation après consentement."""
     session.clear()
     session['consent'] = True
-    session['responses'] = {}
+    save_responses(session, {})
+    if current_app.config['QUESTIONNAIRE_SINGLE_PAGE']:
+        # Page unique rendue directement: pas d'aller-retour de redirection
+        return _render_evaluation({}, nav_endpoint='main.evaluation')
     return redirect(url_for('main.asrs'))
 
 
@@ -35,23 +46,12 @@ def asrs():
         return redirect(url_for('main.index'))
 
     if request.method == 'POST':
-        responses = session.get('responses', {})
-        for q in ASRS_QUESTIONS:
-            value = request.form.get(q.id)
-            if value is not None:
-                responses[q.id] = int(value)
-        session['responses'] = responses
+        save_responses(session, ASRS_PAGE.read_form(request.form, session.get('responses', {})))
         return redirect(url_for('main.diva'))
 
-    part_a = [q for q in ASRS_QUESTIONS if q.subcategory == 'part_a']
-    part_b = [q for q in ASRS_QUESTIONS if q.subcategory == 'part_b']
-
     return render_template(
         'asrs.html',
-        part_a=part_a,
-        part_b=part_b,
-        options=ASRS_RESPONSE_OPTIONS,
-        responses=session.get('responses', {}),
+        asrs_questions=render_questions(ASRS_PAGE, session.get('responses', {})),
     )
 
 
@@ -62,28 +62,12 @@ def diva():
         return redirect(url_for('main.index'))
 
     if request.method == 'POST':
-        responses = session.get('responses', {})
-        all_questions = (
-            DIVA_INATTENTION_CRITERIA +
-            DIVA_HYPERACTIVITY_CRITERIA +
-            DIVA_CHILDHOOD_QUESTIONS +
-            DIVA_IMPAIRMENT_DOMAINS
-        )
-        for q in all_questions:
-            value = request.form.get(q.id)
-            if value is not None:
-                responses[q.id] = int(value)
-        session['responses'] = responses
+        save_responses(session, DIVA_PAGE.read_form(request.form, session.get('responses', {})))
         return redirect(url_for('main.exec_functions'))
 
     return render_template(
         'diva.html',
-        inattention=DIVA_INATTENTION_CRITERIA,
-        hyperactivity=DIVA_HYPERACTIVITY_CRITERIA,
-        childhood=DIVA_CHILDHOOD_QUESTIONS,
-        impairment=DIVA_IMPAIRMENT_DOMAINS,
-        options=DIVA_RESPONSE_OPTIONS,
-        responses=session.get('responses', {}),
+        diva_questions=render_questions(DIVA_PAGE, session.get('responses', {})),
     )
 
 
@@ -94,40 +78,54 @@ def exec_functions():
         return redirect(url_for('main.index'))
 
     if request.method == 'POST':
-        responses = session.get('responses', {})
-        for q in EXEC_FUNCTION_QUESTIONS:
-            value = request.form.get(q.id)
-            if value is not None:
-                responses[q.id] = int(value)
-        session['responses'] = responses
+        save_responses(session, EXEC_PAGE.read_form(request.form, session.get('responses', {})))
+        # Date du rapport: fixée à la fin du questionnaire pour un rendu reproductible
+        session['completed_at'] = datetime.now().replace(microsecond=0).isoformat()
         return redirect(url_for('main.results'))
 
-    # Grouper par cluster
-    clusters = {}
-    cluster_names = {
-        'activation': 'Activation (organisation, démarrage)',
-        'focus': 'Attention / Focus',
-        'effort': 'Effort / Énergie',
-        'emotion': 'Régulation émotionnelle',
-        'memoire': 'Mémoire de travail',
-        'action': 'Inhibition / Action',
-    }
-    for q in EXEC_FUNCTION_QUESTIONS:
-        if q.category not in clusters:
-            clusters[q.category] = {
-                'name': cluster_names.get(q.category, q.category),
-                'questions': []
-            }
-        clusters[q.category]['questions'].append(q)
-
     return render_template(
         'executive.html',
-        clusters=clusters,
-        options=EXEC_FUNCTION_RESPONSE_OPTIONS,
-        responses=session.get('responses', {}),
+        exec_questions=render_questions(EXEC_PAGE, session.get('responses', {})),
     )
 
 
+def _render_evaluation(responses, missing=(), status=200, nav_endpoint=None):
+    html = render_template(
+        'evaluation.html',
+        asrs_questions=render_questions(ASRS_PAGE, responses),
+        diva_questions=render_questions(DIVA_PAGE, responses),
+        exec_questions=render_questions(EXEC_PAGE, responses),
+        missing=missing,
+        nav_endpoint=nav_endpoint,
+    )
+    return html, status
+
+
+@bp.route('/evaluation', methods=['GET', 'POST'])
+def evaluation():
+    """
+    Les trois questionnaires sur une seule page (QUESTIONNAIRE_SINGLE_PAGE).
+
+    Le formulaire est validé en une fois et la réponse est directement la
+    page de résultats; une évaluation incomplète est réaffichée (400) avec
+    les réponses déjà données.
+    """
+    if not current_app.config['QUESTIONNAIRE_SINGLE_PAGE']:
+        return redirect(url_for('main.asrs'))
+    if not session.get('consent'):
+        return redirect(url_for('main.index'))
+
+    if request.method == 'GET':
+        return _render_evaluation(session.get('responses', {}))
+
+    responses, missing = validate_answers(request.form)
+    if missing:
+        return _render_evaluation(responses, missing, status=400)
+    save_responses(session, responses)
+    session['completed_at'] = datetime.now().replace(microsecond=0).isoformat()
+    return _render_results(nav_endpoint='main.results')
+
+
 @bp.route('/results')
 def results():
     """Affiche les résultats de l'évaluation."""
@@ -138,17 +136,20 @@ def results():
     if not responses:
         return redirect(url_for('main.asrs'))
 
-    asrs_result = score_asrs(responses)
-    diva_result = score_diva(responses)
-    exec_result = score_executive_functions(responses)
-    global_assessment = generate_global_assessment(asrs_result, diva_result, exec_result)
+    return _render_results()
+
+
+def _render_results(nav_endpoint=None):
+    # Compteurs tenus à jour à chaque réponse: pas de nouveau parcours des réponses
+    global_assessment = assessment_from_tally_state(session_tally(session))
 
     return render_template(
         'results.html',
-        asrs=asrs_result,
-        diva=diva_result,
-        exec_func=exec_result,
+        asrs=global_assessment.asrs,
+        diva=global_assessment.diva,
+        exec_func=global_assessment.exec_functions,
         assessment=global_assessment,
+        nav_endpoint=nav_endpoint,
     )
 
 
@@ -162,24 +163,198 @@ def download_pdf():
     if not responses:
         return redirect(url_for('main.asrs'))
 
-    asrs_result = score_asrs(responses)
-    diva_result = score_diva(responses)
-    exec_result = score_executive_functions(responses)
-    global_assessment = generate_global_assessment(asrs_result, diva_result, exec_result)
-
-    # Récupérer les questions pour les annexes
-    all_questions = {
-        'asrs': ASRS_QUESTIONS,
-        'diva_inattention': DIVA_INATTENTION_CRITERIA,
-        'diva_hyperactivity': DIVA_HYPERACTIVITY_CRITERIA,
-        'diva_childhood': DIVA_CHILDHOOD_QUESTIONS,
-        'diva_impairment': DIVA_IMPAIRMENT_DOMAINS,
-        'exec_functions': EXEC_FUNCTION_QUESTIONS,
+    generated_at = _report_date()
+    key = _report_key(responses, generated_at)
+    # Rapport identique à celui déjà reçu par le navigateur: pas de rendu
+    if request.if_none_match.contains(key):
+        return _pdf_response(b'', key, status=304)
+
+    cache = current_app.extensions['pdf_cache']
+    pdf_bytes = cache.get(key) if cache is not None else None
+    if pdf_bytes is None:
+        global_assessment = current_app.extensions['assessment_cache'].get_or_compute(responses)
+        # Rendu délégué au pool de processus de rendu
+        pool = current_app.extensions['pdf_render_pool']
+        try:
+            pdf_bytes = pool.render(global_assessment, dict(responses), generated_at)
+        except RenderQueueFull:
+            return _render_queue_full()
+        except RenderTimeout:
+            return make_response("La génération du rapport PDF a pris trop de temps.", 504)
+        if cache is not None:
+            cache.put(key, pdf_bytes)
+
+    return _pdf_response(pdf_bytes, key)
+
+
+def _report_date():
+    """Date de génération du rapport, conservée en session."""
+    completed_at = session.get('completed_at')
+    if completed_at is None:
+        completed_at = datetime.now().replace(microsecond=0).isoformat()
+        session['completed_at'] = completed_at
+    return datetime.fromisoformat(completed_at)
+
+
+def _report_key(responses, generated_at):
+    return report_key(responses, generated_at, current_app.extensions['pdf_template_version'])
+
+
+def _pdf_response(pdf_bytes, etag, status=200):
+    response = make_response(pdf_bytes, status)
+    response.headers['Content-Type'] = 'application/pdf'
+    response.headers['Content-Disposition'] = 'attachment; filename=evaluation_tdah.pdf'
+    # Revalidation systématique: l'ETag change avec les réponses
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.set_etag(etag)
+    return response
+
+
+# Jobs conservés dans la session (propriété des résultats)
+MAX_SESSION_PDF_JOBS = 5
+
+
+def _render_queue_full():
+    return make_response(
+        "Le service de génération PDF est momentanément saturé. Réessayez dans quelques instants.",
+        503, {'Retry-After': '5'},
+    )
+
+
+def _job_status(job):
+    body = {
+        'id': job.id,
+        'status': job.status,
+        'status_url': url_for('main.pdf_job_status', job_id=job.id),
     }
+    if job.status == DONE:
+        body['download_url'] = url_for('main.pdf_job_download', job_id=job.id)
+        body['size'] = job.size
+    if job.expires_at is not None:
+        body['expires_in'] = max(0, int(job.expires_at - time.time()))
+    if job.status == FAILED:
+        body['error'] = job.error
+    return body
+
+
+def _owned_job(job_id):
+    """Job de la session courante, ou None (inconnu ou appartenant à un autre utilisateur)."""
+    if job_id not in session.get('pdf_jobs', ()):
+        return None
+    return current_app.extensions['pdf_jobs'].get(job_id)
+
+
+@bp.route('/download-pdf/jobs', methods=['POST'])
+def create_pdf_job():
+    """Lance la génération du rapport PDF sans attendre la fin du rendu."""
+    if not session.get('consent'):
+        return jsonify(error="Consentement requis"), 403
 
-    pdf_bytes = generate_pdf_report(global_assessment, responses, all_questions)
+    responses = session.get('responses', {})
+    if not responses:
+        return jsonify(error="Aucune réponse enregistrée"), 400
+
+    global_assessment = current_app.extensions['assessment_cache'].get_or_compute(responses)
+    generated_at = _report_date()
+    try:
+        job = current_app.extensions['pdf_jobs'].submit(
+            global_assessment, dict(responses), generated_at, _report_key(responses, generated_at),
+        )
+    except RenderQueueFull:
+        return _render_queue_full()
+
+    session['pdf_jobs'] = (session.get('pdf_jobs', []) + [job.id])[-MAX_SESSION_PDF_JOBS:]
+    response = jsonify(_job_status(job))
+    response.status_code = 202
+    response.headers['Location'] = url_for('main.pdf_job_status', job_id=job.id)
+    return response
+
+
+@bp.route('/download-pdf/jobs/<job_id>')
+def pdf_job_status(job_id):
+    """État d'un rendu asynchrone: pending, done, failed ou expired."""
+    job = _owned_job(job_id)
+    if job is None:
+        return jsonify(error="Job inconnu"), 404
+    return jsonify(_job_status(job))
+
+
+@bp.route('/download-pdf/jobs/<job_id>/file')
+def pdf_job_download(job_id):
+    """Télécharge le PDF d'un rendu terminé, tant qu'il n'a pas expiré."""
+    job = _owned_job(job_id)
+    if job is None:
+        return make_response("Rapport introuvable.", 404)
+    pdf_bytes = current_app.extensions['pdf_jobs'].result(job_id)
+    if pdf_bytes is None:
+        if job.status in (DONE, EXPIRED):
+            return make_response("Le rapport a expiré. Relancez sa génération.", 410)
+        return make_response("Le rapport n'est pas encore prêt.", 409)
 
     response = make_response(pdf_bytes)
     response.headers['Content-Type'] = 'application/pdf'
     response.headers['Content-Disposition'] = 'attachment; filename=evaluation_tdah.pdf'
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
+
+def _is_admin():
+    """La requête porte le jeton EXPORT_TOKEN (en-tête Authorization: Bearer)."""
+    token = current_app.config['EXPORT_TOKEN']
+    if not token:
+        return False
+    supplied = request.headers.get('Authorization', '')
+    return hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode())
+
+
+@bp.route('/status/pdf-renderer')
+def pdf_renderer_status():
+    """
+    Disponibilité du rendu PDF; pour les détenteurs du jeton d'administration,
+    état détaillé du pool (file, workers, latences) et des rendus asynchrones.
+    """
+    pool = current_app.extensions['pdf_render_pool']
+    stats = pool.stats()
+    if not _is_admin():
+        # Sans authentification: indicateur de santé seul (file non saturée), pas d'état interne
+        return jsonify(ok=stats['in_flight'] < max(pool.workers, 1) + pool.max_queue)
+    stats['jobs'] = current_app.extensions['pdf_jobs'].stats()
+    cache = current_app.extensions['pdf_cache']
+    if cache is not None:
+        stats['cache'] = cache.stats()
+    return jsonify(stats)
+
+
+@bp.route('/admin/export', methods=['POST'])
+def admin_export():
+    """
+    Export ZIP des rapports d'un lot de réponses (corps JSONL, ou CSV en text/csv).
+
+    Réservé aux détenteurs du jeton EXPORT_TOKEN (en-tête Authorization: Bearer).
+    L'archive est envoyée en flux, au fil des rendus.
+    """
+    if not current_app.config['EXPORT_TOKEN']:
+        abort(404)
+    if not _is_admin():
+        return make_response("Jeton d'export invalide.", 401, {'WWW-Authenticate': 'Bearer'})
+
+    fmt = 'csv' if request.mimetype == 'text/csv' else 'jsonl'
+    # Corps lu ligne à ligne au fil des rendus, jamais chargé en entier;
+    # au-delà d'EXPORT_MAX_BYTES: 413 (avant l'archive si Content-Length l'annonce)
+    request.max_content_length = int(current_app.config['EXPORT_MAX_BYTES'])
+    source = io.TextIOWrapper(io.BufferedReader(request.stream), encoding='utf-8',
+                              errors='replace', newline='')
+    pool = current_app.extensions['pdf_render_pool']
+    window = int(current_app.config['EXPORT_WINDOW'] or default_window(pool))
+    stats = ExportStats()
+    chunks = iter_zip(read_records(source, fmt), pool, window, stats,
+                      id_field=request.args.get('id_field', 'id'))
+
+    def generate():
+        yield from chunks
+        current_app.logger.info("Export: %s", summary(stats))
+
+    response = Response(stream_with_context(generate()), mimetype='application/zip')
+    response.headers['Content-Disposition'] = 'attachment; filename=rapports_tdah.zip'
+    response.headers['Cache-Control'] = 'no-store'
     return response
@@ -6,9 +6,18 @@ Références:
 - DSM-5: APA (2013). Critères diagnostiques du TDAH.
 """
 
+import sys
+from collections import Counter
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
-from .questionnaires import ASRS_SHADED_THRESHOLDS
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+from .questionnaires import (
+    ASRS_QUESTIONS, ASRS_SHADED_THRESHOLDS, ASRS_RESPONSE_OPTIONS,
+    DIVA_INATTENTION_CRITERIA, DIVA_HYPERACTIVITY_CRITERIA,
+    DIVA_CHILDHOOD_QUESTIONS, DIVA_IMPAIRMENT_DOMAINS, DIVA_RESPONSE_OPTIONS,
+    EXEC_FUNCTION_QUESTIONS, EXEC_FUNCTION_RESPONSE_OPTIONS,
+)
+from .metrics import SCORING_SECONDS, timed
 
 
 @dataclass
@@ -60,48 +69,158 @@ class ExecFunctionResult:
     severity: str
 
 
-def score_asrs(responses: Dict[str, int]) -> ASRSResult:
-    """
-    Calcule les scores ASRS selon les méthodes validées.
+# =============================================================================
+# Plan de scoring compilé
+# Construit une seule fois à l'import à partir de questionnaires.py: chaque
+# identifiant de question est associé à ses métadonnées de cotation, ce qui
+# permet de scorer les trois questionnaires en une seule passe sur les réponses.
+# =============================================================================
+
+EF_CLUSTER_NAMES = {
+    "activation": "Activation",
+    "focus": "Attention/Focus",
+    "effort": "Effort/Énergie",
+    "emotion": "Régulation émotionnelle",
+    "memoire": "Mémoire de travail",
+    "action": "Inhibition/Action",
+}
+
+DIVA_IMPAIRMENT_LABELS = {
+    "diva_imp_1": "Travail/Études",
+    "diva_imp_2": "Relations familiales",
+    "diva_imp_3": "Relations sociales",
+    "diva_imp_4": "Loisirs",
+    "diva_imp_5": "Estime de soi",
+}
+
+
+@dataclass(frozen=True)
+class ItemSpec:
+    """Métadonnées de cotation d'une question, compilées à l'import."""
+    instrument: str                         # "asrs", "diva", "ef"
+    part: str                               # ASRS: part_a/part_b ; DIVA: ia/hi/child/imp ; EF: cluster
+    max_value: int
+    subscale: Optional[str] = None          # ASRS: "inattention" ou "hyperactivity"
+    shaded_threshold: Optional[int] = None  # ASRS Partie A: seuil de zone grisée
+    cluster: Optional[str] = None           # EF: nom du cluster ; DIVA imp: domaine de vie
+    index: int = 0                          # EF: rang du cluster dans EF_CLUSTER_NAMES
+
+
+def _compile_plan() -> Dict[str, ItemSpec]:
+    plan = {}
+    asrs_max = max(score for _, _, score in ASRS_RESPONSE_OPTIONS)
+    for q in ASRS_QUESTIONS:
+        # Questions 1-4, 7-11: inattention ; 5-6, 12-18: hyperactivité/impulsivité
+        plan[q.id] = ItemSpec(
+            instrument="asrs",
+            part=q.subcategory,
+            max_value=asrs_max,
+            subscale="inattention" if q.category == "inattention" else "hyperactivity",
+            shaded_threshold=(
+                ASRS_SHADED_THRESHOLDS.get(q.id, 2) if q.subcategory == "part_a" else None
+            ),
+        )
 
-    Méthode de scoring:
-    - Partie A (screener): Compter les réponses dans les zones grisées (>=seuil)
-    - Score total: Somme de toutes les réponses (0-4 par item)
-    """
-    part_a_score = 0
-    part_a_shaded = 0
-    part_b_score = 0
-    inattention = 0
-    hyperactivity = 0
+    diva_max = max(score for _, _, score in DIVA_RESPONSE_OPTIONS)
+    diva_parts = (
+        ("ia", DIVA_INATTENTION_CRITERIA),
+        ("hi", DIVA_HYPERACTIVITY_CRITERIA),
+        ("child", DIVA_CHILDHOOD_QUESTIONS),
+        ("imp", DIVA_IMPAIRMENT_DOMAINS),
+    )
+    for part, questions in diva_parts:
+        for q in questions:
+            plan[q.id] = ItemSpec(
+                instrument="diva",
+                part=part,
+                max_value=diva_max,
+                cluster=DIVA_IMPAIRMENT_LABELS.get(q.id),
+            )
 
-    for qid, value in responses.items():
-        if not qid.startswith("asrs_"):
-            continue
+    ef_max = max(score for _, _, score in EXEC_FUNCTION_RESPONSE_OPTIONS)
+    cluster_index = {cluster: i for i, cluster in enumerate(EF_CLUSTER_NAMES)}
+    for q in EXEC_FUNCTION_QUESTIONS:
+        plan[q.id] = ItemSpec(
+            instrument="ef",
+            part=q.category,
+            max_value=ef_max,
+            cluster=EF_CLUSTER_NAMES[q.category],
+            index=cluster_index[q.category],
+        )
+    return plan
 
-        q_num = int(qid.split("_")[1])
 
-        # Partie A (questions 1-6)
-        if q_num <= 6:
-            part_a_score += value
-            # Vérifier si dans zone grisée
-            threshold = ASRS_SHADED_THRESHOLDS.get(qid, 2)
-            if value >= threshold:
-                part_a_shaded += 1
-        else:
-            part_b_score += value
+SCORING_PLAN: Dict[str, ItemSpec] = _compile_plan()
+_EF_CLUSTER_LABELS = tuple(EF_CLUSTER_NAMES.values())
 
-        # Catégorisation inattention vs hyperactivité
-        # Questions 1-4, 7-11: inattention
-        # Questions 5-6, 12-18: hyperactivité/impulsivité
-        if q_num in [1, 2, 3, 4, 7, 8, 9, 10, 11]:
-            inattention += value
-        else:
-            hyperactivity += value
 
-    total = part_a_score + part_b_score
-    screening_positive = part_a_shaded >= 4
+class _Tally:
+    """Compteurs bruts accumulés en une passe sur les réponses."""
+    __slots__ = (
+        "asrs_part_a", "asrs_shaded", "asrs_part_b", "asrs_inattention", "asrs_hyperactivity",
+        "diva_ia", "diva_hi", "diva_child", "impairment_domains",
+        "ef_scores", "ef_counts",
+    )
 
-    # Interprétation
+    def __init__(self):
+        self.asrs_part_a = 0
+        self.asrs_shaded = 0
+        self.asrs_part_b = 0
+        self.asrs_inattention = 0
+        self.asrs_hyperactivity = 0
+        self.diva_ia = 0
+        self.diva_hi = 0
+        self.diva_child = 0
+        self.impairment_domains = []
+        self.ef_scores = [0] * len(EF_CLUSTER_NAMES)
+        self.ef_counts = [0] * len(EF_CLUSTER_NAMES)
+
+
+def _tally(responses: Dict[str, int]) -> _Tally:
+    """Parcourt les réponses une seule fois; les identifiants inconnus sont ignorés."""
+    t = _Tally()
+    plan = SCORING_PLAN
+    for qid, value in responses.items():
+        spec = plan.get(qid)
+        if spec is None:
+            continue
+        instrument = spec.instrument
+        if instrument == "asrs":
+            if spec.shaded_threshold is not None:
+                t.asrs_part_a += value
+                if value >= spec.shaded_threshold:
+                    t.asrs_shaded += 1
+            else:
+                t.asrs_part_b += value
+            if spec.subscale == "inattention":
+                t.asrs_inattention += value
+            else:
+                t.asrs_hyperactivity += value
+        elif instrument == "ef":
+            t.ef_scores[spec.index] += value
+            t.ef_counts[spec.index] += 1
+        elif value == 1:
+            part = spec.part
+            if part == "ia":
+                t.diva_ia += 1
+            elif part == "hi":
+                t.diva_hi += 1
+            elif part == "child":
+                t.diva_child += 1
+            else:
+                t.impairment_domains.append(spec.cluster)
+    return t
+
+
+# =============================================================================
+# Textes d'interprétation précalculés
+# Les textes ne dépendent que de quelques caractéristiques des scores: tous
+# les cas atteignables sont énumérés à l'import dans des tables de décision,
+# et le scoring se limite ensuite à une recherche par tuple.
+# =============================================================================
+
+def _asrs_text(screening_positive: bool, high_total: bool) -> Tuple[str, str]:
+    """(interprétation, recommandation) de l'ASRS."""
     if screening_positive:
         interpretation = (
             "Le dépistage est POSITIF. Vos réponses suggèrent des symptômes "
@@ -113,7 +232,7 @@ def score_asrs(responses: Dict[str, int]) -> ASRSResult:
             "spécialisé dans le TDAH adulte pour une évaluation diagnostique complète."
         )
     else:
-        if total >= 36:  # >50% du score max
+        if high_total:  # >50% du score max
             interpretation = (
                 "Le dépistage est négatif mais votre score total est relativement élevé. "
                 "Certains symptômes peuvent être présents sans atteindre le seuil clinique, "
@@ -133,68 +252,27 @@ def score_asrs(responses: Dict[str, int]) -> ASRSResult:
                 "attention ou votre comportement, n'hésitez pas à en discuter "
                 "avec votre médecin."
             )
+    return interpretation, recommendation
 
-    return ASRSResult(
-        part_a_score=part_a_score,
-        part_a_shaded_count=part_a_shaded,
-        part_b_score=part_b_score,
-        total_score=total,
-        inattention_score=inattention,
-        hyperactivity_score=hyperactivity,
-        screening_positive=screening_positive,
-        interpretation=interpretation,
-        recommendation=recommendation,
-    )
-
-
-def score_diva(responses: Dict[str, int]) -> DIVAResult:
-    """
-    Évalue les critères DSM-5 selon le format DIVA.
 
-    Critères DSM-5 pour adultes (17+ ans):
-    - ≥5 symptômes d'inattention ET/OU
-    - ≥5 symptômes d'hyperactivité-impulsivité
-    - Symptômes présents avant 12 ans
-    - Retentissement dans ≥2 domaines de vie
-    """
-    inattention_count = 0
-    hyperactivity_count = 0
-    childhood_symptoms = 0
-    impairment_domains = []
+def _presentation(meets_inattention: bool, meets_hyperactivity: bool) -> str:
+    """Profil symptomatique (sans étiquetage diagnostique)."""
+    if meets_inattention and meets_hyperactivity:
+        return "Inattention + Hyperactivité/Impulsivité"
+    elif meets_inattention:
+        return "Inattention prédominante"
+    elif meets_hyperactivity:
+        return "Hyperactivité/Impulsivité prédominante"
+    return "Sous les seuils cliniques"
 
-    for qid, value in responses.items():
-        if qid.startswith("diva_ia_") and value == 1:
-            inattention_count += 1
-        elif qid.startswith("diva_hi_") and value == 1:
-            hyperactivity_count += 1
-        elif qid.startswith("diva_child_") and value == 1:
-            childhood_symptoms += 1
-        elif qid.startswith("diva_imp_") and value == 1:
-            domain_map = {
-                "diva_imp_1": "Travail/Études",
-                "diva_imp_2": "Relations familiales",
-                "diva_imp_3": "Relations sociales",
-                "diva_imp_4": "Loisirs",
-                "diva_imp_5": "Estime de soi",
-            }
-            if qid in domain_map:
-                impairment_domains.append(domain_map[qid])
 
+def _diva_text(inattention_count: int, hyperactivity_count: int,
+               childhood_symptoms: int, domain_count: int) -> Tuple[str, str]:
+    """(profil symptomatique, interprétation) selon les critères DSM-5."""
     meets_inattention = inattention_count >= 5
     meets_hyperactivity = hyperactivity_count >= 5
     childhood_positive = childhood_symptoms >= 2
 
-    # Déterminer le profil symptomatique (sans étiquetage diagnostique)
-    if meets_inattention and meets_hyperactivity:
-        presentation = "Inattention + Hyperactivité/Impulsivité"
-    elif meets_inattention:
-        presentation = "Inattention prédominante"
-    elif meets_hyperactivity:
-        presentation = "Hyperactivité/Impulsivité prédominante"
-    else:
-        presentation = "Sous les seuils cliniques"
-
-    # Interprétation
     criteria_met = []
     criteria_not_met = []
 
@@ -213,10 +291,10 @@ def score_diva(responses: Dict[str, int]) -> DIVAResult:
     else:
         criteria_not_met.append(f"Critère B (Début avant 12 ans): {childhood_symptoms}/5 indicateurs positifs")
 
-    if len(impairment_domains) >= 2:
-        criteria_met.append(f"Critère C/D (Retentissement): {len(impairment_domains)} domaines affectés")
+    if domain_count >= 2:
+        criteria_met.append(f"Critère C/D (Retentissement): {domain_count} domaines affectés")
     else:
-        criteria_not_met.append(f"Critère C/D (Retentissement): {len(impairment_domains)} domaine(s) affecté(s) (≥2 requis)")
+        criteria_not_met.append(f"Critère C/D (Retentissement): {domain_count} domaine(s) affecté(s) (≥2 requis)")
 
     interpretation_parts = []
     if criteria_met:
@@ -224,93 +302,24 @@ def score_diva(responses: Dict[str, int]) -> DIVAResult:
     if criteria_not_met:
         interpretation_parts.append("Critères non remplis:\n• " + "\n• ".join(criteria_not_met))
 
-    interpretation = "\n\n".join(interpretation_parts)
-
-    return DIVAResult(
-        inattention_count=inattention_count,
-        hyperactivity_count=hyperactivity_count,
-        childhood_positive=childhood_positive,
-        impairment_domains=impairment_domains,
-        meets_inattention_criteria=meets_inattention,
-        meets_hyperactivity_criteria=meets_hyperactivity,
-        presentation_type=presentation,
-        interpretation=interpretation,
-    )
-
+    presentation = _presentation(meets_inattention, meets_hyperactivity)
+    return presentation, "\n\n".join(interpretation_parts)
 
-def score_executive_functions(responses: Dict[str, int]) -> ExecFunctionResult:
-    """
-    Évalue les 6 clusters de fonctions exécutives.
 
-    Clusters (modèle de Brown):
-    - Activation: organisation, priorisation, démarrage
-    - Focus: attention soutenue, résistance à la distraction
-    - Effort: régulation de l'éveil, vitesse de traitement
-    - Émotion: gestion de la frustration, modulation des affects
-    - Mémoire: mémoire de travail, rappel
-    - Action: inhibition, auto-régulation
-    """
-    cluster_mapping = {
-        "activation": "ef_act_",
-        "focus": "ef_foc_",
-        "effort": "ef_eff_",
-        "emotion": "ef_emo_",
-        "memoire": "ef_mem_",
-        "action": "ef_act2_",
-    }
-
-    cluster_names_fr = {
-        "activation": "Activation",
-        "focus": "Attention/Focus",
-        "effort": "Effort/Énergie",
-        "emotion": "Régulation émotionnelle",
-        "memoire": "Mémoire de travail",
-        "action": "Inhibition/Action",
-    }
-
-    cluster_scores = {}
-    total = 0
-    max_total = 0
-
-    for cluster, prefix in cluster_mapping.items():
-        score = 0
-        count = 0
-        for qid, value in responses.items():
-            if qid.startswith(prefix):
-                score += value
-                count += 1
-        max_score = count * 3  # Max 3 par question
-        cluster_scores[cluster_names_fr[cluster]] = (score, max_score)
-        total += score
-        max_total += max_score
-
-    # Identifier les clusters les plus impactés (>50% du max)
-    impaired = []
-    for name, (score, max_s) in cluster_scores.items():
-        if max_s > 0 and (score / max_s) >= 0.5:
-            impaired.append(name)
-
-    # Déterminer la sévérité globale
-    if max_total > 0:
-        percentage = (total / max_total) * 100
-    else:
-        percentage = 0
-
-    if percentage >= 66:
-        severity = "Élevé"
+def _exec_text(severity: str, impaired: Tuple[str, ...]) -> str:
+    """Interprétation des fonctions exécutives."""
+    if severity == "Élevé":
         interp = (
             "Vos réponses indiquent des difficultés significatives dans plusieurs "
             "domaines des fonctions exécutives. Ces difficultés sont fréquemment "
             "associées au TDAH mais peuvent aussi être présentes dans d'autres conditions."
         )
-    elif percentage >= 40:
-        severity = "Modéré"
+    elif severity == "Modéré":
         interp = (
             "Vos réponses suggèrent des difficultés modérées dans certains domaines "
             "des fonctions exécutives. Une évaluation plus approfondie pourrait être utile."
         )
     else:
-        severity = "Faible"
         interp = (
             "Vos réponses ne suggèrent pas de difficultés majeures dans les "
             "fonctions exécutives évaluées."
@@ -318,58 +327,31 @@ def score_executive_functions(responses: Dict[str, int]) -> ExecFunctionResult:
 
     if impaired:
         interp += f"\n\nDomaines les plus impactés: {', '.join(impaired)}."
-
-    return ExecFunctionResult(
-        cluster_scores=cluster_scores,
-        total_score=total,
-        max_score=max_total,
-        most_impaired_clusters=impaired,
-        interpretation=interp,
-        severity=severity,
-    )
-
-
-@dataclass
-class GlobalAssessment:
-    """Évaluation globale combinant tous les questionnaires."""
-    asrs: ASRSResult
-    diva: DIVAResult
-    exec_functions: ExecFunctionResult
-    summary: str
-    clinical_recommendation: str
-    confidence_level: str
+    return interp
 
 
-def generate_global_assessment(
-    asrs: ASRSResult,
-    diva: DIVAResult,
-    exec_func: ExecFunctionResult
-) -> GlobalAssessment:
-    """Génère une évaluation globale synthétisant tous les résultats."""
+def _global_text(asrs_positive: bool, meets_inattention: bool, meets_hyperactivity: bool,
+                 presentation: str, severity: str) -> Tuple[str, str, str]:
+    """(synthèse, recommandation, niveau de confiance) de l'évaluation globale."""
+    diva_positive = meets_inattention or meets_hyperactivity
+    ef_positive = severity in ["Modéré", "Élevé"]
 
     # Compter les indicateurs positifs
-    positive_indicators = 0
+    positive_indicators = asrs_positive + diva_positive + ef_positive
     total_indicators = 3
 
-    if asrs.screening_positive:
-        positive_indicators += 1
-    if diva.meets_inattention_criteria or diva.meets_hyperactivity_criteria:
-        positive_indicators += 1
-    if exec_func.severity in ["Modéré", "Élevé"]:
-        positive_indicators += 1
-
     # Générer le résumé
     if positive_indicators >= 2:
         summary = (
             f"SYNTHÈSE: {positive_indicators}/{total_indicators} outils d'évaluation suggèrent "
             "des symptômes compatibles avec un TDAH.\n\n"
         )
-        if asrs.screening_positive:
+        if asrs_positive:
             summary += "• ASRS: Dépistage POSITIF\n"
-        if diva.meets_inattention_criteria or diva.meets_hyperactivity_criteria:
-            summary += f"• Critères DSM-5: Présentation {diva.presentation_type}\n"
-        if exec_func.severity in ["Modéré", "Élevé"]:
-            summary += f"• Fonctions exécutives: Difficultés de niveau {exec_func.severity}\n"
+        if diva_positive:
+            summary += f"• Critères DSM-5: Présentation {presentation}\n"
+        if ef_positive:
+            summary += f"• Fonctions exécutives: Difficultés de niveau {severity}\n"
 
         confidence = "Élevée" if positive_indicators == 3 else "Modérée"
         recommendation = (
@@ -400,6 +382,314 @@ def generate_global_assessment(
             "Si vous avez des préoccupations persistantes, n'hésitez pas à "
             "consulter un professionnel de santé."
         )
+    return summary, recommendation, confidence
+
+
+def _interned(texts):
+    if isinstance(texts, str):
+        return sys.intern(texts)
+    return tuple(sys.intern(text) for text in texts)
+
+
+def _lookup(table: dict, key: tuple, build):
+    """Recherche dans une table de décision; repli sur le calcul pour une clé hors table."""
+    texts = table.get(key)
+    if texts is None:
+        texts = build(*key)
+    return texts
+
+
+SEVERITY_LEVELS = ("Faible", "Modéré", "Élevé")
+_BOOLS = (False, True)
+_DIVA_PART_SIZES = Counter(s.part for s in SCORING_PLAN.values() if s.instrument == "diva")
+
+# (dépistage positif, total ≥ 36) -> (interprétation, recommandation)
+ASRS_TEXT_TABLE = {key: _interned(_asrs_text(*key)) for key in product(_BOOLS, _BOOLS)}
+
+# (symptômes A1, symptômes A2, indicateurs enfance, domaines affectés) -> (profil, interprétation)
+DIVA_TEXT_TABLE = {
+    key: _interned(_diva_text(*key))
+    for key in product(*(range(_DIVA_PART_SIZES[part] + 1) for part in ("ia", "hi", "child", "imp")))
+}
+
+# (sévérité, clusters impactés) -> interprétation
+EXEC_TEXT_TABLE = {
+    (severity, impaired): _interned(_exec_text(severity, impaired))
+    for severity in SEVERITY_LEVELS
+    for impaired in (
+        tuple(name for name, hit in zip(_EF_CLUSTER_LABELS, mask) if hit)
+        for mask in product(_BOOLS, repeat=len(_EF_CLUSTER_LABELS))
+    )
+}
+
+# (ASRS positif, critère A1, critère A2, profil, sévérité EF) -> (synthèse, recommandation, confiance)
+GLOBAL_TEXT_TABLE = {
+    (asrs_positive, meets_ia, meets_hi, _presentation(meets_ia, meets_hi), severity):
+        _interned(_global_text(asrs_positive, meets_ia, meets_hi, _presentation(meets_ia, meets_hi), severity))
+    for asrs_positive, meets_ia, meets_hi in product(_BOOLS, repeat=3)
+    for severity in SEVERITY_LEVELS
+}
+
+
+def _asrs_result(t: _Tally) -> ASRSResult:
+    part_a_score = t.asrs_part_a
+    part_b_score = t.asrs_part_b
+    total = part_a_score + part_b_score
+    screening_positive = t.asrs_shaded >= 4
+    interpretation, recommendation = _lookup(
+        ASRS_TEXT_TABLE, (screening_positive, total >= 36), _asrs_text
+    )
+
+    return ASRSResult(
+        part_a_score=part_a_score,
+        part_a_shaded_count=t.asrs_shaded,
+        part_b_score=part_b_score,
+        total_score=total,
+        inattention_score=t.asrs_inattention,
+        hyperactivity_score=t.asrs_hyperactivity,
+        screening_positive=screening_positive,
+        interpretation=interpretation,
+        recommendation=recommendation,
+    )
+
+
+def _diva_result(t: _Tally) -> DIVAResult:
+    impairment_domains = t.impairment_domains
+    presentation, interpretation = _lookup(
+        DIVA_TEXT_TABLE,
+        (t.diva_ia, t.diva_hi, t.diva_child, len(impairment_domains)),
+        _diva_text,
+    )
+
+    return DIVAResult(
+        inattention_count=t.diva_ia,
+        hyperactivity_count=t.diva_hi,
+        childhood_positive=t.diva_child >= 2,
+        impairment_domains=impairment_domains,
+        meets_inattention_criteria=t.diva_ia >= 5,
+        meets_hyperactivity_criteria=t.diva_hi >= 5,
+        presentation_type=presentation,
+        interpretation=interpretation,
+    )
+
+
+def _exec_result(t: _Tally) -> ExecFunctionResult:
+    cluster_scores = {}
+    total = 0
+    max_total = 0
+
+    for name, score, count in zip(_EF_CLUSTER_LABELS, t.ef_scores, t.ef_counts):
+        max_score = count * 3  # Max 3 par question
+        cluster_scores[name] = (score, max_score)
+        total += score
+        max_total += max_score
+
+    # Identifier les clusters les plus impactés (>50% du max)
+    impaired = []
+    for name, (score, max_s) in cluster_scores.items():
+        if max_s > 0 and (score / max_s) >= 0.5:
+            impaired.append(name)
+
+    # Déterminer la sévérité globale
+    if max_total > 0:
+        percentage = (total / max_total) * 100
+    else:
+        percentage = 0
+
+    if percentage >= 66:
+        severity = "Élevé"
+    elif percentage >= 40:
+        severity = "Modéré"
+    else:
+        severity = "Faible"
+
+    return ExecFunctionResult(
+        cluster_scores=cluster_scores,
+        total_score=total,
+        max_score=max_total,
+        most_impaired_clusters=impaired,
+        interpretation=_lookup(EXEC_TEXT_TABLE, (severity, tuple(impaired)), _exec_text),
+        severity=severity,
+    )
+
+
+@timed(SCORING_SECONDS)
+def score_asrs(responses: Dict[str, int]) -> ASRSResult:
+    """
+    Calcule les scores ASRS selon les méthodes validées.
+
+    Méthode de scoring:
+    - Partie A (screener): Compter les réponses dans les zones grisées (>=seuil)
+    - Score total: Somme de toutes les réponses (0-4 par item)
+    """
+    return _asrs_result(_tally(responses))
+
+
+@timed(SCORING_SECONDS)
+def score_diva(responses: Dict[str, int]) -> DIVAResult:
+    """
+    Évalue les critères DSM-5 selon le format DIVA.
+
+    Critères DSM-5 pour adultes (17+ ans):
+    - ≥5 symptômes d'inattention ET/OU
+    - ≥5 symptômes d'hyperactivité-impulsivité
+    - Symptômes présents avant 12 ans
+    - Retentissement dans ≥2 domaines de vie
+    """
+    return _diva_result(_tally(responses))
+
+
+@timed(SCORING_SECONDS)
+def score_executive_functions(responses: Dict[str, int]) -> ExecFunctionResult:
+    """
+    Évalue les 6 clusters de fonctions exécutives.
+
+    Clusters (modèle de Brown):
+    - Activation: organisation, priorisation, démarrage
+    - Focus: attention soutenue, résistance à la distraction
+    - Effort: régulation de l'éveil, vitesse de traitement
+    - Émotion: gestion de la frustration, modulation des affects
+    - Mémoire: mémoire de travail, rappel
+    - Action: inhibition, auto-régulation
+    """
+    return _exec_result(_tally(responses))
+
+
+@timed(SCORING_SECONDS)
+def score_all(responses: Dict[str, int]) -> Tuple[ASRSResult, DIVAResult, ExecFunctionResult]:
+    """Score les trois questionnaires en une seule passe sur les réponses."""
+    t = _tally(responses)
+    return _asrs_result(t), _diva_result(t), _exec_result(t)
+
+
+# =============================================================================
+# Scoring incrémental
+# Les compteurs de _Tally sont tenus à jour réponse par réponse dans un état
+# sérialisable (liste d'entiers, conservée en session): l'évaluation s'en
+# déduit sans reparcourir les réponses.
+# =============================================================================
+
+_IMPAIRMENT_BITS = {
+    qid: bit for bit, qid in enumerate(
+        qid for qid, spec in SCORING_PLAN.items() if spec.instrument == "diva" and spec.part == "imp"
+    )
+}
+# Positions dans l'état: compteurs ASRS et DIVA, masque des domaines de vie
+# affectés, puis scores et nombres de réponses des clusters EF
+(_PART_A, _SHADED, _PART_B, _INATTENTION, _HYPERACTIVITY,
+ _DIVA_IA, _DIVA_HI, _DIVA_CHILD, _IMPAIRMENT) = range(9)
+_EF_SCORES = 9
+_EF_COUNTS = _EF_SCORES + len(EF_CLUSTER_NAMES)
+TALLY_STATE_SIZE = _EF_COUNTS + len(EF_CLUSTER_NAMES)
+_DIVA_COUNTERS = {"ia": _DIVA_IA, "hi": _DIVA_HI, "child": _DIVA_CHILD}
+
+
+def _apply(state: List[int], qid: str, spec: ItemSpec, value: int, sign: int) -> None:
+    instrument = spec.instrument
+    if instrument == "asrs":
+        if spec.shaded_threshold is not None:
+            state[_PART_A] += sign * value
+            if value >= spec.shaded_threshold:
+                state[_SHADED] += sign
+        else:
+            state[_PART_B] += sign * value
+        state[_INATTENTION if spec.subscale == "inattention" else _HYPERACTIVITY] += sign * value
+    elif instrument == "ef":
+        state[_EF_SCORES + spec.index] += sign * value
+        state[_EF_COUNTS + spec.index] += sign
+    elif value == 1:
+        if spec.part == "imp":
+            bit = 1 << _IMPAIRMENT_BITS[qid]
+            state[_IMPAIRMENT] = state[_IMPAIRMENT] | bit if sign > 0 else state[_IMPAIRMENT] & ~bit
+        else:
+            state[_DIVA_COUNTERS[spec.part]] += sign
+
+
+def update_tally_state(state: List[int], qid: str, old: Optional[int], new: Optional[int]) -> None:
+    """
+    Remplace, dans l'état, la contribution de l'ancienne réponse à la
+    question par celle de la nouvelle (None: sans réponse). Les identifiants
+    inconnus sont ignorés, comme dans le scoring complet.
+    """
+    spec = SCORING_PLAN.get(qid)
+    if spec is None:
+        return
+    if old is not None:
+        _apply(state, qid, spec, old, -1)
+    if new is not None:
+        _apply(state, qid, spec, new, 1)
+
+
+def new_tally_state(responses: Optional[Dict[str, int]] = None) -> List[int]:
+    """État des compteurs d'un jeu de réponses (vide par défaut)."""
+    state = [0] * TALLY_STATE_SIZE
+    for qid, value in (responses or {}).items():
+        update_tally_state(state, qid, None, value)
+    return state
+
+
+def _tally_from_state(state: List[int]) -> _Tally:
+    t = _Tally()
+    (t.asrs_part_a, t.asrs_shaded, t.asrs_part_b, t.asrs_inattention, t.asrs_hyperactivity,
+     t.diva_ia, t.diva_hi, t.diva_child, mask) = state[:_EF_SCORES]
+    # Domaines dans l'ordre des questionnaires, comme pour des réponses canoniques
+    t.impairment_domains = [
+        SCORING_PLAN[qid].cluster for qid, bit in _IMPAIRMENT_BITS.items() if mask >> bit & 1
+    ]
+    t.ef_scores = list(state[_EF_SCORES:_EF_COUNTS])
+    t.ef_counts = list(state[_EF_COUNTS:])
+    return t
+
+
+@timed(SCORING_SECONDS)
+def assessment_from_tally_state(state: List[int]) -> "GlobalAssessment":
+    """Évaluation globale déduite de l'état des compteurs, sans les réponses."""
+    t = _tally_from_state(state)
+    return generate_global_assessment(_asrs_result(t), _diva_result(t), _exec_result(t))
+
+
+def running_scores(state: List[int]) -> Dict[str, object]:
+    """Sous-scores courants (saisie en cours), lus directement dans l'état."""
+    return {
+        "asrs_part_a_shaded_count": state[_SHADED],
+        "asrs_total_score": state[_PART_A] + state[_PART_B],
+        "diva_inattention_count": state[_DIVA_IA],
+        "diva_hyperactivity_count": state[_DIVA_HI],
+        "diva_childhood_count": state[_DIVA_CHILD],
+        "diva_impairment_domains": bin(state[_IMPAIRMENT]).count("1"),
+        "ef_cluster_scores": dict(zip(EF_CLUSTER_NAMES, state[_EF_SCORES:_EF_COUNTS])),
+    }
+
+
+@dataclass
+class GlobalAssessment:
+    """Évaluation globale combinant tous les questionnaires."""
+    asrs: ASRSResult
+    diva: DIVAResult
+    exec_functions: ExecFunctionResult
+    summary: str
+    clinical_recommendation: str
+    confidence_level: str
+
+
+@timed(SCORING_SECONDS)
+def generate_global_assessment(
+    asrs: ASRSResult,
+    diva: DIVAResult,
+    exec_func: ExecFunctionResult
+) -> GlobalAssessment:
+    """Génère une évaluation globale synthétisant tous les résultats."""
+    summary, recommendation, confidence = _lookup(
+        GLOBAL_TEXT_TABLE,
+        (
+            asrs.screening_positive,
+            diva.meets_inattention_criteria,
+            diva.meets_hyperactivity_criteria,
+            diva.presentation_type,
+            exec_func.severity,
+        ),
+        _global_text,
+    )
 
     return GlobalAssessment(
         asrs=asrs,
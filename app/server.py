@@ -0,0 +1,546 @@
+"""
+Serveur de production: processus maître et workers préforkés (POSIX).
+
+Usage:
+    python run.py serve [--bind 127.0.0.1:5001] [--workers 4] [--threads 8]
+
+Le maître crée l'application une seule fois (create_app), précompile les
+gabarits et le balisage des questionnaires, puis appelle gc.freeze():
+les objets chargés avant le fork ne sont plus visités par le ramasse-miettes
+et les pages mémoire qui les portent restent partagées (copy-on-write) entre
+les workers. Chaque worker sert la socket d'écoute héritée avec un nombre
+borné de threads; les connexions HTTP/1.1 restent ouvertes entre deux
+requêtes (keep-alive) jusqu'au délai d'inactivité.
+
+Signaux du maître:
+- SIGTERM, SIGINT: arrêt gracieux (requêtes en cours terminées, au plus
+  --graceful-timeout secondes);
+- SIGHUP: rechargement gracieux, l'application est recréée (configuration
+  FLASK_* relue) et les workers remplacés sans interruption du service;
+  le code Python n'est pas rechargé: redémarrer le maître pour cela;
+- SIGQUIT: arrêt immédiat.
+
+Un worker se recycle après --max-requests requêtes (plus un décalage
+aléatoire, --max-requests-jitter, pour que les workers ne redémarrent pas
+ensemble): la croissance mémoire d'un processus reste plafonnée.
+
+Le serveur refuse de démarrer sans FLASK_SECRET_KEY (clé des cookies de
+session). Les workers ne partagent pas leur mémoire: les jobs PDF
+asynchrones sont conservés sur disque (PDF_JOB_STORE=disk, défaut ici)
+pour être suivis depuis n'importe quel worker. Avec plus d'un worker, le
+serveur refuse de démarrer sur un stockage propre à un processus
+(PDF_JOB_STORE=memory, SESSION_BACKEND=memory).
+"""
+
+import argparse
+import errno
+import gc
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from werkzeug.exceptions import InternalServerError
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from werkzeug.wsgi import LimitedStream
+
+# Erreurs d'un client parti en cours de réponse
+_DROPPED = (ConnectionError, socket.timeout)
+
+logger = logging.getLogger(__name__)
+
+# Signaux traités par la boucle du maître
+_MASTER_SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT, signal.SIGHUP, signal.SIGCHLD)
+
+
+class ConfigError(Exception):
+    """Configuration de l'application incompatible avec le serveur préforké."""
+
+
+def check_app(app, workers: int) -> None:
+    """
+    Refuse une clé de session publique (celle du développement), et un état
+    propre à un processus quand plusieurs workers servent les requêtes.
+    """
+    from . import DEV_SECRET_KEY
+
+    if not app.secret_key or app.secret_key == DEV_SECRET_KEY:
+        raise ConfigError(
+            "clé de session de développement: les cookies de session seraient falsifiables; "
+            "définir FLASK_SECRET_KEY (ex. python -c 'import secrets; print(secrets.token_hex(32))')"
+        )
+    if workers <= 1:
+        return
+    jobs = app.extensions.get('pdf_jobs')
+    if jobs is not None and not jobs.shared:
+        raise ConfigError(
+            f"PDF_JOB_STORE={app.config.get('PDF_JOB_STORE')}: les jobs PDF ne seraient visibles "
+            "que du worker qui les a créés; utiliser PDF_JOB_STORE=disk ou --workers 1"
+        )
+    if app.config.get('SESSION_BACKEND') == 'memory':
+        raise ConfigError(
+            "SESSION_BACKEND=memory: les sessions ne seraient visibles que du worker qui les a "
+            "créées; utiliser SESSION_BACKEND=cookie ou sqlite, ou --workers 1"
+        )
+
+
+def preload(app) -> None:
+    """Compile les gabarits et pré-rend les questionnaires avant le fork."""
+    from .views import PAGES, render_questions
+
+    env = app.jinja_env
+    for name in env.list_templates(filter_func=lambda name: name.endswith('.html')):
+        if not name.startswith('pdf/'):  # gabarits du rapport: environnement du rendu PDF
+            env.get_template(name)
+    with app.app_context():
+        for page in PAGES:
+            render_questions(page, {})
+
+
+# Reste d'un corps de requête non lu par l'application, lu pour garder la connexion
+_MAX_DRAIN = 64 * 1024
+
+
+class _RequestHandler(WSGIRequestHandler):
+    """
+    Gestionnaire HTTP/1.1 avec connexions keep-alive.
+
+    Le serveur de Werkzeug ferme chaque connexion après une réponse, faute
+    de savoir où finit le corps de la requête. Ici le corps est borné par
+    Content-Length (ou par le codage chunked), et le reste non lu par
+    l'application est consommé avant la requête suivante. L'environnement
+    WSGI est celui de Werkzeug.
+    """
+
+    worker: 'Worker'
+    # En-têtes et corps écrits séparément: sans TCP_NODELAY, l'algorithme de
+    # Nagle retarde la réponse jusqu'à l'acquittement du client (~40 ms)
+    disable_nagle_algorithm = True
+
+    def run_wsgi(self):
+        # Décompté avant la réponse: la dernière requête avant recyclage annonce la fermeture
+        self.worker.request_started()
+        self._run_wsgi()
+        if not self.worker.alive:
+            # Arrêt en cours: pas de nouvelle requête sur cette connexion
+            self.close_connection = True
+
+    def _run_wsgi(self):
+        if self.headers.get('Expect', '').lower().strip(' \t') == '100-continue':
+            self.wfile.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+        environ = self.environ = self.make_environ()
+        body = environ['wsgi.input']
+        if not environ.get('wsgi.input_terminated'):
+            try:
+                length = max(0, int(environ.get('CONTENT_LENGTH') or 0))
+            except ValueError:
+                length = 0
+                self.close_connection = True
+            body = environ['wsgi.input'] = LimitedStream(self.rfile, length)
+
+        state = {'status': None, 'headers': None, 'sent': False, 'chunked': False}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and state['sent']:
+                raise exc_info[1].with_traceback(exc_info[2])
+            state['status'], state['headers'] = status, headers
+            return write
+
+        def send_headers():
+            code, _, reason = state['status'].partition(' ')
+            code = int(code)
+            self.send_response(code, reason)
+            names = set()
+            for name, value in state['headers']:
+                self.send_header(name, value)
+                names.add(name.lower())
+            if not ('content-length' in names or environ['REQUEST_METHOD'] == 'HEAD'
+                    or 100 <= code < 200 or code in (204, 304)):
+                if self.request_version >= 'HTTP/1.1':
+                    state['chunked'] = True
+                    self.send_header('Transfer-Encoding', 'chunked')
+                else:
+                    self.close_connection = True  # fin du corps signalée par la fermeture
+            if self.close_connection or not self.worker.alive:
+                self.send_header('Connection', 'close')
+            self.end_headers()
+            state['sent'] = True
+
+        def write(data: bytes) -> None:
+            if not state['sent']:
+                send_headers()
+            if data:
+                if state['chunked']:
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                else:
+                    self.wfile.write(data)
+
+        try:
+            app_iter = self.server.app(environ, start_response)
+            try:
+                for data in app_iter:
+                    write(data)
+                if not state['sent']:
+                    send_headers()
+                if state['chunked']:
+                    self.wfile.write(b'0\r\n\r\n')
+                self.wfile.flush()
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+        except _DROPPED as exc:
+            self.connection_dropped(exc, environ)
+            self.close_connection = True
+            return
+        except Exception:
+            self.close_connection = True
+            logger.exception("Erreur pendant le traitement de %s", self.path)
+            if not state['sent']:
+                # Réponse pas encore commencée: erreur 500; sinon la fermeture l'interrompt
+                for data in InternalServerError()(environ, start_response):
+                    write(data)
+                self.wfile.flush()
+            return
+
+        if isinstance(body, LimitedStream) and not body.is_exhausted:
+            if body.limit - body._pos > _MAX_DRAIN:
+                self.close_connection = True
+            else:
+                body.exhaust()
+        elif not isinstance(body, LimitedStream) and not getattr(body, '_done', True):
+            self.close_connection = True
+
+    def log_request(self, code='-', size='-'):
+        if self.worker.access_log:
+            super().log_request(code, size)
+
+    def log_error(self, format, *args):
+        # Fermeture d'une connexion keep-alive inactive: cas normal
+        if not format.startswith('Request timed out'):
+            super().log_error(format, *args)
+
+
+class _PoolServer(BaseWSGIServer):
+    """Serveur WSGI sur une socket héritée, requêtes servies par un pool de threads borné."""
+
+    multithread = True
+    multiprocess = True
+    request_queue_size = 1024
+
+    def __init__(self, worker: 'Worker', app, listener: socket.socket):
+        handler = type('RequestHandler', (_RequestHandler,), {
+            'worker': worker,
+            'timeout': worker.keep_alive,
+            'protocol_version': 'HTTP/1.1',
+        })
+        host, port = listener.getsockname()[:2]
+        super().__init__(host, port, app, handler=handler, fd=listener.fileno())
+        self.worker = worker
+        self.socket.setblocking(False)  # socket partagée: un autre worker peut prendre la connexion
+        self._threads = ThreadPoolExecutor(max_workers=worker.threads, thread_name_prefix='http')
+        self._free = threading.Semaphore(worker.threads)
+
+    def serve(self) -> None:
+        selector_timeout = 1.0
+        while self.worker.alive:
+            # Pas d'acceptation sans thread libre: la connexion reste disponible pour les autres workers
+            if not self._free.acquire(timeout=selector_timeout):
+                continue
+            try:
+                ready, _, _ = select.select([self.socket], [], [], selector_timeout)
+            except InterruptedError:
+                ready = ()
+            if not ready or not self.worker.alive:
+                self._free.release()
+                continue
+            try:
+                request, client_address = self.socket.accept()
+            except (BlockingIOError, InterruptedError, ConnectionAbortedError):
+                self._free.release()
+                continue
+            self._threads.submit(self._process, request, client_address)
+        self._threads.shutdown(wait=True)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._free.release()
+
+
+class Worker:
+    """Processus worker: sert la socket d'écoute jusqu'à l'arrêt ou au recyclage."""
+
+    def __init__(self, app, listener: socket.socket, threads: int, keep_alive: float,
+                 max_requests: int, access_log: bool):
+        self.app = app
+        self.listener = listener
+        self.threads = threads
+        self.keep_alive = keep_alive
+        self.max_requests = max_requests
+        self.access_log = access_log
+        self.alive = True
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._master = os.getppid()
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.requests += 1
+            if self.max_requests and self.requests >= self.max_requests and self.alive:
+                logger.info("Worker %d recyclé après %d requêtes", os.getpid(), self.requests)
+                self.alive = False
+
+    def _stop(self, signum, frame) -> None:
+        self.alive = False
+
+    def _watch_master(self) -> None:
+        while self.alive:
+            if os.getppid() != self._master:
+                logger.warning("Maître disparu, arrêt du worker %d", os.getpid())
+                self.alive = False
+            time.sleep(1.0)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C: le maître arrête les workers
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGQUIT, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        threading.Thread(target=self._watch_master, name='master-watch', daemon=True).start()
+        if self.app.config.get('PDF_WARM_UP'):
+            self.app.extensions['pdf_render_pool'].start_warm_up()
+        server = _PoolServer(self, self.app, self.listener)
+        server.serve()
+        self.app.extensions['pdf_render_pool'].shutdown()
+        exporter = self.app.extensions.get('metrics')
+        if exporter is not None:
+            exporter.flush()
+
+
+class Arbiter:
+    """Processus maître: crée l'application, lance, surveille et remplace les workers."""
+
+    def __init__(self, app_factory: Callable, bind: str = '127.0.0.1:5001', workers: int = 2,
+                 threads: int = 4, keep_alive: float = 5.0, max_requests: int = 0,
+                 max_requests_jitter: int = 0, graceful_timeout: float = 30.0,
+                 access_log: bool = False):
+        self.app_factory = app_factory
+        self.bind = bind
+        self.num_workers = max(1, workers)
+        self.threads = max(1, threads)
+        self.keep_alive = keep_alive
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.access_log = access_log
+        self.app = None
+        self.listener: Optional[socket.socket] = None
+        self.generation = 0
+        self.workers: Dict[int, int] = {}  # pid -> génération
+        self._signals = []
+        self._stopping_at: Optional[float] = None
+        self._retiring: Dict[int, float] = {}  # pid -> échéance de l'arrêt gracieux
+
+    # -- Application -----------------------------------------------------------
+
+    def load(self) -> None:
+        """(Re)crée l'application et gèle les objets chargés avant les forks."""
+        gc.unfreeze()
+        try:
+            # Warm-up PDF différé aux workers: ni thread ni processus de rendu avant le fork
+            app = self.app_factory({'SERVER_PRELOAD': True})
+            check_app(app, self.num_workers)
+        except ConfigError:
+            gc.freeze()
+            raise
+        self.app = app
+        preload(self.app)
+        gc.collect()
+        gc.freeze()
+
+    def _listen(self) -> socket.socket:
+        host, _, port = self.bind.rpartition(':')
+        host = host.strip('[]') or '0.0.0.0'
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, int(port)))
+        sock.listen(_PoolServer.request_queue_size)
+        sock.set_inheritable(True)
+        return sock
+
+    # -- Workers -----------------------------------------------------------------
+
+    def spawn(self) -> int:
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            max_requests += random.randint(0, self.max_requests_jitter)
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = self.generation
+            return pid
+        # Processus worker
+        status = 0
+        try:
+            signal.set_wakeup_fd(-1)
+            for fd in self._pipe:
+                os.close(fd)
+            Worker(self.app, self.listener, self.threads, self.keep_alive,
+                   max_requests, self.access_log).run()
+        except Exception:
+            logger.exception("Worker %d arrêté sur une erreur", os.getpid())
+            status = 1
+        finally:
+            # Jamais de retour dans la boucle du maître, ni de ses gestionnaires atexit
+            os._exit(status)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            self.workers.pop(pid, None)
+            self._retiring.pop(pid, None)
+            code = os.waitstatus_to_exitcode(status)
+            if code and self._stopping_at is None:
+                logger.warning("Worker %d terminé (code %d)", pid, code)
+
+    def _kill(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _manage(self) -> None:
+        now = time.monotonic()
+        current = [pid for pid, generation in self.workers.items() if generation == self.generation]
+        for _ in range(self.num_workers - len(current)):
+            self.spawn()
+        # Rechargement: anciens workers arrêtés une fois les nouveaux lancés
+        for pid, generation in list(self.workers.items()):
+            if generation != self.generation and pid not in self._retiring:
+                self._kill(pid, signal.SIGTERM)
+                self._retiring[pid] = now + self.graceful_timeout
+        for pid, deadline in list(self._retiring.items()):
+            if now >= deadline:
+                self._kill(pid, signal.SIGKILL)
+
+    def reload(self) -> None:
+        logger.info("Rechargement: nouvelle génération de workers")
+        try:
+            self.load()
+        except ConfigError as exc:
+            logger.error("Rechargement refusé, workers actuels conservés: %s", exc)
+            return
+        self.generation += 1
+
+    def stop(self, graceful: bool = True) -> None:
+        if self._stopping_at is None:
+            self._stopping_at = time.monotonic() + (self.graceful_timeout if graceful else 0)
+        for pid in self.workers:
+            self._kill(pid, signal.SIGTERM if graceful else signal.SIGKILL)
+
+    # -- Boucle principale -----------------------------------------------------
+
+    def _on_signal(self, signum, frame) -> None:
+        self._signals.append(signum)
+
+    def _wait(self, timeout: float) -> None:
+        try:
+            select.select([self._pipe[0]], [], [], timeout)
+        except InterruptedError:
+            pass
+        try:
+            while os.read(self._pipe[0], 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def run(self) -> int:
+        self.listener = self._listen()
+        self.load()
+        self._pipe = os.pipe()
+        for fd in self._pipe:
+            os.set_blocking(fd, False)
+        signal.set_wakeup_fd(self._pipe[1])
+        for signum in _MASTER_SIGNALS:
+            signal.signal(signum, self._on_signal)
+        logger.info("Écoute sur %s: %d workers × %d threads (maître %d)",
+                    self.bind, self.num_workers, self.threads, os.getpid())
+        try:
+            while True:
+                self._reap()
+                while self._signals:
+                    signum = self._signals.pop(0)
+                    if signum in (signal.SIGTERM, signal.SIGINT):
+                        self.stop()
+                    elif signum == signal.SIGQUIT:
+                        self.stop(graceful=False)
+                    elif signum == signal.SIGHUP and self._stopping_at is None:
+                        self.reload()
+                if self._stopping_at is not None:
+                    if not self.workers:
+                        return 0
+                    if time.monotonic() >= self._stopping_at:
+                        self.stop(graceful=False)
+                else:
+                    self._manage()
+                self._wait(1.0)
+        finally:
+            self.listener.close()
+
+
+def main(argv=None, prog: str = 'python -m app.server') -> int:
+    parser = argparse.ArgumentParser(prog=prog, description="Sert l'application avec des workers préforkés.")
+    parser.add_argument('--bind', default='127.0.0.1:5001', help="adresse:port d'écoute (défaut: 127.0.0.1:5001)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="processus workers (défaut: nombre de cœurs)")
+    parser.add_argument('--threads', type=int, default=4, help="threads par worker (défaut: 4)")
+    parser.add_argument('--keep-alive', type=float, default=5.0,
+                        help="délai d'inactivité d'une connexion keep-alive, en secondes (défaut: 5)")
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help="requêtes avant recyclage d'un worker (0: jamais)")
+    parser.add_argument('--max-requests-jitter', type=int, default=0,
+                        help="décalage aléatoire ajouté à --max-requests")
+    parser.add_argument('--graceful-timeout', type=float, default=30.0,
+                        help="délai accordé aux requêtes en cours à l'arrêt, en secondes (défaut: 30)")
+    parser.add_argument('--access-log', action='store_true', help="journalise chaque requête")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, 'fork'):
+        parser.error("le serveur préforké nécessite un système POSIX (fork)")
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(process)d %(levelname)s %(message)s')
+    from . import create_app
+
+    arbiter = Arbiter(create_app, bind=args.bind, workers=args.workers, threads=args.threads,
+                      keep_alive=args.keep_alive, max_requests=args.max_requests,
+                      max_requests_jitter=args.max_requests_jitter,
+                      graceful_timeout=args.graceful_timeout, access_log=args.access_log)
+    try:
+        return arbiter.run()
+    except ConfigError as exc:
+        print(f"Configuration incompatible: {exc}", file=sys.stderr)
+        return 1
+    except OSError as exc:
+        if exc.errno == errno.EADDRINUSE:
+            print(f"Adresse déjà utilisée: {args.bind}", file=sys.stderr)
+            return 1
+        raise
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Sessions côté serveur (optionnelles).
+
+Par défaut, Flask conserve la session dans un cookie signé: toutes les
+réponses du questionnaire voyagent alors dans chaque requête et sont
+sérialisées, signées et vérifiées à chaque fois. Avec SESSION_BACKEND
+"memory" ou "sqlite", le cookie ne contient plus qu'un identifiant opaque
+et les données restent sur le serveur:
+
+- "memory": dictionnaire du processus, borné (LRU); adapté à un seul
+  processus servant les requêtes (threads);
+- "sqlite": base SQLite locale partagée par les processus de la machine,
+  par défaut <instance>/sessions.sqlite3 (répertoire 0700, fichiers 0600).
+
+Une session expire SESSION_TTL secondes après sa dernière modification;
+les sessions expirées sont purgées périodiquement. En SQLite, les réponses
+sont stockées sous leur forme compacte (codec).
+"""
+
+import copy
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from . import codec
+
+DEFAULT_CONFIG = {
+    'SESSION_BACKEND': 'cookie',      # "cookie" (Flask), "memory" ou "sqlite"
+    'SESSION_TTL': 2 * 3600,          # secondes d'inactivité avant expiration
+    'SESSION_MAX_ENTRIES': 10000,     # sessions conservées au plus ("memory")
+    'SESSION_SQLITE_PATH': None,      # défaut: <instance>/sessions.sqlite3 (privé)
+}
+
+# Intervalle minimal entre deux purges des sessions expirées (secondes)
+SWEEP_INTERVAL = 60.0
+
+
+# Clé des réponses encodées dans les sessions sérialisées
+_PACKED_RESPONSES = 'responses~'
+
+
+def dumps_session(data: dict) -> str:
+    """JSON de la session, réponses encodées par le codec (32 caractères au lieu d'un objet)."""
+    responses = data.get('responses')
+    if isinstance(responses, dict):
+        try:
+            packed = codec.pack_text(responses)
+        except ValueError:
+            pass  # valeur hors plage: conservée telle quelle
+        else:
+            data = {key: value for key, value in data.items() if key != 'responses'}
+            data[_PACKED_RESPONSES] = packed
+    return json.dumps(data, separators=(',', ':'))
+
+
+def loads_session(text: str) -> dict:
+    data = json.loads(text)
+    packed = data.pop(_PACKED_RESPONSES, None)
+    if packed is not None:
+        data['responses'] = codec.unpack_text(packed)
+    return data
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dont seules les données modifiées sont réécrites dans le stockage."""
+
+    def __init__(self, initial=None, sid: Optional[str] = None, new: bool = False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class MemorySessionStore:
+    """
+    Sessions en mémoire du processus, bornées en nombre (les moins récentes
+    évincées). Les données sont copiées en profondeur à la lecture et à
+    l'écriture, comme le ferait une sérialisation: une session modifiée sans
+    être enregistrée (formulaire invalide) ne touche pas la copie stockée.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._data = OrderedDict()  # sid -> (expiration, données)
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+
+    def get(self, sid: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= self._clock():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return copy.deepcopy(data)
+
+    def set(self, sid: str, data: dict) -> None:
+        now = self._clock()
+        with self._lock:
+            self._data[sid] = (now + self.ttl, copy.deepcopy(data))
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def sweep(self) -> int:
+        """Supprime les sessions expirées; renvoie leur nombre."""
+        now = self._clock()
+        with self._lock:
+            self._last_sweep = now
+            expired = [sid for sid, (expires_at, _) in self._data.items() if expires_at <= now]
+            for sid in expired:
+                del self._data[sid]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _private_database(path: str) -> None:
+    """
+    Crée la base (et son répertoire) avec un accès réservé au compte du
+    service: répertoire 0700, fichier 0600. SQLite crée les fichiers -wal et
+    -shm avec les permissions de la base.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    try:
+        os.fchmod(fd, 0o600)
+    finally:
+        os.close(fd)
+    for suffix in ('-wal', '-shm'):
+        try:
+            os.chmod(path + suffix, 0o600, follow_symlinks=False)
+        except (FileNotFoundError, NotImplementedError):
+            pass
+
+
+class SqliteSessionStore:
+    """Sessions dans une base SQLite locale (une connexion par thread, journal WAL)."""
+
+    def __init__(self, path: str, ttl: float, clock: Callable[[], float] = time.time):
+        _private_database(path)
+        self.path = path
+        self.ttl = ttl
+        self._clock = clock
+        self._local = threading.local()
+        self._last_sweep = clock()
+        # Une connexion SQLite ne doit pas être utilisée de part et d'autre d'un fork
+        os.register_at_fork(after_in_child=self._forget_connections)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS sessions '
+                '(sid TEXT PRIMARY KEY, expires_at REAL NOT NULL, data TEXT NOT NULL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)')
+
+    def _forget_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0)
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def get(self, sid: str) -> Optional[dict]:
+        row = self._connect().execute(
+            'SELECT data FROM sessions WHERE sid = ? AND expires_at > ?', (sid, self._clock()),
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return loads_session(row[0])
+        except ValueError:
+            # Données illisibles ou altérées (réponses hors plage): session invalidée
+            self.delete(sid)
+            return None
+
+    def set(self, sid: str, data: dict) -> None:
+        now = self._clock()
+        with self._connect() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO sessions (sid, expires_at, data) VALUES (?, ?, ?)',
+                (sid, now + self.ttl, dumps_session(data)),
+            )
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+
+    def delete(self, sid: str) -> None:
+        with self._connect() as db:
+            db.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def sweep(self) -> int:
+        now = self._clock()
+        self._last_sweep = now
+        with self._connect() as db:
+            return db.execute('DELETE FROM sessions WHERE expires_at <= ?', (now,)).rowcount
+
+    def __len__(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Identifiant de session aléatoire dans le cookie, données dans le stockage."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request) -> ServerSideSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        # Identifiant absent, inconnu ou expiré: nouvel identifiant, jamais celui du client
+        return ServerSideSession(sid=secrets.token_urlsafe(24), new=True)
+
+    def save_session(self, app, session: ServerSideSession, response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not session.modified:
+            return
+        self.store.set(session.sid, dict(session))
+        response.vary.add('Cookie')
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain, path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def init_app(app) -> Optional[ServerSideSessionInterface]:
+    """Installe la session côté serveur choisie par SESSION_BACKEND (rien pour "cookie")."""
+    for key, value in DEFAULT_CONFIG.items():
+        app.config.setdefault(key, value)
+    backend = app.config['SESSION_BACKEND']
+    ttl = float(app.config['SESSION_TTL'])
+    if backend == 'cookie':
+        return None
+    if backend == 'memory':
+        store = MemorySessionStore(ttl, int(app.config['SESSION_MAX_ENTRIES']))
+    elif backend == 'sqlite':
+        path = app.config['SESSION_SQLITE_PATH']
+        if not path:
+            # Réponses au questionnaire (données de santé): répertoire privé de l'application
+            os.makedirs(app.instance_path, mode=0o700, exist_ok=True)
+            os.chmod(app.instance_path, 0o700)
+            path = os.path.join(app.instance_path, 'sessions.sqlite3')
+        store = SqliteSessionStore(path, ttl)
+    else:
+        raise ValueError(f"SESSION_BACKEND inconnu: {backend!r} (attendu: cookie, memory, sqlite)")
+    interface = ServerSideSessionInterface(store)
+    app.session_interface = interface
+    return interface
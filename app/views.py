@@ -0,0 +1,212 @@
+"""
+Données d'affichage des pages du questionnaire.
+
+Les regroupements de questions, les listes d'options et les identifiants
+lus dans chaque formulaire ne dépendent que des questionnaires: ils sont
+construits une fois à l'import, sous forme immuable, et partagés par toutes
+les requêtes.
+
+Le schéma des réponses (ANSWER_SCHEMA: identifiant -> valeurs admises)
+sert à lire les formulaires, y compris celui de la page unique
+(/evaluation, activée par QUESTIONNAIRE_SINGLE_PAGE) qui réunit les trois
+questionnaires.
+
+Le balisage des questions est lui aussi identique pour tous les
+répondants, à l'état coché des boutons près. Chaque page dispose d'un
+squelette (FormSkeleton): le fragment est rendu une fois avec un marqueur à
+la place de l'attribut "checked", et seul cet attribut est intercalé à
+chaque requête.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Tuple
+
+from flask import current_app
+from markupsafe import Markup
+
+from .questionnaires import (
+    ASRS_QUESTIONS, ASRS_RESPONSE_OPTIONS,
+    DIVA_INATTENTION_CRITERIA, DIVA_HYPERACTIVITY_CRITERIA,
+    DIVA_CHILDHOOD_QUESTIONS, DIVA_IMPAIRMENT_DOMAINS, DIVA_RESPONSE_OPTIONS,
+    EXEC_FUNCTION_QUESTIONS, EXEC_FUNCTION_RESPONSE_OPTIONS,
+)
+from .scoring import TALLY_STATE_SIZE, new_tally_state
+
+DEFAULT_CONFIG = {
+    'QUESTIONNAIRE_SINGLE_PAGE': False,  # les trois questionnaires sur une seule page
+}
+
+# Titres des clusters de fonctions exécutives dans le formulaire
+EXEC_CLUSTER_TITLES = MappingProxyType({
+    'activation': 'Activation (organisation, démarrage)',
+    'focus': 'Attention / Focus',
+    'effort': 'Effort / Énergie',
+    'emotion': 'Régulation émotionnelle',
+    'memoire': 'Mémoire de travail',
+    'action': 'Inhibition / Action',
+})
+
+
+class Cluster(NamedTuple):
+    name: str
+    questions: tuple
+
+
+@dataclass(frozen=True)
+class QuestionPage:
+    """Questions d'une page, groupées par section, et options de réponse."""
+    fragment: str                   # gabarit du balisage des questions
+    sections: Mapping[str, object]  # section -> questions (ou Cluster)
+    options: Tuple[tuple, ...]
+    question_ids: Tuple[str, ...]   # champs lus dans le formulaire, dans l'ordre des questions
+    choices: Mapping[str, int]      # valeur envoyée par le formulaire -> cotation
+
+    def read_form(self, form, responses: dict) -> dict:
+        """Reporte dans responses les réponses du formulaire envoyé (valeurs inconnues ignorées)."""
+        for qid in self.question_ids:
+            value = self.choices.get(form.get(qid))
+            if value is not None:
+                responses[qid] = value
+        return responses
+
+
+def _page(fragment: str, sections: Dict[str, object], options, questions) -> QuestionPage:
+    return QuestionPage(
+        fragment=fragment,
+        sections=MappingProxyType(sections),
+        options=tuple(tuple(option) for option in options),
+        question_ids=tuple(q.id for q in questions),
+        choices=MappingProxyType({str(score): score for _, _, score in options}),
+    )
+
+
+def _exec_clusters() -> Dict[str, Cluster]:
+    grouped: Dict[str, List] = {}
+    for q in EXEC_FUNCTION_QUESTIONS:
+        grouped.setdefault(q.category, []).append(q)
+    return {
+        category: Cluster(EXEC_CLUSTER_TITLES.get(category, category), tuple(questions))
+        for category, questions in grouped.items()
+    }
+
+
+ASRS_PAGE = _page(
+    'fragments/asrs_questions.html',
+    {
+        'part_a': tuple(q for q in ASRS_QUESTIONS if q.subcategory == 'part_a'),
+        'part_b': tuple(q for q in ASRS_QUESTIONS if q.subcategory == 'part_b'),
+    },
+    ASRS_RESPONSE_OPTIONS,
+    ASRS_QUESTIONS,
+)
+
+DIVA_PAGE = _page(
+    'fragments/diva_questions.html',
+    {
+        'inattention': tuple(DIVA_INATTENTION_CRITERIA),
+        'hyperactivity': tuple(DIVA_HYPERACTIVITY_CRITERIA),
+        'childhood': tuple(DIVA_CHILDHOOD_QUESTIONS),
+        'impairment': tuple(DIVA_IMPAIRMENT_DOMAINS),
+    },
+    DIVA_RESPONSE_OPTIONS,
+    DIVA_INATTENTION_CRITERIA + DIVA_HYPERACTIVITY_CRITERIA + DIVA_CHILDHOOD_QUESTIONS + DIVA_IMPAIRMENT_DOMAINS,
+)
+
+EXEC_PAGE = _page(
+    'fragments/executive_questions.html',
+    _exec_clusters(),
+    EXEC_FUNCTION_RESPONSE_OPTIONS,
+    EXEC_FUNCTION_QUESTIONS,
+)
+
+PAGES = (ASRS_PAGE, DIVA_PAGE, EXEC_PAGE)
+
+# Identifiant -> (valeur envoyée -> cotation), pour toutes les questions
+ANSWER_SCHEMA: Mapping[str, Mapping[str, int]] = MappingProxyType({
+    qid: page.choices for page in PAGES for qid in page.question_ids
+})
+
+
+def validate_answers(form) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Réponses de l'ensemble des questionnaires, et questions sans réponse
+    valide (absente ou hors des valeurs admises), dans l'ordre des pages.
+    """
+    responses = {}
+    missing = []
+    get = form.get
+    for qid, choices in ANSWER_SCHEMA.items():
+        value = choices.get(get(qid))
+        if value is None:
+            missing.append(qid)
+        else:
+            responses[qid] = value
+    return responses, missing
+
+
+def save_responses(session, responses: Dict[str, int]) -> None:
+    """Enregistre les réponses en session avec l'état des compteurs du scoring incrémental."""
+    session['responses'] = responses
+    session['tally'] = new_tally_state(responses)
+
+
+def session_tally(session) -> List[int]:
+    """État des compteurs de la session (recalculé s'il manque, ex. session plus ancienne)."""
+    state = session.get('tally')
+    if not isinstance(state, list) or len(state) != TALLY_STATE_SIZE:
+        state = new_tally_state(session.get('responses', {}))
+    return state
+
+
+# Marqueur de l'attribut "checked" dans le squelette
+_SLOT = '\x00'
+
+
+class FormSkeleton:
+    """
+    Balisage pré-rendu des questions d'une page: segments statiques entre
+    les emplacements de l'attribut "checked" de chaque bouton radio.
+    """
+
+    def __init__(self, template, page: QuestionPage):
+        slots: List[Tuple[str, int]] = []
+
+        def checked(qid, score):
+            slots.append((qid, score))
+            return Markup(_SLOT)
+
+        html = template.render(sections=page.sections, options=page.options, checked=checked)
+        self.segments = html.split(_SLOT)
+        self.slots = tuple(slots)
+        assert len(self.slots) == len(self.segments) - 1
+
+    def render(self, responses: dict) -> Markup:
+        """Balisage des questions, coché selon les réponses du répondant."""
+        segments = self.segments
+        parts = [segments[0]]
+        get = responses.get
+        for i, (qid, score) in enumerate(self.slots, 1):
+            if get(qid) == score:
+                parts.append('checked')
+            parts.append(segments[i])
+        return Markup(''.join(parts))
+
+
+def render_questions(page: QuestionPage, responses: dict) -> Markup:
+    """
+    Balisage des questions de la page pour ce répondant.
+
+    Le squelette est conservé par application; en rechargement automatique
+    des gabarits (mode debug), il est reconstruit à chaque requête pour
+    refléter les modifications.
+    """
+    env = current_app.jinja_env
+    if env.auto_reload:
+        return FormSkeleton(env.get_template(page.fragment), page).render(responses)
+    skeletons = current_app.extensions.setdefault('form_skeletons', {})
+    skeleton = skeletons.get(page.fragment)
+    if skeleton is None:
+        # Construction concurrente possible au premier appel: résultat identique
+        skeleton = skeletons[page.fragment] = FormSkeleton(env.get_template(page.fragment), page)
+    return skeleton.render(responses)
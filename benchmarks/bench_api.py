@@ -0,0 +1,59 @@
+"""
+Benchmark de l'API de scoring JSON face au parcours HTML.
+
+Usage: python -m benchmarks.bench_api [--n 200]
+
+- api: un POST /api/v1/score par évaluation (sans session ni gabarit);
+- html: parcours des formulaires (/start, /asrs, /diva, /executive puis
+  /results), avec la session signée dans le cookie.
+
+Les requêtes passent par le client de test Flask (WSGI en processus, sans
+réseau): le débit mesure le coût applicatif.
+"""
+
+import argparse
+import random
+import time
+
+from app import create_app
+from app.scoring import SCORING_PLAN
+
+
+def _responses(seed: int) -> dict:
+    rng = random.Random(seed)
+    return {qid: rng.randint(0, spec.max_value) for qid, spec in SCORING_PLAN.items()}
+
+
+def bench_api(client, samples) -> None:
+    for responses in samples:
+        response = client.post('/api/v1/score', json={'responses': responses})
+        assert response.status_code == 200
+
+
+def bench_html(client, samples) -> None:
+    for responses in samples:
+        form = {qid: str(value) for qid, value in responses.items()}
+        client.post('/start')
+        for path in ('/asrs', '/diva', '/executive'):
+            client.post(path, data=form)
+        assert client.get('/results').status_code == 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app({'PDF_RENDER_WORKERS': 0})
+    samples = [_responses(seed) for seed in range(args.n)]
+    for label, run in (('api', bench_api), ('html', bench_html)):
+        client = app.test_client()
+        run(client, samples[:10])  # préchauffage (gabarits compilés, caches)
+        start = time.perf_counter()
+        run(client, samples)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>4}: {args.n / elapsed:8.0f} évaluations/s ({elapsed / args.n * 1e6:6.0f} µs/évaluation)")
+
+
+if __name__ == '__main__':
+    main()
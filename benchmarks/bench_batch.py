@@ -0,0 +1,97 @@
+"""
+Benchmark du scoring vectorisé (score_batch) face au scoring scalaire.
+
+Usage: python -m benchmarks.bench_batch [--rows 1000000]
+
+Vérifie d'abord l'égalité exacte avec les fonctions scalaires sur un
+échantillon (réponses partielles incluses), puis mesure le débit.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.batch_scoring import (
+    COLUMNS, MISSING, SEVERITY_LABELS, PRESENTATION_LABELS, EF_CLUSTER_LABELS,
+    responses_to_matrix, score_batch,
+)
+from app.scoring import SCORING_PLAN, score_all, generate_global_assessment
+
+
+def random_matrix(rows: int, seed: int, missing_rate: float = 0.0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    high = np.array([SCORING_PLAN[qid].max_value + 1 for qid in COLUMNS])
+    matrix = (rng.random((rows, len(COLUMNS))) * high).astype(np.int8)
+    if missing_rate:
+        matrix[rng.random(matrix.shape) < missing_rate] = MISSING
+    return matrix
+
+
+def check_equivalence(samples: int, seed: int) -> None:
+    rng = random.Random(seed)
+    records = []
+    for _ in range(samples):
+        chosen = rng.sample(COLUMNS, rng.randint(0, len(COLUMNS)))
+        records.append({qid: rng.randint(0, SCORING_PLAN[qid].max_value) for qid in chosen})
+    batch = score_batch(responses_to_matrix(records))
+
+    for i, responses in enumerate(records):
+        asrs, diva, ef = score_all(responses)
+        assessment = generate_global_assessment(asrs, diva, ef)
+        assert batch.asrs_part_a_score[i] == asrs.part_a_score
+        assert batch.asrs_part_a_shaded_count[i] == asrs.part_a_shaded_count
+        assert batch.asrs_part_b_score[i] == asrs.part_b_score
+        assert batch.asrs_total_score[i] == asrs.total_score
+        assert batch.asrs_inattention_score[i] == asrs.inattention_score
+        assert batch.asrs_hyperactivity_score[i] == asrs.hyperactivity_score
+        assert batch.asrs_screening_positive[i] == asrs.screening_positive
+        assert batch.diva_inattention_count[i] == diva.inattention_count
+        assert batch.diva_hyperactivity_count[i] == diva.hyperactivity_count
+        assert batch.diva_childhood_positive[i] == diva.childhood_positive
+        assert batch.diva_impairment_count[i] == len(diva.impairment_domains)
+        assert PRESENTATION_LABELS[batch.diva_presentation[i]] == diva.presentation_type
+        assert dict(zip(EF_CLUSTER_LABELS, zip(
+            batch.ef_cluster_scores[i].tolist(), batch.ef_cluster_max[i].tolist()
+        ))) == ef.cluster_scores
+        assert batch.ef_total_score[i] == ef.total_score
+        assert batch.ef_max_score[i] == ef.max_score
+        assert [c for c, hit in zip(EF_CLUSTER_LABELS, batch.ef_impaired_clusters[i]) if hit] \
+            == ef.most_impaired_clusters
+        assert SEVERITY_LABELS[batch.ef_severity[i]] == ef.severity
+        expected_positive = sum((
+            asrs.screening_positive,
+            diva.meets_inattention_criteria or diva.meets_hyperactivity_criteria,
+            ef.severity in ("Modéré", "Élevé"),
+        ))
+        assert batch.positive_indicators[i] == expected_positive
+        assert assessment.confidence_level  # synthèse calculable
+    print(f"Équivalence scalaire/vectorisé: OK ({samples} répondants)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--check', type=int, default=5000, help="répondants vérifiés")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    check_equivalence(args.check, args.seed)
+
+    matrix = random_matrix(args.rows, args.seed)
+    start = time.perf_counter()
+    score_batch(matrix)
+    elapsed = time.perf_counter() - start
+    print(f"score_batch, {args.rows:,} lignes: {elapsed:.2f} s ({args.rows / elapsed:,.0f} lignes/s)")
+
+    sample = [dict(zip(COLUMNS, row)) for row in matrix[:20000].tolist()]
+    start = time.perf_counter()
+    for responses in sample:
+        score_all(responses)
+    elapsed = time.perf_counter() - start
+    print(f"score_all scalaire, {len(sample):,} lignes: {len(sample) / elapsed:,.0f} lignes/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark du codec compact des réponses: taille, vitesse et aller-retour.
+
+Usage: python -m benchmarks.bench_codec [--n 20000]
+
+Compare la forme compacte (octets, texte base64 URL) au dictionnaire JSON,
+mesure l'encodage et le décodage unitaires et par lot (NumPy), et vérifie
+que chaque jeu de réponses, complet ou partiel, est restitué à l'identique.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from app import codec
+from app.scoring import SCORING_PLAN
+
+
+def _samples(n: int, seed: int = 0) -> list:
+    """Jeux complets et partiels (environ 20 % de questions sans réponse)."""
+    rng = random.Random(seed)
+    return [
+        {qid: rng.randint(0, spec.max_value) for qid, spec in SCORING_PLAN.items()
+         if i % 2 == 0 or rng.random() > 0.2}
+        for i in range(n)
+    ]
+
+
+def _rate(label: str, func, count: int) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<26} {count / elapsed:>12,.0f} jeux/s ({elapsed / count * 1e6:6.2f} µs/jeu)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=20000)
+    args = parser.parse_args()
+    samples = _samples(args.n)
+
+    full = samples[0]
+    print(f"JSON: {len(json.dumps(full, separators=(',', ':')))} octets, "
+          f"compact: {len(codec.pack(full))} octets ({codec.BITS} bits utiles), "
+          f"texte: {len(codec.pack_text(full))} caractères")
+
+    packed = [codec.pack(r) for r in samples]
+    assert [codec.unpack(p) for p in packed] == samples
+    assert [codec.unpack_text(codec.pack_text(r)) for r in samples[:1000]] == samples[:1000]
+    print(f"aller-retour: {len(samples)} jeux identiques")
+
+    texts = [json.dumps(r) for r in samples]
+    _rate("json.dumps", lambda: [json.dumps(r) for r in samples], args.n)
+    _rate("json.loads", lambda: [json.loads(text) for text in texts], args.n)
+    _rate("pack", lambda: [codec.pack(r) for r in samples], args.n)
+    _rate("unpack", lambda: [codec.unpack(p) for p in packed], args.n)
+
+    try:
+        from app.batch_scoring import responses_to_matrix
+    except ImportError:
+        print("lot: NumPy absent, ignoré")
+        return
+    matrix = responses_to_matrix(samples)
+    blob = codec.pack_matrix(matrix)
+    assert [bytes(row) for row in blob] == packed
+    assert (codec.unpack_matrix(blob) == matrix).all()
+    _rate("pack_matrix", lambda: codec.pack_matrix(matrix), args.n)
+    _rate("unpack_matrix", lambda: codec.unpack_matrix(blob), args.n)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Budget de temps d'import de l'application.
+
+Usage: python -m benchmarks.bench_import_time [--budget 500] [--runs 3]
+
+Mesure `import app` dans un interpréteur neuf avec `python -X importtime`
+(meilleur de plusieurs essais), puis vérifie que create_app() ne charge
+aucune dépendance de rendu PDF: WeasyPrint n'est importé que par les
+processus de rendu. Le pic RSS d'un processus qui a créé l'application sans
+rendre de PDF (celui d'un worker web) est affiché.
+
+Code de sortie 1 si le budget est dépassé ou si une dépendance lourde est
+importée: utilisable tel quel en intégration continue.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules qui ne doivent pas être chargés par un worker qui ne rend pas de PDF
+HEAVY_MODULES = ('weasyprint', 'pydyf', 'fontTools', 'cffi', 'numpy', 'app.pdf_generator')
+
+_PROBE = """
+import json, resource, sys
+import app
+app.create_app()
+print(json.dumps({
+    'loaded': sorted(m for m in %r if m in sys.modules),
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+""" % (HEAVY_MODULES,)
+
+
+def import_time_ms() -> float:
+    """Durée cumulée de `import app` (ms) dans un interpréteur neuf."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    )
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == 'app':
+            return int(parts[1]) / 1000
+    raise RuntimeError("import app absent de la sortie -X importtime")
+
+
+def probe() -> dict:
+    """Modules lourds chargés et pic RSS après create_app()."""
+    result = subprocess.run([sys.executable, '-c', _PROBE], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=500.0, help="budget de `import app` en ms")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    best = min(import_time_ms() for _ in range(args.runs))
+    state = probe()
+    print(f"import app: {best:.0f} ms (budget {args.budget:.0f} ms)")
+    print(f"pic RSS après create_app(): {state['rss_kb'] / 1024:.1f} Mo")
+    failed = best > args.budget
+    if state['loaded']:
+        print(f"modules lourds chargés au démarrage: {', '.join(state['loaded'])}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
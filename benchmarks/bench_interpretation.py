@@ -0,0 +1,91 @@
+"""
+Vérification et benchmark des tables de décision des textes d'interprétation.
+
+Usage: python -m benchmarks.bench_interpretation [--n 20000]
+
+1. Chaque entrée des tables est comparée au texte construit par les fonctions
+   d'origine (_asrs_text, _diva_text, _exec_text, _global_text).
+2. Toutes les combinaisons DIVA sont réalisées par de vraies réponses, et des
+   jeux aléatoires couvrent l'ASRS et les fonctions exécutives: chaque clé
+   produite par le scoring doit être présente dans les tables.
+3. Le coût de construction des textes est comparé à la recherche en table.
+"""
+
+import argparse
+import random
+import time
+from itertools import product
+
+from app import scoring
+from app.scoring import SCORING_PLAN, generate_global_assessment, score_all
+
+
+def check_tables() -> None:
+    tables = (
+        (scoring.ASRS_TEXT_TABLE, scoring._asrs_text),
+        (scoring.DIVA_TEXT_TABLE, scoring._diva_text),
+        (scoring.EXEC_TEXT_TABLE, scoring._exec_text),
+        (scoring.GLOBAL_TEXT_TABLE, scoring._global_text),
+    )
+    for table, build in tables:
+        for key, texts in table.items():
+            assert texts == build(*key), key
+    print(f"Tables identiques aux textes construits: {sum(len(t) for t, _ in tables)} clés")
+
+
+def _ids(part: str):
+    return [qid for qid, s in SCORING_PLAN.items() if s.instrument == "diva" and s.part == part]
+
+
+def check_coverage(n: int, seed: int) -> None:
+    ia, hi, child, imp = _ids("ia"), _ids("hi"), _ids("child"), _ids("imp")
+    for counts in product(range(len(ia) + 1), range(len(hi) + 1),
+                          range(len(child) + 1), range(len(imp) + 1)):
+        responses = {}
+        for ids, count in zip((ia, hi, child, imp), counts):
+            responses.update({qid: int(i < count) for i, qid in enumerate(ids)})
+        diva = scoring.score_diva(responses)
+        assert (diva.presentation_type, diva.interpretation) == scoring.DIVA_TEXT_TABLE[counts]
+
+    rng = random.Random(seed)
+    ids = list(SCORING_PLAN)
+    for _ in range(n):
+        chosen = rng.sample(ids, rng.randint(0, len(ids)))
+        responses = {qid: rng.randint(0, SCORING_PLAN[qid].max_value) for qid in chosen}
+        asrs, diva, ef = score_all(responses)
+        assessment = generate_global_assessment(asrs, diva, ef)
+        assert (asrs.screening_positive, asrs.total_score >= 36) in scoring.ASRS_TEXT_TABLE
+        assert (ef.severity, tuple(ef.most_impaired_clusters)) in scoring.EXEC_TEXT_TABLE
+        key = (asrs.screening_positive, diva.meets_inattention_criteria,
+               diva.meets_hyperactivity_criteria, diva.presentation_type, ef.severity)
+        assert scoring.GLOBAL_TEXT_TABLE[key][0] is assessment.summary
+    print(f"Couverture: toutes les clés produites par le scoring sont en table ({n} jeux aléatoires)")
+
+
+def bench(n: int) -> None:
+    keys = list(scoring.DIVA_TEXT_TABLE)
+    samples = [keys[i % len(keys)] for i in range(n)]
+    for label, func in (
+        ("construction des textes", lambda k: scoring._diva_text(*k)),
+        ("recherche en table", scoring.DIVA_TEXT_TABLE.__getitem__),
+    ):
+        start = time.perf_counter()
+        for key in samples:
+            func(key)
+        elapsed = time.perf_counter() - start
+        print(f"DIVA, {label:<24} {elapsed / n * 1e6:6.2f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    check_tables()
+    check_coverage(args.n, args.seed)
+    bench(args.n)
+
+
+if __name__ == '__main__':
+    main()
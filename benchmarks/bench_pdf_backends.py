@@ -0,0 +1,66 @@
+"""
+Benchmark des moteurs de rendu PDF: latence, pic mémoire et taille par rapport.
+
+Usage: python -m benchmarks.bench_pdf_backends [--n 20] [--backend direct ...]
+
+Chaque moteur est préparé comme dans un processus du pool (warm_up), puis
+rend n rapports. Le pic mémoire est mesuré par tracemalloc sur un rendu
+isolé (allocations Python uniquement: celles de pango/cairo n'y figurent pas).
+Un moteur dont les dépendances sont absentes est signalé et ignoré.
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.cache import assess
+from app.pdf_renderers import RENDERERS, create_renderer
+from app.report_content import REPORT_QUESTIONS
+from app.scoring import SCORING_PLAN
+
+
+def _responses(seed: int) -> dict:
+    rng = random.Random(seed)
+    return {qid: rng.randint(0, spec.max_value) for qid, spec in SCORING_PLAN.items()}
+
+
+def bench(n: int, backends) -> None:
+    responses = _responses(7)
+    assessment = assess(responses)
+    generated_at = datetime(2026, 1, 1, 12, 0)
+
+    for name in backends:
+        renderer = create_renderer(name)
+        try:
+            renderer.warm_up()
+        except (ImportError, OSError) as exc:
+            print(f"{name}: ignoré ({exc})")
+            continue
+        timings = []
+        for _ in range(n):
+            start = time.perf_counter()
+            pdf = renderer.render(assessment, responses, REPORT_QUESTIONS, generated_at)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        renderer.render(assessment, responses, REPORT_QUESTIONS, generated_at)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>10}: médiane {statistics.median(timings) * 1000:7.1f} ms, "
+              f"min {min(timings) * 1000:7.1f} ms, pic {peak / 1024:7.0f} Ko, {len(pdf)} octets")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=20)
+    parser.add_argument('--backend', action='append', choices=sorted(RENDERERS),
+                        help="moteur à mesurer (répétable; défaut: tous)")
+    args = parser.parse_args()
+    bench(args.n, args.backend or list(RENDERERS))
+
+
+if __name__ == '__main__':
+    main()
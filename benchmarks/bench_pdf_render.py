@@ -0,0 +1,67 @@
+"""
+Benchmark du rendu PDF: état des styles et polices froid ou chaud.
+
+Usage: python -m benchmarks.bench_pdf_render [--n 20] [--embed-fonts]
+
+- froid: feuilles de style analysées et FontConfiguration recréée à chaque
+  rendu (coût d'un processus neuf);
+- chaud: état partagé créé une fois par processus, comme dans le pool de rendu.
+
+Chaque rendu est décomposé en étapes: HTML (gabarit Jinja), mise en page et
+écriture du PDF.
+
+Nécessite WeasyPrint et ses dépendances système (pango).
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+
+from app import pdf_generator
+from app.cache import assess
+from app.pdf_generator import REPORT_QUESTIONS, generate_pdf_report
+from app.scoring import SCORING_PLAN
+
+
+def _responses(seed: int) -> dict:
+    rng = random.Random(seed)
+    return {qid: rng.randint(0, spec.max_value) for qid, spec in SCORING_PLAN.items()}
+
+
+def bench(n: int, embed_fonts: bool) -> None:
+    responses = _responses(7)
+    assessment = assess(responses)
+    generated_at = datetime(2026, 1, 1, 12, 0)
+
+    for label, cold in (("froid", True), ("chaud", False)):
+        pdf_generator.configure(embed_fonts)
+        pdf_generator.warm_up()
+        timings = []
+        stages = {}
+        for _ in range(n):
+            if cold:
+                pdf_generator.configure(embed_fonts)
+            start = time.perf_counter()
+            stage_timings = {}
+            pdf = generate_pdf_report(assessment, responses, REPORT_QUESTIONS, generated_at,
+                                      timings=stage_timings)
+            timings.append(time.perf_counter() - start)
+            for stage, secs in stage_timings.items():
+                stages.setdefault(stage, []).append(secs)
+        detail = ", ".join(f"{stage} {statistics.median(values) * 1000:.2f}" for stage, values in stages.items())
+        print(f"{label}: médiane {statistics.median(timings) * 1000:7.1f} ms, "
+              f"min {min(timings) * 1000:7.1f} ms ({len(pdf)} octets) [ms: {detail}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=20)
+    parser.add_argument('--embed-fonts', action='store_true')
+    args = parser.parse_args()
+    bench(args.n, args.embed_fonts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark du scoring par requête (chemin /results et /download-pdf).
+
+Usage: python -m benchmarks.bench_scoring [--n 20000]
+
+Compare trois appels séparés (score_asrs, score_diva, score_executive_functions)
+au scoring en une seule passe (score_all), suivis de generate_global_assessment.
+"""
+
+import argparse
+import random
+import time
+
+from app.questionnaires import (
+    ASRS_QUESTIONS,
+    DIVA_INATTENTION_CRITERIA, DIVA_HYPERACTIVITY_CRITERIA,
+    DIVA_CHILDHOOD_QUESTIONS, DIVA_IMPAIRMENT_DOMAINS,
+    EXEC_FUNCTION_QUESTIONS,
+)
+from app import scoring
+
+
+def random_responses(rng: random.Random) -> dict:
+    """Jeu de réponses complet, trié par clé comme une session Flask."""
+    responses = {q.id: rng.randint(0, 4) for q in ASRS_QUESTIONS}
+    for group in (DIVA_INATTENTION_CRITERIA, DIVA_HYPERACTIVITY_CRITERIA,
+                  DIVA_CHILDHOOD_QUESTIONS, DIVA_IMPAIRMENT_DOMAINS):
+        responses.update({q.id: rng.randint(0, 1) for q in group})
+    responses.update({q.id: rng.randint(0, 3) for q in EXEC_FUNCTION_QUESTIONS})
+    return dict(sorted(responses.items()))
+
+
+def bench(label: str, func, samples: list) -> float:
+    start = time.perf_counter()
+    for responses in samples:
+        func(responses)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / len(samples) * 1e6
+    print(f"{label:<28} {per_call:8.2f} µs/évaluation  ({len(samples) / elapsed:,.0f}/s)")
+    return per_call
+
+
+def three_calls(responses):
+    return scoring.generate_global_assessment(
+        scoring.score_asrs(responses),
+        scoring.score_diva(responses),
+        scoring.score_executive_functions(responses),
+    )
+
+
+def single_pass(responses):
+    return scoring.generate_global_assessment(*scoring.score_all(responses))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=20000, help="nombre de jeux de réponses")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [random_responses(rng) for _ in range(args.n)]
+
+    # Échauffement
+    three_calls(samples[0])
+
+    before = bench("3 scorers + synthèse", three_calls, samples)
+    if hasattr(scoring, 'score_all'):
+        after = bench("score_all + synthèse", single_pass, samples)
+        print(f"Gain: x{before / after:.2f}")
+
+
+if __name__ == '__main__':
+    main()
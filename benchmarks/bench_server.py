@@ -0,0 +1,152 @@
+"""
+Débit et mémoire du serveur préforké (python run.py serve).
+
+Usage: python -m benchmarks.bench_server [--workers 1,2,4] [--threads 4] [--clients 8] [--duration 5]
+
+Pour chaque nombre de workers, le serveur est lancé sur un port libre puis
+chargé par des processus clients (connexions keep-alive) qui parcourent un
+mélange de requêtes: page d'accueil, page ASRS avec session, POST
+/api/v1/score. Affiche le débit, les latences p50/p99, puis la mémoire de
+chaque worker: RSS, et PSS (mémoire proportionnelle: les pages partagées
+avec le maître et les autres workers y sont réparties), qui montre le gain
+du préchargement et de gc.freeze().
+
+Linux uniquement (lecture de /proc). Les clients tournent sur la même
+machine: sur peu de cœurs, ils prennent une part du CPU mesuré.
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Le serveur n'a pas démarré")
+
+
+def _client(port: int, duration: float, seed: int) -> list:
+    """Boucle d'un client: latences (s) des requêtes réussies."""
+    from app.scoring import SCORING_PLAN
+
+    rng = random.Random(seed)
+    body = json.dumps({'responses': {qid: rng.randint(0, spec.max_value) for qid, spec in SCORING_PLAN.items()}})
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    conn.request('POST', '/start')
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie', '').split(';')[0]
+    requests = (
+        ('GET', '/', None, {}),
+        ('GET', '/asrs', None, {'Cookie': cookie}),
+        ('POST', '/api/v1/score', body, {'Content-Type': 'application/json'}),
+    )
+    latencies = []
+    deadline = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < deadline:
+        method, path, payload, headers = requests[i % len(requests)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, payload, headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        if response.status == 200:
+            latencies.append(time.perf_counter() - start)
+        if response.getheader('Connection') == 'close':
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    return latencies
+
+
+def _memory_kb(pid: int) -> dict:
+    """RSS et PSS (Ko) d'un processus."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def _children(pid: int) -> list:
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def run(workers: int, threads: int, clients: int, duration: float) -> None:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, 'run.py', 'serve', '--bind', f'127.0.0.1:{port}',
+         '--workers', str(workers), '--threads', str(threads)],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env={**os.environ, 'FLASK_SECRET_KEY': os.environ.get('FLASK_SECRET_KEY') or secrets.token_hex(32)},
+    )
+    try:
+        _wait_ready(port)
+        with multiprocessing.Pool(clients) as pool:
+            pool.starmap(_client, [(port, 0.5, seed) for seed in range(clients)])  # préchauffage
+            start = time.perf_counter()
+            results = pool.starmap(_client, [(port, duration, seed) for seed in range(clients)])
+            elapsed = time.perf_counter() - start
+        latencies = sorted(latency for result in results for latency in result)
+        p50 = latencies[len(latencies) // 2] * 1e3
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+        print(f"{workers} worker(s) × {threads} threads: {len(latencies) / elapsed:7.0f} req/s "
+              f"(p50 {p50:.1f} ms, p99 {p99:.1f} ms)")
+        master = _memory_kb(server.pid)
+        print(f"    maître: RSS {master['rss'] / 1024:.1f} Mo")
+        for pid in _children(server.pid):
+            memory = _memory_kb(pid)
+            print(f"    worker {pid}: RSS {memory['rss'] / 1024:.1f} Mo, PSS {memory['pss'] / 1024:.1f} Mo")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4', help="nombres de workers testés (liste)")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=8, help="processus clients")
+    parser.add_argument('--duration', type=float, default=5.0, help="durée de chaque mesure (s)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cœur(s), {args.clients} clients keep-alive")
+    for workers in (int(value) for value in args.workers.split(',')):
+        run(workers, args.threads, args.clients, args.duration)
+
+
+if __name__ == '__main__':
+    main()
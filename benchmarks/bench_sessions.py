@@ -0,0 +1,74 @@
+"""
+Benchmark des sessions: taille des en-têtes et coût de (dé)sérialisation.
+
+Usage: python -m benchmarks.bench_sessions [--n 2000]
+
+Pour chaque stockage (cookie signé Flask, mémoire, SQLite), le parcours
+complet du questionnaire est joué une fois, puis on mesure:
+- la taille de l'en-tête Cookie envoyé avec la page de résultats;
+- le coût d'ouverture de la session (lecture du cookie, vérification de la
+  signature ou lecture du stockage, désérialisation) et de son
+  enregistrement après modification, par requête.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app import create_app
+from app.scoring import SCORING_PLAN
+
+
+def _timed(func, n: int) -> float:
+    """Médiane d'un appel, en microsecondes."""
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def bench(backend: str, n: int) -> None:
+    config = {'SESSION_BACKEND': backend, 'PDF_RENDER_WORKERS': 0}
+    if backend == 'sqlite':
+        config['SESSION_SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(), 'sessions.sqlite3')
+    app = create_app(config)
+    client = app.test_client()
+    rng = random.Random(0)
+    form = {qid: str(rng.randint(0, spec.max_value)) for qid, spec in SCORING_PLAN.items()}
+    client.post('/start')
+    for path in ('/asrs', '/diva', '/executive'):
+        client.post(path, data=form)
+    cookie = client.get_cookie(app.config['SESSION_COOKIE_NAME'])
+    header = f"{cookie.key}={cookie.value}"
+
+    interface = app.session_interface
+    with app.test_request_context('/results', headers={'Cookie': header}):
+        from flask import request
+        session = interface.open_session(app, request)
+        assert session.get('responses'), backend
+        open_us = _timed(lambda: interface.open_session(app, request), n)
+
+        def save():
+            session['completed_at'] = time.time()
+            interface.save_session(app, session, app.response_class())
+
+        save_us = _timed(save, n)
+    print(f"{backend:>7}: en-tête Cookie {len(header):5d} octets, "
+          f"ouverture {open_us:6.1f} µs, enregistrement {save_us:6.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=2000)
+    args = parser.parse_args()
+    for backend in ('cookie', 'memory', 'sqlite'):
+        bench(backend, args.n)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,33 @@
 #!/usr/bin/env python3
-"""Point d'entrée pour l'application d'évaluation TDAH."""
+"""
+Point d'entrée pour l'application d'évaluation TDAH.
 
-from app import create_app
+    python run.py          serveur de développement (debug, un processus)
+    python run.py serve    serveur de production préforké (voir app/server.py)
 
-app = create_app()
+L'application n'est créée que lorsque ce fichier est exécuté: les processus
+de rendu PDF (méthode "spawn") réimportent __main__ et ne doivent pas
+recréer l'application, avec ses sessions, ses métriques et son propre pool.
+"""
 
-if __name__ == '__main__':
+import sys
+
+
+def main() -> int:
+    if sys.argv[1:2] == ['serve']:
+        from app.server import main as serve
+        return serve(sys.argv[2:], prog='run.py serve')
+
+    from app import create_app
+
+    app = create_app()
     print("=" * 60)
     print("  Application d'Auto-Évaluation TDAH Adulte")
     print("  Ouvrez http://127.0.0.1:5001 dans votre navigateur")
     print("=" * 60)
     app.run(debug=True, host='127.0.0.1', port=5001)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -160,6 +160,50 @@ const state = {
     results: null
 };
 
+// ============================================
+// AUTOSAVE
+// ============================================
+
+// Réponses conservées dans le navigateur (aucun serveur): un onglet fermé
+// ou rechargé reprend là où il en était. Les saisies rapprochées sont
+// regroupées en une seule écriture.
+const STORAGE_KEY = 'clarte-responses';
+let saveTimer = null;
+
+function saveResponses() {
+    clearTimeout(saveTimer);
+    saveTimer = null;
+    try {
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(state.responses));
+    } catch (e) {
+        // Stockage indisponible (navigation privée, quota): pas de reprise
+    }
+}
+
+function scheduleSave() {
+    clearTimeout(saveTimer);
+    saveTimer = setTimeout(saveResponses, 500);
+}
+
+function loadResponses() {
+    try {
+        const saved = JSON.parse(localStorage.getItem(STORAGE_KEY) || '{}');
+        return saved && typeof saved === 'object' ? saved : {};
+    } catch (e) {
+        return {};
+    }
+}
+
+function clearSavedResponses() {
+    clearTimeout(saveTimer);
+    saveTimer = null;
+    try {
+        localStorage.removeItem(STORAGE_KEY);
+    } catch (e) {
+        // Stockage indisponible
+    }
+}
+
 // ============================================
 // NAVIGATION
 // ============================================
@@ -336,6 +380,7 @@ function attachOptionHandlers(container) {
     container.querySelectorAll('input[type="radio"]').forEach(input => {
         input.addEventListener('change', (e) => {
             state.responses[e.target.name] = parseInt(e.target.value);
+            scheduleSave();
             const question = e.target.closest('.question');
             if (question) question.classList.add('answered');
         });
@@ -604,9 +649,16 @@ function renderResults() {
 // PDF GENERATION
 // ============================================
 
+// Output options: Flate-compressed content streams, and only the fonts
+// actually used written to the file (the standard fonts are never embedded)
+const PDF_OPTIONS = {
+    compress: true,
+    putOnlyUsedFonts: true,
+};
+
 function generatePDF() {
     const { jsPDF } = window.jspdf;
-    const doc = new jsPDF();
+    const doc = new jsPDF(PDF_OPTIONS);
     const results = state.results;
     const now = new Date().toLocaleString('fr-FR');
 
@@ -789,6 +841,12 @@ function validateSection(section) {
 // ============================================
 
 function init() {
+    // Reprise des réponses enregistrées
+    state.responses = loadResponses();
+    window.addEventListener('pagehide', () => {
+        if (saveTimer) saveResponses();
+    });
+
     // Render all questionnaires
     renderASRS();
     renderDIVA();
@@ -833,6 +891,7 @@ function init() {
     document.getElementById('restart').addEventListener('click', () => {
         state.responses = {};
         state.results = null;
+        clearSavedResponses();
         renderASRS();
         renderDIVA();
         renderExecutive();
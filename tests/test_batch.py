@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+
+from app.batch import SCORE_FIELDS, run
+
+
+def _run_csv(text, **options):
+    sink = io.StringIO()
+    errors = io.StringIO()
+    scored, failed = run(io.StringIO(text), sink, 'jsonl', 'csv', errors=errors, **options)
+    rows = list(csv.reader(io.StringIO(sink.getvalue())))
+    return scored, failed, rows, errors.getvalue()
+
+
+VALID = json.dumps({'asrs_1': 2, 'diva_ia_1': 1})
+
+
+def test_first_line_not_json_is_reported():
+    scored, failed, rows, errors = _run_csv(f'not json\n{VALID}\n')
+    assert (scored, failed) == (1, 1)
+    assert rows[0] == SCORE_FIELDS and len(rows) == 2
+    assert 'Enregistrement 1 ignoré' in errors
+
+
+def test_first_line_not_an_object_is_reported():
+    scored, failed, rows, errors = _run_csv(f'[1]\n{VALID}\n')
+    assert (scored, failed) == (1, 1)
+    assert 'Enregistrement 1 ignoré' in errors and 'objet' in errors
+
+
+def test_undeclared_field_is_rejected_not_dropped():
+    second = json.dumps({'pid': 'p2', 'asrs_1': 1})
+    scored, failed, rows, errors = _run_csv(f'{VALID}\n{second}\n')
+    assert (scored, failed) == (1, 1)
+    assert 'Enregistrement 2 ignoré' in errors and 'pid' in errors
+
+
+def test_declared_fields_are_copied():
+    second = json.dumps({'pid': 'p2', 'asrs_1': 1})
+    scored, failed, rows, _ = _run_csv(f'{VALID}\n{second}\n', passthrough=['pid'])
+    assert (scored, failed) == (2, 0)
+    assert rows[0][0] == 'pid'
+    assert [row[0] for row in rows[1:]] == ['', 'p2']
+
+
+def test_csv_input_header_declares_fields():
+    sink = io.StringIO()
+    scored, failed = run(io.StringIO('pid,asrs_1\np1,3\np2,\n'), sink, 'csv', 'csv')
+    rows = list(csv.reader(io.StringIO(sink.getvalue())))
+    assert (scored, failed) == (2, 0)
+    assert rows[0][0] == 'pid' and [row[0] for row in rows[1:]] == ['p1', 'p2']
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from app import codec  # noqa: E402
+from app.batch_scoring import (COLUMNS, PRESENTATION_LABELS, responses_to_matrix,  # noqa: E402
+                               score_batch)
+from app.scoring import SCORING_PLAN, score_all  # noqa: E402
+
+
+def _records(count, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        chosen = rng.sample(COLUMNS, rng.randint(0, len(COLUMNS)))
+        records.append({qid: rng.randint(0, SCORING_PLAN[qid].max_value) for qid in chosen})
+    return records
+
+
+def test_vectorized_scores_match_scalar_scoring():
+    records = _records(50)
+    batch = score_batch(responses_to_matrix(records))
+    for i, responses in enumerate(records):
+        asrs, diva, ef = score_all(responses)
+        assert batch.asrs_total_score[i] == asrs.total_score
+        assert batch.asrs_screening_positive[i] == asrs.screening_positive
+        assert PRESENTATION_LABELS[batch.diva_presentation[i]] == diva.presentation_type
+        assert batch.ef_total_score[i] == ef.total_score
+
+
+def test_pack_matrix_matches_scalar_codec():
+    records = _records(20, seed=1)
+    matrix = responses_to_matrix(records)
+    packed = codec.pack_matrix(matrix)
+    assert [bytes(row) for row in packed] == [codec.pack(responses) for responses in records]
+    assert (codec.unpack_matrix(packed) == matrix).all()
@@ -0,0 +1,13 @@
+from app import create_app
+
+
+def test_assessment_cache_is_configured_per_app():
+    app = create_app({'ASSESSMENT_CACHE_SIZE': 2, 'ASSESSMENT_CACHE_TTL': 0})
+    cache = app.extensions['assessment_cache']
+    assert (cache.maxsize, cache.ttl) == (2, None)
+
+    client = app.test_client()
+    for _ in range(2):
+        assert client.post('/api/v1/score', json={'responses': {'asrs_1': 3}}).status_code == 200
+    assert cache.stats()['hits'] == 1 and len(cache) == 1
+    app.extensions['pdf_render_pool'].shutdown()
@@ -0,0 +1,33 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = create_app({'EXPORT_TOKEN': 'token', 'PDF_BACKEND': 'direct', 'PDF_RENDER_WORKERS': 0,
+                      'PDF_CACHE_DIR': str(tmp_path / 'cache'), 'EXPORT_MAX_BYTES': 4096})
+    yield app.test_client()
+    app.extensions['pdf_render_pool'].shutdown()
+
+
+AUTH = {'Authorization': 'Bearer token'}
+
+
+def test_export_reads_the_upload_as_a_stream(client):
+    body = '\n'.join(json.dumps({'id': i, 'asrs_1': 2}) for i in range(3)) + '\nnot json\n'
+    response = client.post('/admin/export', data=body.encode(), headers=AUTH)
+    assert response.status_code == 200
+    names = zipfile.ZipFile(io.BytesIO(response.data)).namelist()
+    assert len([name for name in names if name.endswith('.pdf')]) == 3
+    assert 'erreurs.txt' in names
+
+
+def test_export_rejects_an_oversized_upload(client):
+    body = b'{"id": 1}\n' * 1000
+    response = client.post('/admin/export', data=body, headers=AUTH)
+    assert response.status_code == 413
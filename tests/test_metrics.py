@@ -0,0 +1,35 @@
+import os
+import stat
+import tempfile
+
+import pytest
+
+from app import create_app
+
+
+def _status(app, headers=None):
+    return app.test_client().get('/metrics', headers=headers or {}).status_code
+
+
+@pytest.mark.parametrize('config, headers, expected', [
+    ({}, {}, 404),
+    ({'METRICS_TOKEN': 'scrape'}, {}, 401),
+    ({'METRICS_TOKEN': 'scrape'}, {'Authorization': 'Bearer wrong'}, 401),
+    ({'METRICS_TOKEN': 'scrape'}, {'Authorization': 'Bearer scrape'}, 200),
+    ({'EXPORT_TOKEN': 'admin'}, {'Authorization': 'Bearer admin'}, 200),
+])
+def test_metrics_requires_a_token(config, headers, expected):
+    app = create_app(config)
+    assert _status(app, headers) == expected
+    app.extensions['pdf_render_pool'].shutdown()
+
+
+def test_server_default_directory_is_private_and_reused(tmp_path):
+    config = {'SERVER_PRELOAD': True, 'SECRET_KEY': 'test', 'PDF_JOB_DIR': str(tmp_path / 'jobs')}
+    first = create_app(config)
+    path = first.extensions['metrics'].directory.path
+    assert os.path.dirname(path) == tempfile.gettempdir()
+    assert path != os.path.join(tempfile.gettempdir(), f'tdah-metrics-{os.getpid()}')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+    # Rechargement du maître (SIGHUP): même répertoire
+    assert create_app(config).extensions['metrics'].directory.path == path
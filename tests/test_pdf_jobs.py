@@ -0,0 +1,79 @@
+from concurrent.futures import Future
+
+import pytest
+
+from app.pdf_jobs import (DONE, FAILED, PENDING, DiskJobTable, DiskResultStore, MemoryResultStore,
+                          PdfJobManager)
+
+
+class ImmediatePool:
+    """Pool de rendu dont chaque rendu est terminé dès sa soumission."""
+
+    def __init__(self, pdf=b'%PDF-test'):
+        self.pdf = pdf
+
+    def submit(self, assessment, responses, generated_at=None):
+        future = Future()
+        future.set_result((self.pdf, 0.0))
+        return future
+
+
+class FullDiskCache:
+    def get(self, key):
+        return None
+
+    def put(self, key, pdf):
+        raise OSError(28, 'No space left on device')
+
+
+def test_job_fails_when_cache_put_raises():
+    manager = PdfJobManager(ImmediatePool(), MemoryResultStore(1024), cache=FullDiskCache())
+    job = manager.submit(None, {}, cache_key='key')
+
+    job = manager.get(job.id)
+    assert job.status == FAILED
+    assert job.error.startswith('OSError')
+    assert manager.result(job.id) is None
+
+
+def test_job_fails_when_result_store_raises(tmp_path, monkeypatch):
+    store = DiskResultStore(1024, str(tmp_path))
+    manager = PdfJobManager(ImmediatePool(), store, table=DiskJobTable(str(tmp_path)))
+
+    def full(job_id, pdf):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(store, 'put', full)
+    job = manager.submit(None, {})
+    assert manager.get(job.id).status == FAILED
+
+
+def test_job_done_is_shared_through_the_directory(tmp_path):
+    writer = PdfJobManager(ImmediatePool(), DiskResultStore(1024, str(tmp_path)),
+                           table=DiskJobTable(str(tmp_path)))
+    reader = PdfJobManager(None, DiskResultStore(1024, str(tmp_path)), table=DiskJobTable(str(tmp_path)))
+    job = writer.submit(None, {})
+
+    assert reader.get(job.id).status == DONE
+    assert reader.result(job.id) == b'%PDF-test'
+    assert reader.get('unknown') is None
+    assert PENDING not in {j.status for j in reader.table.jobs()}
+
+
+def test_disk_jobs_beyond_max_are_evicted_oldest_first(tmp_path, monkeypatch):
+    clock = [1000.0]
+    table = DiskJobTable(str(tmp_path))
+    manager = PdfJobManager(ImmediatePool(), DiskResultStore(1 << 20, str(tmp_path)), max_jobs=3,
+                            clock=lambda: clock[0], table=table)
+    ids = []
+    with monkeypatch.context() as patch:
+        # La soumission ne relit aucun fichier de job
+        patch.setattr(DiskJobTable, '_load', lambda self, path: pytest.fail('job file parsed'))
+        for _ in range(5):
+            ids.append(manager.submit(None, {}).id)
+            clock[0] += 1
+
+    manager.sweep()
+    assert sorted(job.id for job in table.jobs()) == sorted(ids[2:])
+    assert manager.result(ids[0]) is None
+    assert manager.result(ids[4]) == b'%PDF-test'
@@ -0,0 +1,23 @@
+import os
+import stat
+
+from app import create_app
+
+
+def test_default_profile_directory_is_the_private_instance_directory():
+    app = create_app({'PROFILE_ENABLED': True, 'PROFILE_SECRET': 'secret'})
+    directory = app.extensions['profiling'].directory
+    assert directory == os.path.join(app.instance_path, 'profiles')
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    app.extensions['pdf_render_pool'].shutdown()
+
+
+def test_profiles_are_written_to_a_private_directory(tmp_path):
+    directory = tmp_path / 'profiles'
+    directory.mkdir(mode=0o755)
+    app = create_app({'PROFILE_ENABLED': True, 'PROFILE_SECRET': 'secret', 'PROFILE_DIR': str(directory)})
+    response = app.test_client().get('/', headers={'X-Profile': 'secret'})
+    name = response.headers['X-Profile-Id']
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+    assert (directory / f'{name}.pstats').exists()
+    app.extensions['pdf_render_pool'].shutdown()
@@ -0,0 +1,44 @@
+import pytest
+
+from app import DEV_SECRET_KEY, create_app
+from app.server import ConfigError, check_app
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    apps = []
+
+    def make(**config):
+        settings = {'SERVER_PRELOAD': True, 'SECRET_KEY': 'test-secret',
+                    'PDF_JOB_DIR': str(tmp_path / 'jobs'), 'PDF_CACHE_DIR': str(tmp_path / 'cache')}
+        app = create_app({**settings, **config})
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        app.extensions['pdf_render_pool'].shutdown()
+
+
+def test_shared_job_store_accepted(make_app):
+    check_app(make_app(), workers=3)
+
+
+def test_memory_job_store_rejected_with_several_workers(make_app):
+    app = make_app(PDF_JOB_STORE='memory')
+    check_app(app, workers=1)
+    with pytest.raises(ConfigError, match='PDF_JOB_STORE'):
+        check_app(app, workers=3)
+
+
+def test_memory_sessions_rejected_with_several_workers(make_app):
+    app = make_app(SESSION_BACKEND='memory')
+    check_app(app, workers=1)
+    with pytest.raises(ConfigError, match='SESSION_BACKEND'):
+        check_app(app, workers=3)
+
+
+def test_development_secret_key_rejected(make_app):
+    app = make_app(SECRET_KEY=DEV_SECRET_KEY)
+    with pytest.raises(ConfigError, match='FLASK_SECRET_KEY'):
+        check_app(app, workers=1)
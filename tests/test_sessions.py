@@ -0,0 +1,37 @@
+import os
+import stat
+
+from flask import Flask
+
+from app import sessions
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_sqlite_default_path_is_private(tmp_path):
+    app = Flask(__name__, instance_path=str(tmp_path / 'instance'))
+    app.config['SESSION_BACKEND'] = 'sqlite'
+    interface = sessions.init_app(app)
+    interface.store.set('sid', {'consent': True})
+
+    path = os.path.join(app.instance_path, 'sessions.sqlite3')
+    assert interface.store.path == path
+    assert _mode(app.instance_path) == 0o700
+    for suffix in ('', '-wal', '-shm'):
+        assert _mode(path + suffix) == 0o600
+    assert interface.store.get('sid') == {'consent': True}
+
+
+def test_memory_store_returns_independent_copies():
+    store = sessions.MemorySessionStore(ttl=60)
+    data = {'consent': True, 'responses': {'asrs_1': 2}}
+    store.set('sid', data)
+    data['responses']['asrs_2'] = 4  # la session vivante après l'enregistrement
+
+    session = store.get('sid')
+    session['responses']['asrs_1'] = 0  # modifiée sans set (formulaire invalide)
+    session['responses']['asrs_3'] = 1
+
+    assert store.get('sid') == {'consent': True, 'responses': {'asrs_1': 2}}